@@ -50,7 +50,7 @@ sys.path.insert(0, dk_lib_dir)
 from lib.basic_functions import is_empty_string
 from lib.file_system_object import current_dir, pushdir, popdir
 from lib.logger import error, log_progress_output, LogLevels
-from lib.string_utils import squeeze_chars
+from lib.string_utils import squeeze_chars, get_squeezer
 from lib.thread_with_return import ReturningThread
 
 
@@ -262,7 +262,7 @@ def run_command(cmd: (str | list[str]),
 
 def __prepare_run(cmd, comment, cwd, dryrun):
     if isinstance(cmd, str):
-        cmd = squeeze_chars(source=cmd, squeeze_set="\t\n\r ", replace_with=" ")
+        cmd = get_squeezer(squeeze_set="\t\n\r ", replace_with=" ").squeeze(cmd)
         cmd = cmd.split()
     cmd_copy = []
     for c in cmd:
@@ -131,3 +131,10 @@ class JsonValueMismatch(JsonError, ValueError):
                        f"Original value '{orig_value}' type({type(orig_value)}), New value '{new_value}' " \
                        f"type({type(new_value)})"
         super().__init__(self.message)
+
+
+class JsonSchemaError(JsonError, ValueError):
+    def __init__(self, message: str, errors: list[str] = None):
+        self.errors = [] if errors is None else errors
+        self.message = message
+        super().__init__(self.message)
@@ -25,7 +25,8 @@ from __future__ import annotations
 import os
 import sys
 import re
-from enum import Flag, Enum, auto
+from enum import Flag, Enum, EnumType, auto
+from functools import lru_cache
 from typing import Callable
 
 this_dir = os.path.dirname(os.path.abspath(__file__))
@@ -103,7 +104,7 @@ def match_one_alternative(
     return None, -1, matches
 
 
-def _list(cls: (Flag | Enum), list_type=EnumListType.ITEM):
+def _build_list(cls: (Flag | Enum), list_type=EnumListType.ITEM):
     reval_list = []
     for item in cls:
         match list_type:
@@ -118,36 +119,105 @@ def _list(cls: (Flag | Enum), list_type=EnumListType.ITEM):
     return reval_list
 
 
+# above this number of remembered partial strings per enum class, the memo of from_string() results is cleared
+FROM_STRING_CACHE_SIZE = 1024
+
+
+@lru_cache(maxsize=256)
+def _fuzzy_regex(partial: str) -> re.Pattern:
+    partial_pattern = ".*".join(re.escape(char) for char in partial)
+    return re.compile(f".*{partial_pattern}.*", re.IGNORECASE)
+
+
+class _EnumLookupIndex:
+    """
+    Everything from_string() and list() need about an enum class, built once per class: the member lists as tuples,
+    for each kind of alternative (value, name, str) a map from the alternative back to its member, a memo of resolved
+    partials (members or error messages), so that repeated lookups cost one dict access, and, for flags, the members by
+    their integer bitmask.
+    A partial is a sub-sequence of an alternative, not only a prefix, so an exact or prefix match is not necessarily
+    unique: a name that is a sub-sequence of another name is ambiguous. Hence first lookups still go through the
+    fuzzy match, and only their results are remembered.
+    """
+
+    def __init__(self, cls: (Flag | Enum)):
+        self.cls = cls
+        self.lists = {list_type: tuple(_build_list(cls, list_type)) for list_type in EnumListType}
+        items = self.lists[EnumListType.ITEM]
+        # includes aliases and composite flags, combinations that are not members are added when first made
+        self.members_by_value = {member.value: member for member in cls.__members__.values()}
+        self.alternatives: list[tuple[list[str], dict[str, Flag | Enum]]] = []
+        if items and isinstance(items[0].value, str):
+            self.alternatives.append(self.__alternative(EnumListType.VALUE))
+        self.alternatives.append(self.__alternative(EnumListType.NAME))
+        self.alternatives.append(self.__alternative(EnumListType.STR))
+        self.memo: dict[str, Flag | Enum | str] = {}
+
+    def __alternative(self, list_type: EnumListType) -> tuple[list[str], dict[str, Flag | Enum]]:
+        alternatives = self.lists[list_type]
+        to_item = {}
+        for item, alternative in zip(self.lists[EnumListType.ITEM], alternatives):
+            to_item.setdefault(alternative, item)
+        return list(alternatives), to_item
+
+    def __resolve(self, partial: str, predicate: predicate_type) -> Flag | Enum | str:
+        """
+        Find the unique member for the partial.
+        :return: the member, or the error message if there is none
+        """
+        tried_alternatives = []
+        for alternatives, to_item in self.alternatives:
+            empty_alts = [alt for alt in alternatives if not alt]
+            if empty_alts:
+                raise ValueError(f"Alternatives contain empty strings: {empty_alts}")
+            regex = _fuzzy_regex(partial)
+            matches = [alt for alt in alternatives if regex.search(alt) and predicate(alt)]
+            if len(matches) == 1:
+                return to_item[matches[0]]
+            tried_alternatives.append((alternatives, matches))
+
+        error_message = f"Cannot match partial '{partial}' to unique enum-value\n"
+        for alternatives, matches in tried_alternatives:
+            dupe = "-no match-"
+            if len(matches) > 1:
+                dupe = f"multiple matches {matches}"
+            error_message += f"{alternatives}:\t{dupe}\n"
+        return error_message
+
+    def from_string(self, partial: str, predicate: predicate_type) -> Flag | Enum:
+        if not partial:
+            raise ValueError("Partial string cannot be empty.")
+        if predicate is not always_match:
+            # arbitrary predicates cannot be memoised
+            reval = self.__resolve(partial, predicate)
+        else:
+            reval = self.memo.get(partial)
+            if reval is None:
+                reval = self.__resolve(partial, predicate)
+                if len(self.memo) >= FROM_STRING_CACHE_SIZE:
+                    self.memo.clear()
+                self.memo[partial] = reval
+        if isinstance(reval, str):
+            raise ExtendedEnumError(reval)
+        return reval
+
+
+def _lookup_index(cls: (Flag | Enum)) -> _EnumLookupIndex:
+    # kept in the class itself, so that it goes away with the class; members cannot be added after creation
+    index = getattr(cls, "_lookup_index", None)
+    if index is None or index.cls is not cls:
+        # not yet built, or inherited from a base class without members
+        index = _EnumLookupIndex(cls)
+        setattr(cls, "_lookup_index", index)
+    return index
+
+
+def _list(cls: (Flag | Enum), list_type=EnumListType.ITEM):
+    return list(_lookup_index(cls).lists[list_type])
+
+
 def _from_string(cls: (Flag | Enum), partial: str, predicate=always_match):
-    alternatives_list = []
-    items = _list(cls, EnumListType.ITEM)
-    if isinstance(items[0].value, str):
-        alternatives_list.append((EnumListType.VALUE, _list(cls, EnumListType.VALUE)))
-    alternatives_list.append((EnumListType.NAME, _list(cls, EnumListType.NAME)))
-    alternatives_list.append((EnumListType.STR, _list(cls, EnumListType.STR)))
-    tried_alternatives = []
-    for tp, alternatives in alternatives_list:
-        matched, reval, duplicates = match_one_alternative(partial=partial,
-                                                           alternatives=alternatives,
-                                                           predicate=predicate)
-        if reval == 0:
-            for item in items:
-                if tp == EnumListType.VALUE and item.value == matched:
-                    return item
-                if tp == EnumListType.NAME and item.name == matched:
-                    return item
-                if tp == EnumListType.STR and str(item) == matched:
-                    return item
-        tried_alternatives.append((alternatives, duplicates))
-
-    error_message = f"Cannot match partial '{partial}' to unique enum-value\n"
-    for i, tried_alternative in enumerate(tried_alternatives):
-        dupe = "-no match-"
-        if len(tried_alternative[1]) > 1:
-            dupe = f"multiple matches {tried_alternative[1]}"
-
-        error_message += f"{tried_alternatives[i][0]}:\t{dupe}\n"
-    raise ExtendedEnumError(error_message)
+    return _lookup_index(cls).from_string(partial, predicate)
 
 
 class ExtendedEnum(Enum):
@@ -176,13 +246,41 @@ class ExtendedEnum(Enum):
         return self.__or__(other)
 
 
-class ExtendedFlag(Flag):
+def _flag_from_mask(cls: Flag, mask: int) -> Flag:
+    members_by_value = _lookup_index(cls).members_by_value
+    member = members_by_value.get(mask)
+    if member is None:
+        member = cls(mask)
+        members_by_value[mask] = member
+    return member
+
+
+class _ExtendedFlagType(EnumType):
+    """
+    EnumType gives every Flag class the bitwise operators of Flag, replacing those it inherits. This puts the ones of
+    ExtendedFlag back, unless the class defines its own.
+    """
+
+    def __new__(mcs, cls, bases, classdict, **kwargs):
+        enum_class = super().__new__(mcs, cls, bases, classdict, **kwargs)
+        extended_flag = globals().get("ExtendedFlag")
+        if extended_flag is not None:
+            for name in ("__or__", "__ror__", "__and__", "__rand__"):
+                if name not in classdict:
+                    setattr(enum_class, name, extended_flag.__dict__[name])
+        return enum_class
+
+
+class ExtendedFlag(Flag, metaclass=_ExtendedFlagType):
     """
     Derived from Flag and extended to allow value creation from partial strings and listing of:
     — items
     — values
     — names
     — string-conversions.
+    Combining flags with | and & looks the result up by its integer bitmask, rather than constructing it. For tests
+    on many objects, like filtering by type, get the integer mask of the filter once with mask() and test the
+    values of the objects against it.
     """
 
     @classmethod
@@ -193,10 +291,48 @@ class ExtendedFlag(Flag):
     def from_string(cls, partial: str, predicate=always_match):
         return _from_string(cls=cls, partial=partial, predicate=predicate)
 
+    @classmethod
+    def from_mask(cls, mask: int):
+        """
+        Get the flag for an integer bitmask.
+        :param mask: the bitmask
+        :return: the (combined) flag with the value of mask
+        """
+        return _flag_from_mask(cls, mask)
+
+    @classmethod
+    def mask(cls, flags: (ExtendedFlag | int | str | list)) -> int:
+        """
+        Get the integer bitmask of flags.
+        :param flags: a flag of this class, an integer bitmask, a (partial) flag-name, or a list of these
+        :return: the bitwise or of the values of the flags
+        :raise ExtendedEnumError: if a string does not match a flag, or a flag is of another class
+        """
+        if isinstance(flags, cls):
+            return flags.value
+        if isinstance(flags, int):
+            return flags
+        if isinstance(flags, str):
+            return cls.from_string(flags).value
+        if isinstance(flags, (list, tuple, set, frozenset)):
+            reval = 0
+            for flag in flags:
+                reval |= cls.mask(flag)
+            return reval
+        raise ExtendedEnumError(f"Cannot get a {cls.__name__}-bitmask from '{flags}'")
+
     def __or__(self, other):
         if isinstance(other, self.__class__):
-            return self.__class__(self.value | other.value)
+            return _flag_from_mask(self.__class__, self._value_ | other._value_)
         return NotImplemented
 
     def __ror__(self, other):
         return self.__or__(other)
+
+    def __and__(self, other):
+        if isinstance(other, self.__class__):
+            return _flag_from_mask(self.__class__, self._value_ & other._value_)
+        return NotImplemented
+
+    def __rand__(self, other):
+        return self.__and__(other)
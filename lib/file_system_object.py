@@ -27,9 +27,11 @@ import grp
 import os
 import pwd
 import shutil
+import stat
 import sys
 from datetime import datetime
 from enum import auto
+from itertools import permutations
 from os import PathLike
 from pathlib import Path
 from shutil import copytree
@@ -45,7 +47,6 @@ sys.path.insert(0, dk_lib_dir)
 from lib.basic_functions import is_empty_string, valid_absolute_path
 from lib.extended_enum import ExtendedFlag, ExtendedEnum, always_match, predicate_type
 from lib.logger import error, log_warning, log_command
-from lib.overrides import overrides
 from lib.string_utils import matches_any
 
 
@@ -80,23 +81,30 @@ class FileSystemObjectType(ExtendedFlag):
         if is_empty_string(file_system_object):
             return FileSystemObjectType.NONE
 
-        if os.path.exists(file_system_object):
-            if os.path.isfile(file_system_object):
-                return FileSystemObjectType.FILE
-            if os.path.isdir(file_system_object):
-                if len((os.listdir(file_system_object))) == 0:
+        # one stat (following links) decides, as os.path.exists() followed by os.path.isfile() etc. would
+        try:
+            mode = os.stat(file_system_object).st_mode
+        except (OSError, ValueError):
+            try:
+                if stat.S_ISLNK(os.lstat(file_system_object).st_mode):
+                    return FileSystemObjectType.STALE_LINK
+            except (OSError, ValueError):
+                pass
+            return FileSystemObjectType.NONE
+        if stat.S_ISREG(mode):
+            return FileSystemObjectType.FILE
+        if stat.S_ISDIR(mode):
+            with os.scandir(file_system_object) as entries:
+                if next(entries, None) is None:
                     return FileSystemObjectType.EMPTY_DIR
-                return FileSystemObjectType.NOT_EMPTY_DIR
-            if os.path.islink(file_system_object):
-                return FileSystemObjectType.NOT_STALE_LINK
-            if os.path.ismount(file_system_object):
-                return FileSystemObjectType.MOUNT
-        elif os.path.islink(file_system_object):
-            return FileSystemObjectType.STALE_LINK
+            return FileSystemObjectType.NOT_EMPTY_DIR
+        if os.path.islink(file_system_object):
+            return FileSystemObjectType.NOT_STALE_LINK
+        if os.path.ismount(file_system_object):
+            return FileSystemObjectType.MOUNT
         return FileSystemObjectType.NONE
 
     @classmethod
-    @overrides
     def from_string(cls, partial: str, predicate: predicate_type = always_match):
         """
         Get the FileSystemObjectType from a partial string.
@@ -104,22 +112,23 @@ class FileSystemObjectType(ExtendedFlag):
         :param predicate: a predicate function to filter the matches
         :return: the FileSystemObjectType that matches the partial string
         """
-        sorted_partial = "".join(sorted(partial, key=str.lower))
-        if sorted_partial == "f":
-            return FileSystemObjectType.FILE
-        if sorted_partial == "d":
-            return FileSystemObjectType.DIR
-        if sorted_partial == "df":
-            return FileSystemObjectType.FILE | FileSystemObjectType.DIR
-        if sorted_partial == "fl":
-            return FileSystemObjectType.FILE | FileSystemObjectType.LINK
-        if sorted_partial == "dl":
-            return FileSystemObjectType.DIR | FileSystemObjectType.LINK
-        if sorted_partial == "dfl":
-            return FileSystemObjectType.DIR | FileSystemObjectType.FILE | FileSystemObjectType.LINK
+        file_type = _FILE_TYPE_LETTER_COMBINATIONS.get(partial)
+        if file_type is not None:
+            return file_type
         return super().from_string(partial=partial, predicate=predicate)
 
 
+_FILE_TYPE_LETTERS = {"d": FileSystemObjectType.DIR, "f": FileSystemObjectType.FILE, "l": FileSystemObjectType.LINK}
+# like find's -type: files, directories and their combinations with links, letters in any order
+_FILE_TYPE_LETTER_COMBINATIONS = {
+    "".join(letters): FileSystemObjectType.from_mask(FileSystemObjectType.mask([_FILE_TYPE_LETTERS[letter]
+                                                                                for letter in letters]))
+    for combination in ("d", "f", "df", "dl", "fl", "dfl")
+    for letters in permutations(combination)
+}
+_DIR_MASK = FileSystemObjectType.DIR.value
+
+
 class GlobMode(ExtendedEnum):
     IGNORE_EMPTY = auto()
     FAIL_ON_EMPTY = auto()
@@ -399,7 +408,8 @@ def find(paths: (str | PathLike | list),
     """
     Find file system objects in the given directories.
     :param paths: paths of directories
-    :param file_type_filter: file type filter, default: all file-system-object types
+    :param file_type_filter: file type filter, as flag, integer bitmask or (partial) name, default: all file-system-object
+                             types
     :param name_patterns: pattern for filename matching
     :param exclude_patterns: pattern for excluding files
     :param sort_field: sort field, name/type/depth
@@ -422,7 +432,7 @@ def find(paths: (str | PathLike | list),
 
     augmented_path_list = _collect_augmented_paths(
         paths=paths,
-        file_type_filter=file_type_filter,
+        file_type_mask=FileSystemObjectType.mask(file_type_filter),
         name_patterns=name_patterns,
         exclude_patterns=exclude_patterns,
         allow_system_paths=allow_system_paths,
@@ -455,7 +465,7 @@ def _build_name_pattern_string(name_patterns):
 
 
 def _collect_augmented_paths(paths,
-                             file_type_filter,
+                             file_type_mask: int,
                              name_patterns,
                              exclude_patterns,
                              allow_system_paths,
@@ -480,19 +490,19 @@ def _collect_augmented_paths(paths,
             depth = dir_name.count(os.path.sep)
             if min_depth <= depth <= max_depth:
                 _process_directory(
-                    dir_name, file_type_filter, name_patterns, exclude_patterns, allow_system_paths, depth,
+                    dir_name, file_type_mask, name_patterns, exclude_patterns, allow_system_paths, depth,
                     augmented_path_list
                 )
                 _process_files(
-                    dir_name, file_list, file_type_filter, name_patterns, exclude_patterns, allow_system_paths, depth,
+                    dir_name, file_list, file_type_mask, name_patterns, exclude_patterns, allow_system_paths, depth,
                     augmented_path_list
                 )
     return augmented_path_list
 
 
-def _process_directory(dir_name, file_type_filter, name_patterns, exclude_patterns, allow_system_paths, depth, result):
+def _process_directory(dir_name, file_type_mask, name_patterns, exclude_patterns, allow_system_paths, depth, result):
     """Process directories and add matching ones to the result."""
-    if FileSystemObjectType.DIR & file_type_filter == FileSystemObjectType.DIR:
+    if _DIR_MASK & file_type_mask == _DIR_MASK:
         if _matches_filters(dir_name, name_patterns, exclude_patterns):
             result.append(
                 (valid_absolute_path(dir_name, allow_system_paths=allow_system_paths),
@@ -501,16 +511,16 @@ def _process_directory(dir_name, file_type_filter, name_patterns, exclude_patter
             )
 
 
-def _process_files(dir_name, file_list, file_type_filter, name_patterns, exclude_patterns, allow_system_paths, depth,
+def _process_files(dir_name, file_list, file_type_mask, name_patterns, exclude_patterns, allow_system_paths, depth,
                    result):
     """Process files and add matching ones to the result."""
     for file in file_list:
         file_path = f"{dir_name}/{file}"
         if _matches_filters(file, name_patterns, exclude_patterns):
             full_path = valid_absolute_path(file_path, allow_system_paths=allow_system_paths)
-            file_type = FileSystemObjectType.from_file_system_object(full_path)
-            if file_type & file_type_filter == file_type:
-                result.append((full_path, file_type.value, depth))
+            file_type = FileSystemObjectType.from_file_system_object(full_path).value
+            if file_type & file_type_mask == file_type:
+                result.append((full_path, file_type, depth))
 
 
 def _matches_filters(search_string, name_patterns, exclude_patterns):
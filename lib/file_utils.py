@@ -37,7 +37,7 @@ sys.path.insert(0, dk_lib_dir)
 from lib.basic_functions import valid_absolute_path, is_empty_string
 from lib.file_system_object import mkdir
 from lib.logger import log_command, error
-from lib.string_utils import squeeze_chars
+from lib.string_utils import squeeze_chars, get_squeezer
 
 
 def generate_incremental_filename(filename: (str | PathLike), allow_system_paths: bool = False) -> str:
@@ -130,8 +130,9 @@ def extract_dict_from_string(content: (str | list[str])):
     """
     key_val_dict = {}
     lines = content.split("\n")
+    squeezer = get_squeezer(squeeze_set="\t ")
     for line in lines:
-        key_val = squeeze_chars(source=(line.split("#")[0]), squeeze_set="\t ").split("=")
+        key_val = squeezer.squeeze(line.split("#")[0]).split("=")
         key = key_val[0]
         if not is_empty_string(key):
             if len(key_val) == 1:
@@ -0,0 +1,329 @@
+# Repository:   https://github.com/Python-utilities
+# File Name:    lib/json_backend.py
+# Description:  pluggable json parser/serialiser backends (orjson, ujson, simdjson, json)
+#
+# Copyright (C) 2024 Dieter J Kybelksties <github@kybelksties.com>
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 59 Temple Place - Suite 330, Boston, MA  02111-1307, USA.
+#
+# @date: 2024-07-13
+# @author: Dieter J Kybelksties
+
+from __future__ import annotations
+import json
+import math
+import os
+import re
+import sys
+from abc import ABC, abstractmethod
+from os import PathLike
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+try:
+    import ujson
+except ImportError:
+    ujson = None
+try:
+    import simdjson
+except ImportError:
+    simdjson = None
+
+this_dir = os.path.dirname(os.path.abspath(__file__))
+dk_lib_dir = os.path.abspath(f"{this_dir}/../../Python-utilities")
+if not os.path.isdir(dk_lib_dir):
+    raise FileNotFoundError(f"Library directory '{dk_lib_dir}' cannot be found")
+sys.path.insert(0, dk_lib_dir)
+
+# pylint: disable=wrong-import-position
+from lib.exceptions import JsonGeneralError
+from lib.extended_enum import ExtendedEnum
+
+
+class JsonBackendType(ExtendedEnum):
+    AUTO = "auto"
+    ORJSON = "orjson"
+    UJSON = "ujson"
+    SIMDJSON = "simdjson"
+    JSON = "json"
+
+    def __str__(self):
+        return self.value
+
+
+def _backend_type_from_string(name: str) -> JsonBackendType:
+    # "json" would match all the backend names fuzzily, so look for exact names first
+    for backend_type in JsonBackendType:
+        if backend_type.value == name.lower():
+            return backend_type
+    return JsonBackendType.from_string(name)
+
+
+def _is_utf8(encoding: str) -> bool:
+    return encoding.lower().replace("-", "").replace("_", "") == "utf8"
+
+
+# orjson reads integers outside the 64-bit range as floats; any run of 19 or more digits might be one of those
+_LONG_DIGIT_RUN_RE = re.compile(r"\d{19}")
+_LONG_DIGIT_RUN_BYTES_RE = re.compile(rb"\d{19}")
+
+
+def _may_contain_big_int(document: (str | bytes)) -> bool:
+    if isinstance(document, str):
+        return _LONG_DIGIT_RUN_RE.search(document) is not None
+    return _LONG_DIGIT_RUN_BYTES_RE.search(document) is not None
+
+
+def _contains_non_finite(obj: object) -> bool:
+    if isinstance(obj, float):
+        return not math.isfinite(obj)
+    if isinstance(obj, dict):
+        return any(_contains_non_finite(value) for value in obj.values())
+    if isinstance(obj, (list, tuple)):
+        return any(_contains_non_finite(item) for item in obj)
+    return False
+
+
+class JsonBackend(ABC):
+    """
+    Common interface of the json parser/serialiser implementations.
+    All backends raise json.JSONDecodeError on malformed input so that callers need not know which one is in use.
+    """
+    backend_type = JsonBackendType.JSON
+
+    @classmethod
+    @abstractmethod
+    def available(cls) -> bool:
+        pass
+
+    @abstractmethod
+    def loads(self, json_str: (str | bytes)) -> object:
+        pass
+
+    @abstractmethod
+    def dumps(self, obj: object, indent: int = None) -> str:
+        pass
+
+    def load_file(self, filename: (str | PathLike), encoding: str = "utf-8") -> object:
+        """
+        Parse a json-file.
+        :param filename: json-file
+        :param encoding: encoding of the file
+        :return: the parsed object
+        """
+        with open(filename, encoding=encoding) as file:
+            return self.loads(file.read())
+
+    def dump_file(self, obj: object, filename: (str | PathLike), indent: int = None, encoding: str = "utf-8"):
+        """
+        Serialise an object to a json-file.
+        :param obj: the object to serialise
+        :param filename: the output filename
+        :param indent: number of indentation chars to use, None for compact output
+        :param encoding: encoding of the file
+        """
+        with open(filename, "w", encoding=encoding) as file:
+            file.write(self.dumps(obj, indent=indent))
+
+    def __str__(self):
+        return str(self.backend_type)
+
+
+class StdJsonBackend(JsonBackend):
+    backend_type = JsonBackendType.JSON
+
+    @classmethod
+    def available(cls) -> bool:
+        return True
+
+    def loads(self, json_str: (str | bytes)) -> object:
+        return json.loads(json_str)
+
+    def dumps(self, obj: object, indent: int = None) -> str:
+        return json.dumps(obj, indent=indent)
+
+    def load_file(self, filename: (str | PathLike), encoding: str = "utf-8") -> object:
+        with open(filename, encoding=encoding) as file:
+            return json.load(file)
+
+    def dump_file(self, obj: object, filename: (str | PathLike), indent: int = None, encoding: str = "utf-8"):
+        with open(filename, "w", encoding=encoding) as file:
+            json.dump(obj, file, indent=indent)
+
+
+# pylint: disable=no-member
+# orjson is a compiled extension, pylint cannot see its members
+class OrjsonBackend(JsonBackend):
+    """
+    orjson parses and serialises to/from bytes. It only knows 2-space indentation and does not handle integers
+    beyond 64 bits, NaN or Infinity. Documents and objects that (might) contain those are handled by the stdlib
+    instead, so the results are the same as with the stdlib backend apart from whitespace and non-ASCII escaping.
+    """
+    backend_type = JsonBackendType.ORJSON
+
+    @classmethod
+    def available(cls) -> bool:
+        return orjson is not None
+
+    def loads(self, json_str: (str | bytes)) -> object:
+        if _may_contain_big_int(json_str):
+            return json.loads(json_str)
+        try:
+            return orjson.loads(json_str)
+        except orjson.JSONDecodeError:
+            # NaN, Infinity and out-of-range floats are accepted by the stdlib, which also produces the error message
+            return json.loads(json_str)
+
+    def dumps_bytes(self, obj: object, indent: int = None) -> bytes:
+        if indent not in (None, 2):
+            return json.dumps(obj, indent=indent).encode("utf-8")
+        option = orjson.OPT_NON_STR_KEYS
+        if indent == 2:
+            option |= orjson.OPT_INDENT_2
+        try:
+            reval = orjson.dumps(obj, option=option)
+        except TypeError:
+            return json.dumps(obj, indent=indent).encode("utf-8")
+        # orjson writes NaN and Infinity as null
+        if b"null" in reval and _contains_non_finite(obj):
+            return json.dumps(obj, indent=indent).encode("utf-8")
+        return reval
+
+    def dumps(self, obj: object, indent: int = None) -> str:
+        return self.dumps_bytes(obj, indent=indent).decode("utf-8")
+
+    def load_file(self, filename: (str | PathLike), encoding: str = "utf-8") -> object:
+        if not _is_utf8(encoding):
+            return super().load_file(filename, encoding=encoding)
+        with open(filename, "rb") as file:
+            return self.loads(file.read())
+
+    def dump_file(self, obj: object, filename: (str | PathLike), indent: int = None, encoding: str = "utf-8"):
+        if not _is_utf8(encoding):
+            super().dump_file(obj, filename, indent=indent, encoding=encoding)
+            return
+        with open(filename, "wb") as file:
+            file.write(self.dumps_bytes(obj, indent=indent))
+# pylint: enable=no-member
+
+
+class UjsonBackend(JsonBackend):
+    backend_type = JsonBackendType.UJSON
+
+    @classmethod
+    def available(cls) -> bool:
+        return ujson is not None
+
+    def loads(self, json_str: (str | bytes)) -> object:
+        try:
+            return ujson.loads(json_str)
+        except ValueError:
+            # let the stdlib decide, it accepts values ujson rejects and produces the error message otherwise
+            return json.loads(json_str)
+
+    def dumps(self, obj: object, indent: int = None) -> str:
+        try:
+            return ujson.dumps(obj, indent=indent or 0, ensure_ascii=False, escape_forward_slashes=False)
+        except (TypeError, OverflowError):
+            return json.dumps(obj, indent=indent)
+
+
+class SimdjsonBackend(JsonBackend):
+    """
+    pysimdjson is a parser only, serialisation is delegated to the stdlib.
+    """
+    backend_type = JsonBackendType.SIMDJSON
+
+    @classmethod
+    def available(cls) -> bool:
+        return simdjson is not None
+
+    def loads(self, json_str: (str | bytes)) -> object:
+        try:
+            return simdjson.loads(json_str)
+        except (ValueError, RuntimeError):
+            # simdjson rejects integers beyond 64 bits, NaN and Infinity, the stdlib accepts those
+            return json.loads(json_str)
+
+    def dumps(self, obj: object, indent: int = None) -> str:
+        return json.dumps(obj, indent=indent)
+
+    def load_file(self, filename: (str | PathLike), encoding: str = "utf-8") -> object:
+        if not _is_utf8(encoding):
+            return super().load_file(filename, encoding=encoding)
+        with open(filename, "rb") as file:
+            return self.loads(file.read())
+
+
+# in order of preference when the backend is chosen automatically
+BACKEND_CLASSES = {
+    JsonBackendType.ORJSON: OrjsonBackend,
+    JsonBackendType.SIMDJSON: SimdjsonBackend,
+    JsonBackendType.UJSON: UjsonBackend,
+    JsonBackendType.JSON: StdJsonBackend,
+}
+
+_backend_instances: dict[JsonBackendType, JsonBackend] = {}
+# the stdlib is the default so that results do not depend on what happens to be installed, the faster backends are
+# opt-in per call or through set_default_json_backend()
+_default_backend_type = JsonBackendType.JSON
+
+
+def available_json_backends() -> list[JsonBackendType]:
+    """
+    List the backends that can be used in this environment, in order of preference.
+    :return: list of available backend types
+    """
+    return [backend_type for backend_type, backend_class in BACKEND_CLASSES.items() if backend_class.available()]
+
+
+def get_json_backend(backend: (str | JsonBackendType | JsonBackend) = None) -> JsonBackend:
+    """
+    Get a json backend.
+    :param backend: backend instance, type or (partial) name. If None, then the default backend is returned.
+    :return: the backend
+    :raise JsonGeneralError: if the requested backend is not installed
+    """
+    if isinstance(backend, JsonBackend):
+        return backend
+    if backend is None:
+        backend = _default_backend_type
+    elif isinstance(backend, str):
+        backend = _backend_type_from_string(backend)
+    if backend == JsonBackendType.AUTO:
+        backend = available_json_backends()[0]
+    if backend not in _backend_instances:
+        backend_class = BACKEND_CLASSES[backend]
+        if not backend_class.available():
+            raise JsonGeneralError(f"Json backend '{backend}' is not installed")
+        _backend_instances[backend] = backend_class()
+    return _backend_instances[backend]
+
+
+def set_default_json_backend(backend: (str | JsonBackendType) = JsonBackendType.JSON) -> JsonBackend:
+    """
+    Set the backend that is used when no backend is explicitly requested.
+    :param backend: backend type or (partial) name, AUTO picks the fastest installed backend
+    :return: the new default backend
+    :raise JsonGeneralError: if the requested backend is not installed
+    """
+    global _default_backend_type
+    if isinstance(backend, str):
+        backend = _backend_type_from_string(backend)
+    reval = get_json_backend(backend)
+    _default_backend_type = backend
+    return reval
@@ -0,0 +1,125 @@
+# Repository:   https://github.com/Python-utilities
+# File Name:    lib/json_columns.py
+# Description:  flatten json arrays of records into typed columns (numpy/pandas)
+#
+# Copyright (C) 2024 Dieter J Kybelksties <github@kybelksties.com>
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 59 Temple Place - Suite 330, Boston, MA  02111-1307, USA.
+#
+# @date: 2024-07-13
+# @author: Dieter J Kybelksties
+
+from __future__ import annotations
+import os
+import sys
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+try:
+    import pandas
+except ImportError:
+    pandas = None
+
+this_dir = os.path.dirname(os.path.abspath(__file__))
+dk_lib_dir = os.path.abspath(f"{this_dir}/../../Python-utilities")
+if not os.path.isdir(dk_lib_dir):
+    raise FileNotFoundError(f"Library directory '{dk_lib_dir}' cannot be found")
+sys.path.insert(0, dk_lib_dir)
+
+# pylint: disable=wrong-import-position
+from lib.exceptions import JsonGeneralError
+from lib.json_key_path import JsonKey, JsonKeyPath, JsonStringKey
+from lib.json_query import get_relative
+
+COLUMN_FORMATS = ("auto", "pandas", "numpy", "python")
+
+
+def field_keys(field: (str | JsonKeyPath)) -> list[JsonKey]:
+    """
+    Keys of a field-spec: either a key-path ("author/name", "tags/[0]") or a dotted path ("author.name").
+    :param field: the field-spec
+    :return: list of keys
+    """
+    if isinstance(field, JsonKeyPath):
+        return field.key_list()
+    if "/" in field or "[" in field:
+        return JsonKeyPath(field).key_list()
+    return JsonKeyPath(field.split(".")).key_list()
+
+
+def _typed_column(values: list) -> object:
+    types = set(map(type, values))
+    has_missing = type(None) in types
+    types.discard(type(None))
+    if types and types <= {int} and not has_missing:
+        try:
+            return numpy.array(values, dtype=numpy.int64)
+        except OverflowError:
+            return numpy.array(values, dtype=object)
+    if types and types <= {int, float}:
+        # missing numbers become NaN, as in pandas
+        return numpy.array(values, dtype=numpy.float64)
+    if types == {bool} and not has_missing:
+        return numpy.array(values, dtype=numpy.bool_)
+    column = numpy.empty(len(values), dtype=object)
+    column[:] = values
+    return column
+
+
+def records_to_columns(records: list,
+                       fields: (list[str | JsonKeyPath] | dict[str, str | JsonKeyPath]),
+                       column_format: str = "auto") -> object:
+    """
+    Flatten a list of json-records into one column per field, in a single pass over the records.
+    Columns of ints, floats (ints mixed with floats or missing values) and bools get the numpy dtypes int64, float64
+    and bool, all others are object-columns; missing fields are None, or NaN in float columns.
+    :param records: list of json-objects
+    :param fields: field-specs, see field_keys(); or a dict mapping column-names to field-specs
+    :param column_format: "pandas" for a DataFrame, "numpy" for a dict of arrays, "python" for a dict of lists,
+                          "auto" for the first of these that is installed
+    :return: the columns in the requested format
+    :raise JsonGeneralError: if the format is unknown or its library is not installed
+    """
+    if column_format == "auto":
+        column_format = "pandas" if pandas is not None else "numpy" if numpy is not None else "python"
+    if column_format not in COLUMN_FORMATS:
+        raise JsonGeneralError(f"Unknown column format '{column_format}', must be one of {COLUMN_FORMATS}")
+    if (column_format == "pandas" and pandas is None) or (column_format == "numpy" and numpy is None):
+        raise JsonGeneralError(f"Column format '{column_format}' needs {column_format} to be installed")
+
+    if not isinstance(fields, dict):
+        fields = {str(field): field for field in fields}
+    names = list(fields.keys())
+    keys = [field_keys(field) for field in fields.values()]
+    columns = [[] for _ in names]
+    appenders = [column.append for column in columns]
+    # plain top-level keys, the common case, are read directly
+    simple = [key[0].get() if len(key) == 1 and isinstance(key[0], JsonStringKey) else None for key in keys]
+    for record in records:
+        is_dict = isinstance(record, dict)
+        for append, key, field in zip(appenders, simple, keys):
+            if key is not None:
+                append(record.get(key) if is_dict else None)
+            else:
+                append(get_relative(record, field))
+
+    if column_format == "python":
+        return dict(zip(names, columns))
+    arrays = {name: _typed_column(column) for name, column in zip(names, columns)}
+    if column_format == "numpy":
+        return arrays
+    return pandas.DataFrame(arrays, copy=False)
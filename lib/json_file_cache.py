@@ -0,0 +1,292 @@
+# Repository:   https://github.com/Python-utilities
+# File Name:    lib/json_file_cache.py
+# Description:  persistent binary cache of parsed json-files
+#
+# Copyright (C) 2024 Dieter J Kybelksties <github@kybelksties.com>
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 59 Temple Place - Suite 330, Boston, MA  02111-1307, USA.
+#
+# @date: 2024-07-13
+# @author: Dieter J Kybelksties
+
+from __future__ import annotations
+import hashlib
+import marshal
+import os
+import pickle
+import sys
+import tempfile
+from os import PathLike
+from typing import Callable
+
+this_dir = os.path.dirname(os.path.abspath(__file__))
+dk_lib_dir = os.path.abspath(f"{this_dir}/../../Python-utilities")
+if not os.path.isdir(dk_lib_dir):
+    raise FileNotFoundError(f"Library directory '{dk_lib_dir}' cannot be found")
+sys.path.insert(0, dk_lib_dir)
+
+# pylint: disable=wrong-import-position
+from lib.exceptions import JsonGeneralError
+from lib.logger import log_warning
+
+DEFAULT_CACHE_DIR = os.path.join(os.environ.get("XDG_CACHE_HOME", os.path.expanduser("~/.cache")),
+                                 "python-utilities", "json")
+DEFAULT_MAX_CACHE_SIZE = 1 << 30
+# smaller files are parsed faster than their cache entry can be checked and read
+MIN_CACHED_FILE_SIZE = 1 << 16
+
+# marshal is the fastest for plain json data; pickle also handles subclasses of the json types
+_SERIALISERS = {
+    "marshal": (marshal.dumps, marshal.loads),
+    "pickle": (lambda value: pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL), pickle.loads),
+}
+_HEADER_SIZE_BYTES = 4
+
+
+def _read_header(file, loads: Callable[[bytes], object]) -> tuple:
+    size = int.from_bytes(file.read(_HEADER_SIZE_BYTES), "little")
+    return loads(file.read(size))
+
+
+class JsonCacheEntry:
+    """
+    One cached file: the source it was parsed from, and the size and last use of the cache entry.
+    """
+
+    def __init__(self, cache_file: str, source: str, source_mtime_ns: int, source_size: int, size: int,
+                 last_used: float):
+        self.cache_file = cache_file
+        self.source = source
+        self.source_mtime_ns = source_mtime_ns
+        self.source_size = source_size
+        self.size = size
+        self.last_used = last_used
+
+    def is_stale(self) -> bool:
+        """
+        :return: True if the source was changed or removed since the entry was written
+        """
+        if self.source is None:
+            return True
+        try:
+            stat = os.stat(self.source)
+        except OSError:
+            return True
+        return stat.st_mtime_ns != self.source_mtime_ns or stat.st_size != self.source_size
+
+
+class JsonFileCache:
+    """
+    Cache of parsed json-files in binary form, keyed on the absolute path of the source and the options it was parsed
+    with (backend, encoding, compression), and checked against the mtime and size of the source.
+    Each cache file holds a small length-prefixed header (version, path, mtime, size, options) followed by the parsed
+    value, so a stale entry is detected without reading the value. Values are read in one piece and deserialised from
+    memory, as marshal reads from files in small pieces.
+    The total size of the cache is tracked in memory from the first store on; only when it exceeds the maximum size,
+    the directory is scanned, stale entries and the least recently used entries are removed.
+    The "pickle" format executes code from the cache files when loading, so the cache directory must not be
+    writable by others.
+    """
+    VERSION = 2
+
+    def __init__(self,
+                 cache_dir: (str | PathLike) = None,
+                 max_size: int = DEFAULT_MAX_CACHE_SIZE,
+                 serialiser: str = "marshal"):
+        """
+        :param cache_dir: directory of the cache files, DEFAULT_CACHE_DIR if None
+        :param max_size: maximum total size of the cache files in bytes
+        :param serialiser: "marshal" or "pickle"
+        :raise JsonGeneralError: if the serialiser is unknown
+        """
+        if serialiser not in _SERIALISERS:
+            raise JsonGeneralError(f"Unknown serialiser '{serialiser}', must be one of {list(_SERIALISERS.keys())}")
+        self.cache_dir = os.path.abspath(str(cache_dir if cache_dir is not None else DEFAULT_CACHE_DIR))
+        self.max_size = max_size
+        self.serialiser = serialiser
+        self.__dump, self.__load = _SERIALISERS[serialiser]
+        # total size of the cache files, None until the directory was scanned by evict()
+        self.__total_size: int | None = None
+
+    def cache_file(self, filename: (str | PathLike), options: tuple = ()) -> str:
+        """
+        :param filename: json-file
+        :param options: the options the file is parsed with, e.g. (backend, encoding, compression)
+        :return: the path of the cache file for the json-file
+        """
+        key = hashlib.blake2b(repr((os.path.abspath(str(filename)), options)).encode(), digest_size=16).hexdigest()
+        return os.path.join(self.cache_dir, f"{key}.{self.serialiser}")
+
+    def load(self, filename: (str | PathLike), parse: Callable[[], object], options: tuple = ()) -> object:
+        """
+        Get the parsed content of a json-file from the cache, or parse it and cache the result.
+        :param filename: json-file
+        :param parse: function that parses the file, called if there is no up-to-date cache entry
+        :param options: the options parse uses, e.g. (backend, encoding, compression). Entries are only shared
+                        between loads with the same options. Must consist of str, int, float, bool and None
+        :return: the parsed content
+        """
+        source = os.path.abspath(str(filename))
+        stat = os.stat(source)
+        if stat.st_size < MIN_CACHED_FILE_SIZE:
+            return parse()
+        cache_file = self.cache_file(source, options)
+        try:
+            with open(cache_file, "rb") as file:
+                if _read_header(file, self.__load) == (self.VERSION, source, stat.st_mtime_ns, stat.st_size,
+                                                       options):
+                    value = self.__load(file.read())
+                    os.utime(cache_file)
+                    return value
+        except FileNotFoundError:
+            pass
+        except (OSError, EOFError, ValueError, TypeError, pickle.UnpicklingError) as e:
+            log_warning(f"Ignoring unreadable json cache file '{cache_file}': {e}")
+        value = parse()
+        self.store(source, stat, value, options)
+        return value
+
+    def store(self, source: str, stat: os.stat_result, value: object, options: tuple = ()):
+        """
+        Write the cache entry for a parsed file, then evict entries if the cache has grown too big.
+        :param source: absolute path of the json-file
+        :param stat: stat of the json-file before it was parsed
+        :param value: the parsed content
+        :param options: the options the file was parsed with
+        """
+        cache_file = self.cache_file(source, options)
+        try:
+            os.makedirs(self.cache_dir, mode=0o700, exist_ok=True)
+            fd, tmp_file = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+            try:
+                header = self.__dump((self.VERSION, source, stat.st_mtime_ns, stat.st_size, options))
+                with open(fd, "wb") as file:
+                    file.write(len(header).to_bytes(_HEADER_SIZE_BYTES, "little"))
+                    file.write(header)
+                    file.write(self.__dump(value))
+                    size = file.tell()
+                try:
+                    replaced_size = os.stat(cache_file).st_size
+                except FileNotFoundError:
+                    replaced_size = 0
+                os.replace(tmp_file, cache_file)
+            except BaseException:
+                os.remove(tmp_file)
+                raise
+        except (OSError, ValueError, pickle.PicklingError) as e:
+            log_warning(f"Cannot write json cache file '{cache_file}': {e}")
+            return
+        if self.__total_size is not None:
+            self.__total_size += size - replaced_size
+        if self.__total_size is None or self.__total_size > self.max_size:
+            self.evict()
+
+    def entries(self) -> list[JsonCacheEntry]:
+        """
+        :return: the entries of this cache, least recently used first
+        """
+        entries = []
+        if not os.path.isdir(self.cache_dir):
+            return entries
+        for name in os.listdir(self.cache_dir):
+            serialiser = name.rsplit(".", 1)[-1]
+            if serialiser not in _SERIALISERS:
+                continue
+            cache_file = os.path.join(self.cache_dir, name)
+            try:
+                stat = os.stat(cache_file)
+            except OSError:
+                continue
+            try:
+                with open(cache_file, "rb") as file:
+                    header = _read_header(file, _SERIALISERS[serialiser][1])
+                # entries written by other versions count as stale
+                source, source_mtime_ns, source_size = header[1:4] if header[0] == self.VERSION else (None, 0, 0)
+            except (OSError, EOFError, ValueError, TypeError, pickle.UnpicklingError):
+                # unreadable entries count as stale
+                source, source_mtime_ns, source_size = None, 0, 0
+            entries.append(JsonCacheEntry(cache_file, source, source_mtime_ns, source_size,
+                                          stat.st_size, stat.st_mtime))
+        return sorted(entries, key=lambda entry: entry.last_used)
+
+    def total_size(self) -> int:
+        """
+        :return: total size of the cache files in bytes
+        """
+        return sum(entry.size for entry in self.entries())
+
+    def evict(self, max_size: int = None) -> list[JsonCacheEntry]:
+        """
+        Remove stale entries, and the least recently used entries until the cache is no bigger than max_size.
+        This reads the header of every entry, store() only calls it when the cache has outgrown its maximum size.
+        :param max_size: maximum total size in bytes, the maximum size of the cache if None
+        :return: the removed entries
+        """
+        if max_size is None:
+            max_size = self.max_size
+        entries = self.entries()
+        total = sum(entry.size for entry in entries)
+        removed = []
+        for entry in entries:
+            if total <= max_size and not entry.is_stale():
+                continue
+            try:
+                os.remove(entry.cache_file)
+            except FileNotFoundError:
+                pass
+            total -= entry.size
+            removed.append(entry)
+        self.__total_size = total
+        return removed
+
+    def clear(self) -> int:
+        """
+        Remove all entries.
+        :return: number of removed entries
+        """
+        return len(self.evict(max_size=-1))
+
+
+_default_cache: JsonFileCache | None = None
+
+
+def enable_json_file_cache(cache_dir: (str | PathLike) = None,
+                           max_size: int = DEFAULT_MAX_CACHE_SIZE,
+                           serialiser: str = "marshal") -> JsonFileCache:
+    """
+    Opt in to caching the parsed content of json-files loaded with JsonObject(filename=...)/from_file().
+    :param cache_dir: directory of the cache files, DEFAULT_CACHE_DIR if None
+    :param max_size: maximum total size of the cache files in bytes
+    :param serialiser: "marshal" or "pickle"
+    :return: the cache now in use
+    """
+    global _default_cache
+    _default_cache = JsonFileCache(cache_dir=cache_dir, max_size=max_size, serialiser=serialiser)
+    return _default_cache
+
+
+def disable_json_file_cache():
+    """
+    Stop caching json-files. The cache files are kept.
+    """
+    global _default_cache
+    _default_cache = None
+
+
+def get_json_file_cache() -> JsonFileCache | None:
+    """
+    :return: the cache enabled with enable_json_file_cache(), or None
+    """
+    return _default_cache
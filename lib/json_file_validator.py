@@ -0,0 +1,267 @@
+# Repository:   https://github.com/Python-utilities
+# File Name:    lib/json_file_validator.py
+# Description:  parallel validation of many json files with a verdict cache
+#
+# Copyright (C) 2024 Dieter J Kybelksties <github@kybelksties.com>
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 59 Temple Place - Suite 330, Boston, MA  02111-1307, USA.
+#
+# @date: 2024-07-13
+# @author: Dieter J Kybelksties
+
+from __future__ import annotations
+import hashlib
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import cpu_count
+from os import PathLike
+
+this_dir = os.path.dirname(os.path.abspath(__file__))
+dk_lib_dir = os.path.abspath(f"{this_dir}/../../Python-utilities")
+if not os.path.isdir(dk_lib_dir):
+    raise FileNotFoundError(f"Library directory '{dk_lib_dir}' cannot be found")
+sys.path.insert(0, dk_lib_dir)
+
+# pylint: disable=wrong-import-position
+from lib.file_system_object import find, FileSystemObjectType
+from lib.json_backend import get_json_backend
+from lib.json_schema import JsonSchema
+from lib.logger import log_warning
+
+# below this number of files to parse, starting worker processes costs more than it saves
+MIN_FILES_FOR_PROCESS_POOL = 64
+
+
+class JsonFileVerdict:
+    """
+    Result of validating one json-file. For invalid files line, column and offset locate the error, if known.
+    Files that parse but violate the schema have the violations in schema_errors.
+    """
+
+    def __init__(self,
+                 path: str,
+                 valid: bool,
+                 message: str = None,
+                 line: int = None,
+                 column: int = None,
+                 offset: int = None,
+                 schema_errors: list[str] = None,
+                 from_cache: bool = False):
+        self.path = path
+        self.valid = valid
+        self.message = message
+        self.line = line
+        self.column = column
+        self.offset = offset
+        self.schema_errors = schema_errors
+        self.from_cache = from_cache
+
+    def __str__(self):
+        if self.valid:
+            return f"{self.path}: valid"
+        location = ""
+        if self.line is not None:
+            location = f"{self.line}:{self.column}:"
+        return f"{self.path}:{location} {self.message}"
+
+    def __repr__(self):
+        return f"JsonFileVerdict({self})"
+
+    def to_dict(self) -> dict:
+        return {"valid": self.valid, "message": self.message,
+                "line": self.line, "column": self.column, "offset": self.offset, "schema_errors": self.schema_errors}
+
+    @classmethod
+    def from_dict(cls, path: str, verdict: dict) -> JsonFileVerdict:
+        return JsonFileVerdict(path=path,
+                               valid=verdict["valid"],
+                               message=verdict.get("message"),
+                               line=verdict.get("line"),
+                               column=verdict.get("column"),
+                               offset=verdict.get("offset"),
+                               schema_errors=verdict.get("schema_errors"),
+                               from_cache=True)
+
+
+class JsonValidationCache:
+    """
+    Persistent mapping of (path, mtime, size, hash, schema, backend) to the verdict of the last validation.
+    Files with unchanged mtime and size are not read at all; files that were touched but have the same content
+    hash are not parsed again. Verdicts are only reused for the schema (digest) and the json backend they were made
+    with, as backends do not all accept the same documents.
+    """
+    VERSION = 1
+
+    def __init__(self, cache_file: (str | PathLike) = None):
+        self.cache_file = None if cache_file is None else str(cache_file)
+        self.entries: dict[str, dict] = {}
+        self.dirty = False
+        if self.cache_file is not None and os.path.isfile(self.cache_file):
+            try:
+                with open(self.cache_file, encoding="utf-8") as file:
+                    content = json.load(file)
+                if content.get("version") == self.VERSION:
+                    self.entries = content.get("entries", {})
+            except (OSError, ValueError, AttributeError) as e:
+                log_warning(f"Ignoring unreadable json validation cache '{self.cache_file}': {e}")
+
+    def lookup(self,
+               path: str,
+               stat: os.stat_result,
+               schema_digest: str = None,
+               backend: str = None) -> JsonFileVerdict | None:
+        """
+        Get the cached verdict for a file that has not been modified since it was validated.
+        :param path: absolute path of the file
+        :param stat: current stat of the file
+        :param schema_digest: digest of the schema the file is validated against, None for syntax only
+        :param backend: name of the json backend the file is parsed with
+        :return: the cached verdict, or None if the file is unknown or modified, or the schema or backend differs
+        """
+        entry = self.entries.get(path)
+        if entry is None or entry["mtime_ns"] != stat.st_mtime_ns or entry["size"] != stat.st_size \
+                or entry.get("schema") != schema_digest or entry.get("backend") != backend:
+            return None
+        return JsonFileVerdict.from_dict(path, entry["verdict"])
+
+    def known_hash(self, path: str, stat: os.stat_result, schema_digest: str = None, backend: str = None) -> str | None:
+        entry = self.entries.get(path)
+        if entry is None or entry["size"] != stat.st_size or entry.get("schema") != schema_digest \
+                or entry.get("backend") != backend:
+            return None
+        return entry["hash"]
+
+    def store(self,
+              verdict: JsonFileVerdict,
+              stat: os.stat_result,
+              content_hash: str,
+              schema_digest: str = None,
+              backend: str = None):
+        self.entries[verdict.path] = {"mtime_ns": stat.st_mtime_ns,
+                                      "size": stat.st_size,
+                                      "hash": content_hash,
+                                      "schema": schema_digest,
+                                      "backend": backend,
+                                      "verdict": verdict.to_dict()}
+        self.dirty = True
+
+    def save(self):
+        """
+        Write the cache file, if anything changed. The file is replaced atomically.
+        """
+        if self.cache_file is None or not self.dirty:
+            return
+        os.makedirs(os.path.dirname(os.path.abspath(self.cache_file)), exist_ok=True)
+        tmp_file = f"{self.cache_file}.{os.getpid()}.tmp"
+        with open(tmp_file, "w", encoding="utf-8") as file:
+            json.dump({"version": self.VERSION, "entries": self.entries}, file)
+        os.replace(tmp_file, self.cache_file)
+        self.dirty = False
+
+
+def _validate_json_file(job: tuple[str, str | None, str | None, JsonSchema | None]) \
+        -> tuple[JsonFileVerdict | None, str]:
+    """
+    Worker: parse one file, and check it against the schema if there is one.
+    :param job: tuple of (path, content-hash known from the cache or None, backend name or None, schema or None)
+    :return: tuple of the verdict (None if the content hash is unchanged) and the content hash
+    """
+    path, known_hash, backend, schema = job
+    try:
+        with open(path, "rb") as file:
+            content = file.read()
+    except OSError as e:
+        return JsonFileVerdict(path=path, valid=False, message=str(e)), ""
+    content_hash = hashlib.blake2b(content, digest_size=16).hexdigest()
+    if content_hash == known_hash:
+        return None, content_hash
+    try:
+        document = get_json_backend(backend).loads(content)
+    except json.JSONDecodeError as e:
+        return JsonFileVerdict(path=path, valid=False, message=e.msg,
+                               line=e.lineno, column=e.colno, offset=e.pos), content_hash
+    except (ValueError, RecursionError) as e:
+        return JsonFileVerdict(path=path, valid=False, message=str(e)), content_hash
+    if schema is not None:
+        schema_errors = schema.validate(document)
+        if schema_errors:
+            return JsonFileVerdict(path=path, valid=False, message=f"schema violation: {schema_errors[0]}",
+                                   schema_errors=schema_errors), content_hash
+    return JsonFileVerdict(path=path, valid=True), content_hash
+
+
+def validate_json_files(paths: (str | PathLike | list[str | PathLike]),
+                        workers: int = None,
+                        chunk_size: int = None,
+                        cache_file: (str | PathLike) = None,
+                        backend: str = None,
+                        schema: (JsonSchema | dict) = None) -> list[JsonFileVerdict]:
+    """
+    Validate all *.json files found in the given paths, in parallel, optionally against a schema.
+    :param paths: directories to search for json-files
+    :param workers: number of worker processes, default: number of cores, 1 to validate in this process
+    :param chunk_size: number of files handed to a worker at a time, default: files spread evenly in 4 rounds
+    :param cache_file: file to keep the verdicts in, so that unchanged files are skipped next time. No cache if None
+    :param backend: name of the json backend to parse with, default backend if None
+    :param schema: schema the files must conform to, syntax only if None
+    :return: a verdict per file, in the order in which the files were found
+    """
+    json_files = find(paths=paths, file_type_filter=FileSystemObjectType.FILE, name_patterns=r".*\.json")
+    if schema is not None and not isinstance(schema, JsonSchema):
+        schema = JsonSchema(schema)
+    schema_digest = None if schema is None else schema.digest
+    # resolve the default here, so that the workers and the cache agree on the backend
+    backend = str(get_json_backend(backend))
+    cache = JsonValidationCache(cache_file)
+    verdicts: dict[str, JsonFileVerdict] = {}
+    stats: dict[str, os.stat_result] = {}
+    jobs = []
+    for json_file in json_files:
+        try:
+            stats[json_file] = os.stat(json_file)
+        except OSError as e:
+            verdicts[json_file] = JsonFileVerdict(path=json_file, valid=False, message=str(e))
+            continue
+        cached = cache.lookup(json_file, stats[json_file], schema_digest, backend)
+        if cached is not None:
+            verdicts[json_file] = cached
+        else:
+            jobs.append((json_file, cache.known_hash(json_file, stats[json_file], schema_digest, backend), backend,
+                         schema))
+
+    if workers is None:
+        workers = cpu_count()
+    if workers <= 1 or len(jobs) < MIN_FILES_FOR_PROCESS_POOL:
+        results = (_validate_json_file(job) for job in jobs)
+        executor = None
+    else:
+        if chunk_size is None:
+            chunk_size = max(1, len(jobs) // (workers * 4))
+        executor = ProcessPoolExecutor(max_workers=workers)
+        results = executor.map(_validate_json_file, jobs, chunksize=chunk_size)
+    try:
+        for (json_file, _, _, _), (verdict, content_hash) in zip(jobs, results):
+            if verdict is None:
+                verdict = JsonFileVerdict.from_dict(json_file, cache.entries[json_file]["verdict"])
+            verdicts[json_file] = verdict
+            if content_hash:
+                cache.store(verdict, stats[json_file], content_hash, schema_digest, backend)
+    finally:
+        if executor is not None:
+            executor.shutdown()
+    cache.save()
+    return [verdicts[json_file] for json_file in json_files]
@@ -0,0 +1,158 @@
+# Repository:   https://github.com/Python-utilities
+# File Name:    lib/json_index.py
+# Description:  hash indexes on fields of the elements of json arrays
+#
+# Copyright (C) 2024 Dieter J Kybelksties <github@kybelksties.com>
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 59 Temple Place - Suite 330, Boston, MA  02111-1307, USA.
+#
+# @date: 2024-07-13
+# @author: Dieter J Kybelksties
+
+from __future__ import annotations
+import os
+import sys
+from bisect import insort
+
+this_dir = os.path.dirname(os.path.abspath(__file__))
+dk_lib_dir = os.path.abspath(f"{this_dir}/../../Python-utilities")
+if not os.path.isdir(dk_lib_dir):
+    raise FileNotFoundError(f"Library directory '{dk_lib_dir}' cannot be found")
+sys.path.insert(0, dk_lib_dir)
+
+# pylint: disable=wrong-import-position
+from lib.exceptions import JsonPathFormatError
+from lib.json_key_path import JsonKeyPath, JsonIndexKey
+from lib.json_query import get_relative
+
+_MISSING = object()
+
+
+def key_path_tokens(keys: (str | list | JsonKeyPath)) -> tuple[str | None, ...]:
+    """
+    Concrete tokens of a key-path: dict-keys, and list-indices as strings. '^' and '$' are None, as their position
+    depends on the list.
+    :param keys: key-path
+    :return: tuple of tokens
+    """
+    if not isinstance(keys, JsonKeyPath):
+        keys = JsonKeyPath(keys)
+    return tuple(None if isinstance(key, JsonIndexKey) and (key.is_start_symbol or key.is_end_symbol)
+                 else str(key.get()) for key in keys)
+
+
+class JsonArrayIndex:
+    """
+    Hash index of the elements of a json array by the value of one of their fields: field-value -> positions.
+    The index does not own the data: lookup() is handed the array and rebuilds the index if it is not the array the
+    index was built for, or if its length changed. Changes to the data are reported with notify(); changes of single
+    elements are re-indexed lazily on the next lookup, everything else that can move elements marks the whole index
+    for rebuild. Only hashable field values are indexed.
+    """
+
+    def __init__(self, array_path: (str | list | JsonKeyPath), field_path: (str | list | JsonKeyPath)):
+        """
+        :param array_path: concrete key-path of the array, without '^' or '$'
+        :param field_path: key-path of the indexed field, relative to the elements
+        :raise JsonPathFormatError: if array_path contains '^' or '$'
+        """
+        self.array_tokens = key_path_tokens(array_path)
+        if None in self.array_tokens:
+            raise JsonPathFormatError(path_string=str(array_path), extra_info="an index needs a concrete array-path")
+        self.field_path = str(JsonKeyPath(field_path))
+        self.field_keys = JsonKeyPath(field_path).key_list()
+        self.__array = None
+        self.__values: list = []
+        self.__entries: dict[object, list[int]] = {}
+        self.__stale: set[int] = set()
+
+    def __key(self, element: object) -> object:
+        value = get_relative(element, self.field_keys, _MISSING)
+        try:
+            hash(value)
+        except TypeError:
+            return _MISSING
+        return value
+
+    def rebuild(self, array: list):
+        """
+        Index all elements of the array.
+        :param array: the indexed array
+        """
+        self.__array = array
+        self.__values = [self.__key(element) for element in array]
+        self.__entries = {}
+        for position, value in enumerate(self.__values):
+            if value is not _MISSING:
+                self.__entries.setdefault(value, []).append(position)
+        self.__stale.clear()
+
+    def __reindex(self, position: int):
+        old_value = self.__values[position]
+        if old_value is not _MISSING:
+            positions = self.__entries[old_value]
+            positions.remove(position)
+            if not positions:
+                del self.__entries[old_value]
+        new_value = self.__key(self.__array[position])
+        self.__values[position] = new_value
+        if new_value is not _MISSING:
+            insort(self.__entries.setdefault(new_value, []), position)
+
+    def lookup(self, array: list, value: object) -> list[int] | None:
+        """
+        Positions of the elements whose field equals value.
+        :param array: the indexed array, as found at the array-path
+        :param value: the field-value to look for
+        :return: sorted list of positions, or None if value cannot be looked up in a hash index
+        """
+        if array is not self.__array or len(array) != len(self.__values):
+            self.rebuild(array)
+        elif self.__stale:
+            for position in self.__stale:
+                if position < len(self.__values):
+                    self.__reindex(position)
+            self.__stale.clear()
+        try:
+            return list(self.__entries.get(value, []))
+        except TypeError:
+            return None
+
+    def notify(self, tokens: (tuple | list), structural: bool):
+        """
+        Report a change of the data at the given path.
+        :param tokens: concrete tokens of the changed path (see key_path_tokens()), None for unknown list positions
+        :param structural: True if lists on the path may have grown or shrunk (insert, remove, forced set),
+                           False if only the value at the path was replaced
+        """
+        if self.__array is None:
+            return
+        depth = len(tokens)
+        size = len(self.array_tokens)
+        for position in range(min(size, depth)):
+            token = tokens[position]
+            if token is None:
+                self.__array = None
+                return
+            if token != self.array_tokens[position]:
+                # inserting into or removing from a list above the array can move it
+                if structural and position == depth - 1 and self.array_tokens[position].isdigit():
+                    self.__array = None
+                return
+        if depth <= size or tokens[size] is None or not tokens[size].isdigit() or (structural and depth == size + 1):
+            # the array, or one of its ancestors, was replaced; or elements were inserted or removed
+            self.__array = None
+            return
+        self.__stale.add(int(tokens[size]))
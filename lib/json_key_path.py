@@ -23,11 +23,12 @@
 
 from __future__ import annotations
 
-import collections.abc
 import os
+import re
 import sys
 from abc import ABC, abstractmethod
-from typing import Iterable
+from functools import lru_cache
+from typing import Iterator
 
 this_dir = os.path.dirname(os.path.abspath(__file__))
 dk_lib_dir = os.path.abspath(f"{this_dir}/../../Python-utilities")
@@ -39,37 +40,89 @@ sys.path.insert(0, dk_lib_dir)
 from lib.basic_functions import is_empty_string
 from lib.exceptions import JsonPathFormatError, JsonMalformedIndex, JsonMalformedStringKey, \
     JsonMalformedKey
-from lib.string_utils import matches_any
+
+# whitespace at front or back, newlines, '/', '[', ']' and '"' are not allowed in string keys
+_MALFORMED_STRING_KEY_RE = re.compile(r'^[ \t]|[ \t]$|[\n/\[\]"]')
+
+# keys are immutable, so equal keys can be shared: indices below this limit and string keys are interned
+INTERNED_INDEX_LIMIT = 1024
+MAX_INTERNED_STRING_KEYS = 65536
+# number of parsed key-paths kept, by their string or list form
+KEY_PATH_CACHE_SIZE = 4096
 
 
 class JsonKey(ABC):
+    """
+    Immutable, hashable key of a JsonKeyPath. Equal keys are equal objects, most of the time even the same object.
+    """
+    __slots__ = ()
+
     @abstractmethod
     def get(self) -> int | str:
         pass
 
+    def __setattr__(self, name, value):
+        raise AttributeError(f"{type(self).__name__} is immutable")
+
+    def __delattr__(self, name):
+        raise AttributeError(f"{type(self).__name__} is immutable")
+
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return self
+
 
 class JsonIndexKey(JsonKey):
     START_SYMBOL = -1
     END_SYMBOL = -2
-    def __init__(self, index: (str | int)):
-        self.is_start_symbol = False
-        self.is_end_symbol = False
-        self.index = None
+    __slots__ = ("is_start_symbol", "is_end_symbol", "index")
+    # the slots are written once in __new__ through object.__setattr__, declared here for type checkers and pylint
+    is_start_symbol: bool
+    is_end_symbol: bool
+    index: int | None
+    __interned: dict[str | int, JsonIndexKey] = {}
+
+    def __new__(cls, index: (str | int)):
+        key = cls.__interned.get(index)
+        if key is not None:
+            return key
+        is_start_symbol = False
+        is_end_symbol = False
+        int_index = None
         if isinstance(index, str):
             if index == "^":
-                self.is_start_symbol = True
+                is_start_symbol = True
             elif index == "$":
-                self.is_end_symbol = True
+                is_end_symbol = True
             else:
                 try:
-                    self.index = int(index)
+                    int_index = int(index)
                 except ValueError:
                     raise JsonMalformedIndex(index) from ValueError
         else:
-            self.index = index
+            int_index = index
 
-        if self.index is not None and self.index < 0:
-            raise JsonMalformedIndex(self.index)
+        if int_index is not None and int_index < 0:
+            raise JsonMalformedIndex(int_index)
+        interned = int_index is None or int_index < INTERNED_INDEX_LIMIT
+        key = cls.__interned.get(int_index) if interned and int_index is not None else None
+        if key is None:
+            key = super().__new__(cls)
+            object.__setattr__(key, "is_start_symbol", is_start_symbol)
+            object.__setattr__(key, "is_end_symbol", is_end_symbol)
+            object.__setattr__(key, "index", int_index)
+        if interned:
+            # by the canonical given form ("7" or 7) and by the int, so that both forms share the key
+            if int_index is None or index == str(int_index):
+                cls.__interned[index] = key
+            if int_index is not None:
+                cls.__interned[int_index] = key
+        return key
+
+    def __reduce__(self):
+        return JsonIndexKey, ("^" if self.is_start_symbol else "$" if self.is_end_symbol else self.index,)
 
     def __str__(self):
         if self.is_start_symbol:
@@ -78,6 +131,20 @@ class JsonIndexKey(JsonKey):
             return "[$]"
         return f"[{self.index}]"
 
+    def __repr__(self):
+        return f"JsonIndexKey({self})"
+
+    def __eq__(self, other):
+        if not isinstance(other, JsonIndexKey):
+            return NotImplemented
+        return (self.index == other.index and self.is_start_symbol == other.is_start_symbol
+                and self.is_end_symbol == other.is_end_symbol)
+
+    def __hash__(self):
+        if self.index is None:
+            return hash(self.START_SYMBOL if self.is_start_symbol else self.END_SYMBOL)
+        return hash(self.index)
+
     def get(self) -> int | str:
         """
         Get the list index as int.
@@ -88,7 +155,6 @@ class JsonIndexKey(JsonKey):
             return 0
         return int(self.index)
 
-
     def extend_object(self, list_container: list, element: object) -> list:
         """
         Extend the list by inserting or appending elements depending on index/start-/end-values.
@@ -106,23 +172,41 @@ class JsonIndexKey(JsonKey):
             list_container.append(element)
         return list_container
 
+
 class JsonStringKey(JsonKey):
-    def __init__(self, key: str):
-        if is_empty_string(key):
-            raise JsonMalformedStringKey(key)
-        if matches_any(search_string=key, patterns=[".* $", ".*\t$",
-                                                    "^ .*", "^\t.*",
-                                                    ".*\n.*",
-                                                    ".*/.*",
-                                                    r".*\[.*",
-                                                    r".*\].*",
-                                                    r".*\".*"]):
+    __slots__ = ("key",)
+    key: str
+    __interned: dict[str, JsonStringKey] = {}
+
+    def __new__(cls, key: str):
+        interned = cls.__interned.get(key)
+        if interned is not None:
+            return interned
+        if is_empty_string(key) or _MALFORMED_STRING_KEY_RE.search(key) is not None:
             raise JsonMalformedStringKey(key=key)
-        self.key = key
+        interned = super().__new__(cls)
+        object.__setattr__(interned, "key", key)
+        if len(cls.__interned) < MAX_INTERNED_STRING_KEYS:
+            cls.__interned[key] = interned
+        return interned
+
+    def __reduce__(self):
+        return JsonStringKey, (self.key,)
 
     def __str__(self):
         return self.key
 
+    def __repr__(self):
+        return f"JsonStringKey({self.key})"
+
+    def __eq__(self, other):
+        if not isinstance(other, JsonStringKey):
+            return NotImplemented
+        return self.key == other.key
+
+    def __hash__(self):
+        return hash(self.key)
+
     def get(self) -> int | str:
         """
         Get the dict key as str.
@@ -131,54 +215,97 @@ class JsonStringKey(JsonKey):
         return str(self.key)
 
 
-class JsonKeyPath(collections.abc.Sized, ABC, Iterable[JsonKey]):
-    def __init__(self, key_path: (str | list) = None):
-        self.list_of_keys = []
-        if isinstance(key_path, str):
-            key_path = key_path.split("/")
-        if len(key_path) == 0:
-            raise JsonPathFormatError(path_string="<EMPTY-PATH!!>")
-        for partial in key_path:
-            if not isinstance(partial, (str | int)):
-                raise JsonPathFormatError(path_string="/".join(key_path),
+@lru_cache(maxsize=KEY_PATH_CACHE_SIZE)
+def _parse_key_path(key_path: (str | tuple)) -> tuple[JsonKey, ...]:
+    if isinstance(key_path, str):
+        key_path = key_path.split("/")
+    if len(key_path) == 0:
+        raise JsonPathFormatError(path_string="<EMPTY-PATH!!>")
+    keys = []
+    for partial in key_path:
+        try:
+            if isinstance(partial, str):
+                if partial.startswith("[") and partial.endswith("]"):
+                    keys.append(JsonIndexKey(partial[1:len(partial) - 1]))
+                else:
+                    keys.append(JsonStringKey(partial))
+            elif isinstance(partial, int):
+                keys.append(JsonStringKey(str(partial)))
+            elif isinstance(partial, JsonKey):
+                keys.append(partial)
+            else:
+                raise JsonPathFormatError(path_string="/".join(str(p) for p in key_path),
                                           extra_info="All elements in key-path list must be of type string or int, "
                                                      f"but type({partial}) is {type(partial)}")
+        except JsonMalformedKey as e:
+            raise JsonPathFormatError(path_string="/".join(str(p) for p in key_path), extra_info=e.message) from e
+    return tuple(keys)
+
+
+class JsonKeyPath:
+    """
+    Immutable, hashable path of JsonKeys, backed by a tuple. Parsed paths are cached, so building the same path again
+    is a dict lookup, and the keys are shared between paths.
+    """
+    __slots__ = ("keys", "_hash")
+    keys: tuple[JsonKey, ...]
+    _hash: int | None
+
+    def __init__(self, key_path: (str | list | tuple | JsonKeyPath) = None):
+        if isinstance(key_path, JsonKeyPath):
+            keys = key_path.keys
+        else:
             try:
-                if isinstance(partial, str) and partial.startswith("[") and partial.endswith("]"):
-                    partial = partial[1:len(partial) - 1]
-                    self.list_of_keys.append(JsonIndexKey(partial))
-                else:
-                    self.list_of_keys.append(JsonStringKey(str(partial)))
-            except JsonMalformedKey as e:
-                raise JsonPathFormatError(path_string="/".join(key_path), extra_info=e.message) from e
+                keys = _parse_key_path(key_path if isinstance(key_path, (str, tuple)) else tuple(key_path))
+            except TypeError as e:
+                # unhashable elements cannot be looked up in the cache, and are not allowed anyway
+                raise JsonPathFormatError(path_string=str(key_path),
+                                          extra_info="All elements in key-path list must be of type string or int"
+                                          ) from e
+        object.__setattr__(self, "keys", keys)
+        object.__setattr__(self, "_hash", None)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("JsonKeyPath is immutable")
+
+    def __reduce__(self):
+        return JsonKeyPath, (self.keys,)
+
+    @property
+    def list_of_keys(self) -> tuple[JsonKey, ...]:
+        return self.keys
 
     def __str__(self):
-        return "/".join([str(key) for key in self.list_of_keys])
+        return "/".join([str(key) for key in self.keys])
 
-    def __sizeof__(self):
-        return len(self.list_of_keys)
+    def __repr__(self):
+        return f"JsonKeyPath({self})"
 
     def __getitem__(self, item):
-        return self.list_of_keys[item]
+        return self.keys[item]
 
-    def __iter__(self):
-        for key in self.list_of_keys:
-            yield key
+    def __iter__(self) -> Iterator[JsonKey]:
+        return iter(self.keys)
 
     def __len__(self):
-        return len(self.list_of_keys)
+        return len(self.keys)
 
     def __contains__(self, item):
-        return item in self.list_of_keys
+        return item in self.keys
 
     def __eq__(self, other):
         if isinstance(other, JsonKeyPath):
-            return self.list_of_keys == other.list_of_keys
+            return self.keys == other.keys
         return False
 
-    def key_list(self):
+    def __hash__(self):
+        if self._hash is None:
+            object.__setattr__(self, "_hash", hash(self.keys))
+        return self._hash
+
+    def key_list(self) -> tuple[JsonKey, ...]:
         """
-        Get the list of keys.
-        :return: the list of keys.
+        Get the keys.
+        :return: the keys, as immutable tuple.
         """
-        return self.list_of_keys
+        return self.keys
@@ -27,6 +27,7 @@ import os
 import os.path
 import sys
 from os import PathLike
+from typing import Callable, Iterable, Iterator
 
 this_dir = os.path.dirname(os.path.abspath(__file__))
 dk_lib_dir = os.path.abspath(f"{this_dir}/../../Python-utilities")
@@ -36,116 +37,243 @@ sys.path.insert(0, dk_lib_dir)
 
 # pylint: disable=wrong-import-position
 from lib.basic_functions import is_empty_string
-from lib.exceptions import JsonGeneralError, JsonError, JsonKeyStringRequired, JsonIndexRequired, JsonValueMismatch
-from lib.file_system_object import find
-from lib.json_key_path import JsonKeyPath, JsonIndexKey, JsonStringKey
+from lib.exceptions import JsonGeneralError, JsonKeyStringRequired, JsonIndexRequired, JsonValueMismatch
+from lib.json_backend import JsonBackend, JsonBackendType, get_json_backend
+from lib.json_columns import records_to_columns
+from lib.json_file_cache import get_json_file_cache
+from lib.json_file_validator import validate_json_files
+from lib.json_index import JsonArrayIndex, key_path_tokens
+from lib.json_key_path import JsonKey, JsonKeyPath, JsonIndexKey, JsonStringKey
+from lib.json_patch import apply_json_patch, json_diff, split_json_pointer
+from lib.json_query import JsonQuery, get_relative
+from lib.json_schema import JsonSchema
+from lib.json_stream import iter_json_items, read_json_lines, write_json_lines
+from lib.json_writer import read_json_file, write_json_file
 from lib.logger import log_command
-from lib.string_utils import squeeze_chars, get_random_string
+from lib.string_utils import RandomStringGenerator
 
 
 class JsonObject:
     NOT_FOUND = None
+    __JSON_SCALAR_TYPES = (str, int, float, bool)
+    # os.urandom based, so that key_exists() does not consume the global random state
+    __KEY_SENTINEL_GENERATOR = RandomStringGenerator("0123456789ABCDEF", secure=True)
 
     def __init__(self,
                  json_str: (str | list) = None,
                  filename: (str | PathLike) = None,
-                 json_obj: (list | dict) = None):
+                 json_obj: (list | dict) = None,
+                 backend: (str | JsonBackendType | JsonBackend) = None,
+                 adopt: bool = False):
         self.json_: dict | list | None = None
+        self.indexes: dict[tuple, JsonArrayIndex] = {}
+        self.__frozen = False
+        self.__copy_on_write = False
+        # containers created by path-copying, which this object does not share; by id, kept alive so ids stay unique
+        self.__owned: dict[int, dict | list] = {}
         if json_str is not None:
-            if squeeze_chars(source=json_str, squeeze_set="\n\t\r ", replace_with=" ") == "":
+            if json_str.strip("\n\t\r ") == "":
                 json_str = "{}"
-            self.from_string(json_str)
+            self.from_string(json_str, backend=backend)
         elif not is_empty_string(filename):
-            self.from_file(filename)
+            self.from_file(filename, backend=backend)
         elif json_obj is not None:
-            self.from_object(json_obj)
+            self.from_object(json_obj, adopt=adopt)
         else:
             self.from_string("{}")
 
     def __str__(self):
-        return json.dumps(self.json_)
+        return get_json_backend().dumps(self.json_)
 
-    def to_str(self, indent: int = 2) -> str:
+    def to_str(self, indent: int = 2, backend: (str | JsonBackendType | JsonBackend) = None) -> str:
         """
         Output as a string.
         :param indent: number of indentations to use
+        :param backend: json backend to use, default backend if None
         :return: this object as a string
         """
-        return json.dumps(self.json_, indent=indent)
+        return get_json_backend(backend).dumps(self.json_, indent=indent)
 
-    def from_string(self, json_str: str):
+    def from_string(self, json_str: str, backend: (str | JsonBackendType | JsonBackend) = None):
         """
         Create a JsonObject from a string.
         :param json_str: the json string
+        :param backend: json backend to use, default backend if None
+        :raise JsonGeneralError: if this object is a snapshot
         """
+        self.__assert_not_frozen()
         if is_empty_string(json_str):
             json_str = "{}"
-        self.json_ = json.loads(json_str)
+        self.json_ = get_json_backend(backend).loads(json_str)
 
     @classmethod
     def convert_sets_to_vectors(cls, obj: object) -> object:
         """
-        Recursively convert sets to vectors.
+        Recursively convert sets and tuples to vectors, non-string dict-keys to strings and any other non-json
+        scalars to their string representation.
+        This is done in a single pass that copies the containers but not the scalars.
         :param obj: the object to convert
         :return: a copy of obj that can be used as a json-object
         """
-        if isinstance(obj, set):
-            # If it's a set, convert it to a list after doing the same recursively.
+        obj_type = type(obj)
+        if obj_type is dict:
+            return {str.__str__(key) if isinstance(key, str) else JsonObject.__json_key(key):
+                    JsonObject.convert_sets_to_vectors(value)
+                    for key, value in obj.items()}
+        if obj_type in (list, tuple, set, frozenset):
             return [JsonObject.convert_sets_to_vectors(item) for item in obj]
+        if obj_type in JsonObject.__JSON_SCALAR_TYPES or obj is None:
+            return obj
+        # subclasses of the json types, e.g. OrderedDict or IntEnum, are reduced to the plain type like json.dumps does
         if isinstance(obj, dict):
-            # If it's a dictionary, recursively process its values
-            return {key: JsonObject.convert_sets_to_vectors(value) for key, value in obj.items()}
-        if isinstance(obj, list):
-            # If it's a list, recursively process its elements
+            return {JsonObject.__json_key(key): JsonObject.convert_sets_to_vectors(value) for key, value in obj.items()}
+        if isinstance(obj, (list, tuple, set, frozenset)):
             return [JsonObject.convert_sets_to_vectors(item) for item in obj]
-        if isinstance(obj, tuple):
-            # If it's a tuple, recursively process its elements and convert to list
-            return [JsonObject.convert_sets_to_vectors(item) for item in obj]
-        # elif isinstance(obj, object):
-        #     # If it's a custom object, recursively process its attributes
-        #     for attr_name in dir(obj):
-        #         attr_value = getattr(obj, attr_name)
-        #         setattr(obj, attr_name, JsonObject.convert_sets_to_vectors(attr_value))
-        if not isinstance(obj, (bool, int, float, str)):
-            return str(obj)
-        return obj
+        if isinstance(obj, str):
+            return str.__str__(obj)
+        if isinstance(obj, int):
+            return int.__int__(obj)
+        if isinstance(obj, float):
+            return float.__float__(obj)
+        return str(obj)
 
-    def from_object(self, obj: object):
+    @classmethod
+    def __json_key(cls, key: object) -> str:
+        # same conversion of keys as json.dumps does
+        if isinstance(key, str):
+            return str.__str__(key)
+        if isinstance(key, bool):
+            return "true" if key else "false"
+        if key is None:
+            return "null"
+        if isinstance(key, (int, float)):
+            return json.dumps(key)
+        return str(key)
+
+    def from_object(self, obj: object, adopt: bool = False):
         """
         Create a JsonObject from an object.
         :param obj: the object to initialise this JsonObject with
+        :param adopt: if True, then obj is used as is without conversion or copy. Only use this when obj is
+                      guaranteed to be json-compatible (dicts with string keys, lists and json scalars) and is not
+                      changed elsewhere afterwards
+        :raise JsonGeneralError: if this object is a snapshot
         """
-        obj = JsonObject.convert_sets_to_vectors(obj)
-        self.from_string(json.dumps(obj))
+        self.__assert_not_frozen()
+        if adopt:
+            self.json_ = obj
+        else:
+            self.json_ = JsonObject.convert_sets_to_vectors(obj)
 
-    def from_file(self, filename: (str | PathLike), encoding: str = "utf-8"):
+    def from_file(self,
+                  filename: (str | PathLike),
+                  encoding: str = "utf-8",
+                  backend: (str | JsonBackendType | JsonBackend) = None,
+                  compression: str = "auto"):
         """
-        Initialize this JsonObject from a json-file.
+        Initialize this JsonObject from a json-file. If enable_json_file_cache() was called, the parsed content is
+        taken from the cache while the file is unchanged.
         :param filename: json-file
         :param encoding: encoding of the file
+        :param backend: json backend to use, default backend if None
+        :param compression: "gzip", "zstd", None, or "auto" to derive it from the extension (.gz, .zst)
+        :raise json.JSONDecodeError: if the file is not valid json
+        :raise JsonGeneralError: if the file does not exist or this object is a snapshot
         """
+        self.__assert_not_frozen()
         if not os.path.isfile(filename):
             raise JsonGeneralError(f"Cannot load json from file '{filename}': file does not exist")
-        with open(filename, encoding=encoding) as file:
-            try:
-                self.json_ = json.load(file)
-            except json.JSONDecodeError:
-                file.close()
-                raise
-            file.close()
-
-    def to_file(self, filename: (str | PathLike), indent: int = 4, encoding: str = "utf-8", dryrun: bool = False):
+        cache = get_json_file_cache()
+        if cache is None:
+            self.json_ = read_json_file(filename, compression=compression, encoding=encoding, backend=backend)
+        else:
+            backend = get_json_backend(backend)
+            self.json_ = cache.load(filename,
+                                    lambda: read_json_file(filename, compression=compression,
+                                                           encoding=encoding, backend=backend),
+                                    options=(str(backend), encoding, compression))
+
+    def to_file(self,
+                filename: (str | PathLike),
+                indent: int = 4,
+                encoding: str = "utf-8",
+                dryrun: bool = False,
+                backend: (str | JsonBackendType | JsonBackend) = None,
+                compact: bool = False,
+                canonical: bool = False,
+                compression: str = "auto"):
         """
-        Write this JsonObject to a json-file.
+        Write this JsonObject to a json-file. The file is replaced atomically, so it is never left truncated.
         :param filename: the output filename
         :param indent: number of indentation chars to use
         :param encoding: encoding of the file
         :param dryrun: whether to write the file, or only go through the motions
+        :param backend: json backend to use, default backend if None
+        :param compact: write without any whitespace, much faster than indented output for big documents
+        :param canonical: sorted keys and no whitespace, so that equal objects give identical files (for hashing)
+        :param compression: "gzip", "zstd", None, or "auto" to derive it from the extension (.gz, .zst)
         """
         log_command(f"JsonObject.to_file({filename})", dryrun=dryrun)
         if not dryrun:
-            with open(filename, 'w', encoding=encoding) as file:
-                json.dump(self.json_, file, indent=indent)
+            write_json_file(self.json_, filename, indent=indent, compact=compact, canonical=canonical,
+                            compression=compression, encoding=encoding, backend=backend)
+
+    @classmethod
+    def iter_from_file(cls,
+                       filename: (str | PathLike),
+                       prefix: (str | list) = None,
+                       encoding: str = "utf-8",
+                       backend: (str | JsonBackendType | JsonBackend) = None) -> Iterator[JsonObject]:
+        """
+        Stream the sub-objects at the given prefix out of a json-file, without loading the whole file.
+        :param filename: json-file
+        :param prefix: path of the sub-objects, may contain the wildcards '*' and '[*]', e.g. "items/[*]"
+        :param encoding: encoding of the file
+        :param backend: json backend to use, default backend if None
+        :return: generator of JsonObjects, one per matching sub-object
+        """
+        for value in iter_json_items(filename, prefix=prefix, encoding=encoding, backend=backend):
+            yield JsonObject(json_obj=value, adopt=True)
+
+    @classmethod
+    def iter_from_json_lines(cls,
+                             filename: (str | PathLike),
+                             predicate: Callable[[object], bool] = None,
+                             encoding: str = "utf-8",
+                             backend: (str | JsonBackendType | JsonBackend) = None) -> Iterator[JsonObject]:
+        """
+        Read a JSON Lines file line by line.
+        :param filename: JSON Lines file
+        :param predicate: if given, only lines for which the predicate returns True on the parsed value are yielded
+        :param encoding: encoding of the file
+        :param backend: json backend to use, default backend if None
+        :return: generator of JsonObjects, one per line
+        """
+        for value in read_json_lines(filename, predicate=predicate, encoding=encoding, backend=backend):
+            yield JsonObject(json_obj=value, adopt=True)
+
+    @classmethod
+    def to_json_lines(cls,
+                      filename: (str | PathLike),
+                      json_objects: Iterable[JsonObject | dict | list],
+                      mode: str = "w",
+                      encoding: str = "utf-8",
+                      dryrun: bool = False,
+                      backend: (str | JsonBackendType | JsonBackend) = None) -> int:
+        """
+        Write JsonObjects to a JSON Lines file, one per line.
+        :param filename: the output filename
+        :param json_objects: the objects to write, consumed one at a time
+        :param mode: 'w' to overwrite, 'a' to append
+        :param encoding: encoding of the file
+        :param dryrun: whether to write the file, or only go through the motions
+        :param backend: json backend to use, default backend if None
+        :return: number of lines written
+        """
+        log_command(f"JsonObject.to_json_lines({filename})", dryrun=dryrun)
+        if dryrun:
+            return 0
+        return write_json_lines(filename, json_objects, mode=mode, encoding=encoding, backend=backend)
 
     def empty(self, obj: object = None) -> bool:
         """
@@ -192,22 +320,23 @@ class JsonObject:
         return 0
 
     @classmethod
-    def assert_json_files_valid(cls, paths: (str | PathLike | list[str | PathLike])) -> tuple[
-        int, list[str | PathLike]]:
-        """ | PathLike
-        Assert that the given paths are valid and that the files are a json-files.
+    def assert_json_files_valid(cls,
+                                paths: (str | PathLike | list[str | PathLike]),
+                                workers: int = None,
+                                cache_file: (str | PathLike) = None,
+                                schema: (JsonSchema | dict) = None) -> tuple[int, list[str | PathLike]]:
+        """
+        Assert that the json-files in the given paths are valid. The files are parsed in parallel, see
+        validate_json_files() for the per-file error positions.
         :param paths: file-paths to check
+        :param workers: number of worker processes, default: number of cores
+        :param cache_file: file to keep verdicts in, so that unchanged files are skipped next time
+        :param schema: schema the files must conform to, syntax only if None
         :return: tuple of an error code and a list of invalid paths/files
         """
-        json_files = find(paths=paths, file_type_filter="f", name_patterns=r".*\.json")
-        failed_files = []
-        reval = 0
-        for json_file in json_files:
-            try:
-                JsonObject(filename=json_file)
-            except JsonError:
-                failed_files.append(json_file)
-                reval = -1
+        verdicts = validate_json_files(paths=paths, workers=workers, cache_file=cache_file, schema=schema)
+        failed_files = [verdict.path for verdict in verdicts if not verdict.valid]
+        reval = -1 if failed_files else 0
         return reval, failed_files
 
     def key_exists(self, keys: (str | list[str])):
@@ -216,7 +345,7 @@ class JsonObject:
         :param keys: path to a key
         :return: True if key exists, False otherwise
         """
-        not_exist_str = "KEY-DOES-NOT-EXIST-" + get_random_string(47, "0123456789ABCDEF")
+        not_exist_str = "KEY-DOES-NOT-EXIST-" + JsonObject.__KEY_SENTINEL_GENERATOR.string(47)
         if self.get(keys, default=not_exist_str) == not_exist_str:
             return False
         return True
@@ -292,6 +421,156 @@ class JsonObject:
                 raise JsonGeneralError(message=error_msg) from k
         return iterator
 
+    def query(self,
+              query: (str | JsonQuery),
+              project: (dict[str, str] | list[str]) = None,
+              with_paths: bool = False) -> list:
+        """
+        Find all values matching a query with wildcards, recursive descent, slices and filters, in one traversal.
+        See JsonQuery for the syntax. Compile the query once with JsonQuery(...) to reuse it.
+        Example: query("merge_requests/[?state==opened]", project={"title": "title", "author": "author/name"})
+        :param query: query string or compiled query
+        :param project: relative key-paths to extract from each match, ignored if query is compiled
+        :param with_paths: if True, return (key-path, value) tuples
+        :return: list of the matched (projected) values in document order
+        :raise JsonPathFormatError: if the query is malformed
+        """
+        if not isinstance(query, JsonQuery):
+            query = JsonQuery(query, project=project)
+        if with_paths:
+            return query.find_with_paths(self.json_, indexes=self.indexes)
+        return query.find(self.json_, indexes=self.indexes)
+
+    def to_columns(self,
+                   array_path: (str | list[str] | JsonKeyPath | None),
+                   fields: (list[str | JsonKeyPath] | dict[str, str | JsonKeyPath]),
+                   column_format: str = "auto") -> object:
+        """
+        Flatten the records of an array into typed columns, in one pass over the records.
+        Example: to_columns("merge_requests", ["id", "author.name", "state"]) gives a DataFrame with these columns
+        :param array_path: key-path of the array of records, the root if None
+        :param fields: field-specs relative to the records, as key-paths or dotted paths; or a dict mapping
+                       column-names to field-specs
+        :param column_format: "pandas", "numpy", "python" (dict of lists) or "auto" (first one installed)
+        :return: the columns, see records_to_columns()
+        :raise JsonGeneralError: if there is no array at array_path, or the format is not available
+        """
+        records = self.json_ if array_path is None else get_relative(self.json_, JsonKeyPath(array_path).key_list())
+        if not isinstance(records, list):
+            raise JsonGeneralError(f"to_columns({array_path}): value at path is not a list")
+        return records_to_columns(records, fields, column_format=column_format)
+
+    def create_index(self, array_path: (str | list[str] | JsonKeyPath), field_path: (str | list[str] | JsonKeyPath)):
+        """
+        Create a hash index on a field of the elements of an array, used by lookup() and by '==' filters of query().
+        The index is kept up to date by set(), set_many() and apply_patch(); after changing json_ directly, it is
+        only rebuilt if the array was replaced or changed its length.
+        Example: create_index("merge_requests", "author/name")
+        :param array_path: concrete key-path of the array, without '^' or '$'
+        :param field_path: key-path of the indexed field, relative to the elements
+        :raise JsonPathFormatError: if array_path contains '^' or '$'
+        """
+        index = JsonArrayIndex(array_path, field_path)
+        array = get_relative(self.json_, JsonKeyPath(array_path).key_list())
+        if isinstance(array, list):
+            index.rebuild(array)
+        self.indexes[(index.array_tokens, index.field_path)] = index
+
+    def drop_index(self, array_path: (str | list[str] | JsonKeyPath), field_path: (str | list[str] | JsonKeyPath)):
+        """
+        Remove an index created with create_index(), if it exists.
+        :param array_path: key-path of the array
+        :param field_path: key-path of the indexed field, relative to the elements
+        """
+        self.indexes.pop((key_path_tokens(array_path), str(JsonKeyPath(field_path))), None)
+
+    def lookup(self,
+               array_path: (str | list[str] | JsonKeyPath),
+               field_path: (str | list[str] | JsonKeyPath),
+               value: (bool | int | float | str)) -> list:
+        """
+        Find the elements of an array whose field has the given value, with the index on the field if there is one.
+        :param array_path: key-path of the array
+        :param field_path: key-path of the field, relative to the elements
+        :param value: value to look for
+        :return: list of the matching elements, empty if there are none or the array does not exist
+        """
+        array = get_relative(self.json_, JsonKeyPath(array_path).key_list())
+        if not isinstance(array, list):
+            return []
+        field_keys = JsonKeyPath(field_path).key_list()
+        index = self.indexes.get((key_path_tokens(array_path), str(JsonKeyPath(field_path))))
+        positions = None if index is None else index.lookup(array, value)
+        if positions is None:
+            missing = object()
+            return [element for element in array if get_relative(element, field_keys, missing) == value]
+        return [array[position] for position in positions]
+
+    def __notify_indexes(self, tokens: (tuple | list), structural: bool):
+        for index in self.indexes.values():
+            index.notify(tokens, structural=structural)
+
+    def validate(self, schema: (JsonSchema | dict)) -> list[str]:
+        """
+        Check this object against a schema. Compile the schema once with JsonSchema(...) to reuse it.
+        :param schema: compiled schema or schema as dict
+        :return: list of violations as "key-path: message", empty if the object is valid
+        :raise JsonSchemaError: if the schema is malformed
+        """
+        if not isinstance(schema, JsonSchema):
+            schema = JsonSchema(schema)
+        return schema.validate(self.json_)
+
+    def diff(self, other: (JsonObject | dict | list)) -> list[dict]:
+        """
+        Create the json-patch (RFC 6902) that turns this object into other. Identical sub-trees are skipped by hash.
+        :param other: the changed object
+        :return: list of patch operations, empty if the objects are equal
+        """
+        if isinstance(other, JsonObject):
+            other = other.json_
+        return json_diff(self.json_, other)
+
+    def apply_patch(self, patch: (list[dict] | JsonObject), dryrun: bool = False):
+        """
+        Apply a json-patch (RFC 6902) in place, touching only the containers on the paths of the operations.
+        :param patch: list of operations, as created by diff()
+        :param dryrun: if set to True then just go through the motions
+        :raise JsonGeneralError: if an operation fails; the operations before it remain applied
+        """
+        if isinstance(patch, JsonObject):
+            patch = patch.json_
+        self.__assert_not_frozen()
+        if not dryrun:
+            try:
+                self.json_ = apply_json_patch(self.json_,
+                                              patch,
+                                              before_operation=self.__copy_patch_paths if self.__copy_on_write else None)
+            finally:
+                if self.indexes:
+                    self.__notify_patched_paths(patch)
+
+    def __copy_patch_paths(self, document: object, operation: dict) -> object:
+        # copied per operation, as the containers on a path can change with the operations before, e.g. a move
+        self.json_ = document
+        if operation.get("op") != "test":
+            for pointer in (operation.get("path"), operation.get("from")):
+                if pointer is not None:
+                    self.__path_copy(split_json_pointer(pointer))
+        return self.json_
+
+    def __notify_patched_paths(self, patch: list[dict]):
+        for operation in patch:
+            op = operation.get("op")
+            if op == "test":
+                continue
+            paths = [operation.get("path", "")]
+            if op == "move":
+                paths.append(operation.get("from", ""))
+            for path in paths:
+                tokens = [None if token == "-" else token for token in split_json_pointer(path)]
+                self.__notify_indexes(tokens, structural=op != "replace")
+
     @classmethod
     def __assert_iterator_and_key_are_compatible(cls, default, iterator, key, key_index, keys):
         # check the key is compatible with the container
@@ -302,6 +581,84 @@ class JsonObject:
         if isinstance(iterator, dict) and not isinstance(key, JsonStringKey):
             raise JsonKeyStringRequired(key_index=key_index, keys=keys, json_obj=iterator)
 
+    @property
+    def frozen(self) -> bool:
+        """
+        Whether this object is an immutable snapshot.
+        """
+        return self.__frozen
+
+    def snapshot(self) -> JsonObject:
+        """
+        Get an immutable snapshot of this object in O(1): the snapshot shares all data with this object. From now on
+        this object copies the containers along the path of each change (copy-on-write), before changing them, so
+        that the snapshot keeps the state it was taken in. A container is only copied once per snapshot.
+        The data returned by get() must not be changed directly, as it can be shared.
+        :return: the immutable snapshot; this object itself, if it is a snapshot
+        """
+        if self.__frozen:
+            return self
+        snapshot = JsonObject(json_obj=self.json_, adopt=True)
+        JsonObject.__freeze(snapshot)
+        self.__share()
+        return snapshot
+
+    def derive(self) -> JsonObject:
+        """
+        Get a changeable copy of this object in O(1), that shares the data with this object. Both objects copy the
+        containers along the path of changes, see snapshot(). Thousands of variants of a big document can be derived
+        from one snapshot, costing only the memory for their changed paths.
+        :return: the new JsonObject
+        """
+        derived = JsonObject(json_obj=self.json_, adopt=True)
+        derived.__share()
+        if not self.__frozen:
+            self.__share()
+        return derived
+
+    def __freeze(self):
+        self.__frozen = True
+
+    def __share(self):
+        self.__copy_on_write = True
+        self.__owned.clear()
+
+    def __assert_not_frozen(self):
+        if self.__frozen:
+            raise JsonGeneralError("Cannot change a JsonObject snapshot, derive() a changeable copy")
+
+    def __own(self, container: dict | list) -> dict | list:
+        if self.__owned.get(id(container)) is container:
+            return container
+        container = dict(container) if isinstance(container, dict) else list(container)
+        self.__owned[id(container)] = container
+        return container
+
+    def __path_copy(self, keys: list[JsonKey | str]):
+        """
+        Shallow-copy the root and the containers along the path, up to the parent of the last key, unless they were
+        copied already, so that changes under the path do not affect objects sharing the data.
+        :param keys: list of JsonKeys, or of json-pointer tokens
+        """
+        if not isinstance(self.json_, (dict, list)):
+            return
+        self.json_ = node = self.__own(self.json_)
+        for key in keys[:-1]:
+            if isinstance(key, JsonIndexKey) and key.is_end_symbol:
+                key = len(node) - 1
+            elif isinstance(key, JsonKey):
+                key = key.get()
+            if isinstance(node, dict) and isinstance(key, str) and key in node:
+                index = key
+            elif isinstance(node, list) and str(key).isdigit() and int(key) < len(node):
+                index = int(key)
+            else:
+                return
+            child = node[index]
+            if not isinstance(child, (dict, list)):
+                return
+            node[index] = node = self.__own(child)
+
     def set(self,
             keys: (str | list[str] | JsonKeyPath),
             value: (bool | int | float | str | list | dict),
@@ -321,12 +678,36 @@ class JsonObject:
             raise JsonGeneralError(f"Unsupported json-value type {type(value)}")
         path = JsonKeyPath(keys)
         keys = path.key_list()
+        self.__assert_not_frozen()
 
         if not dryrun:
-            self.__change_root_or_raise(keys=keys, force=force)
-            if force:
-                self.__make_forced_path(keys=keys, value=value)
-            self.__set_impl(keys=keys, value=value, force=force)
+            try:
+                if self.__copy_on_write:
+                    self.__path_copy(keys)
+                self.__change_root_or_raise(keys=keys, force=force)
+                if force:
+                    self.__make_forced_path(keys=keys, value=value)
+                self.__set_impl(keys=keys, value=value, force=force)
+            finally:
+                if self.indexes:
+                    self.__notify_indexes(key_path_tokens(path), structural=force)
+
+    def set_many(self,
+                 values: (dict[str, bool | int | float | str | list | dict] |
+                          Iterable[tuple[str | list[str] | JsonKeyPath, bool | int | float | str | list | dict]]),
+                 force: bool = False,
+                 dryrun: bool = False):
+        """
+        Set several values in this JsonObject, in the given order.
+        :param values: dict of key-path -> value, or iterable of (key-path, value) tuples
+        :param force: if True, then force the paths to exist, before the values are set
+        :param dryrun: if set to false then just go through the motions
+        :raise JsonKeyStringRequired, JsonGeneralError: on compatibility problems; the values before remain set
+        """
+        if isinstance(values, dict):
+            values = values.items()
+        for keys, value in values:
+            self.set(keys, value, force=force, dryrun=dryrun)
 
     @classmethod
     def __get_absolute_index(cls, key_index: int, keys, json_obj, for_insert: bool):
@@ -392,8 +773,9 @@ class JsonObject:
             iterator.append(blank_object)
         else:
             abs_index = self.__get_absolute_index(key_index, keys, iterator, for_insert=True)
+            # a new blank per padded element: sharing one would make them change together
             for _ in range(abs_index - len(iterator) + 1):
-                iterator.append(blank_object)
+                iterator.append(type(blank_object)())
 
     def __set_impl(self, keys: JsonKeyPath, value: (bool | int | float | str | list | dict), force: bool):
         iterator = self.json_
@@ -0,0 +1,276 @@
+# Repository:   https://github.com/Python-utilities
+# File Name:    lib/json_patch.py
+# Description:  structural diff of json data as RFC 6902 json-patch, and patch application
+#
+# Copyright (C) 2024 Dieter J Kybelksties <github@kybelksties.com>
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 59 Temple Place - Suite 330, Boston, MA  02111-1307, USA.
+#
+# @date: 2024-07-13
+# @author: Dieter J Kybelksties
+
+from __future__ import annotations
+import copy
+import hashlib
+import os
+import sys
+from difflib import SequenceMatcher
+from typing import Callable
+
+this_dir = os.path.dirname(os.path.abspath(__file__))
+dk_lib_dir = os.path.abspath(f"{this_dir}/../../Python-utilities")
+if not os.path.isdir(dk_lib_dir):
+    raise FileNotFoundError(f"Library directory '{dk_lib_dir}' cannot be found")
+sys.path.insert(0, dk_lib_dir)
+
+# pylint: disable=wrong-import-position
+from lib.exceptions import JsonGeneralError
+
+
+def escape_pointer_token(token: (str | int)) -> str:
+    """
+    Escape a key for use in a json-pointer (RFC 6901).
+    :param token: dict-key or list-index
+    :return: the escaped token
+    """
+    return str(token).replace("~", "~0").replace("/", "~1")
+
+
+def split_json_pointer(pointer: str) -> list[str]:
+    """
+    Split a json-pointer (RFC 6901) into its unescaped tokens.
+    :param pointer: the json-pointer, "" for the whole document
+    :return: list of tokens
+    :raise JsonGeneralError: if the pointer is not empty and does not start with '/'
+    """
+    if pointer == "":
+        return []
+    if not pointer.startswith("/"):
+        raise JsonGeneralError(f"Json-pointer '{pointer}' must be empty or start with '/'")
+    return [token.replace("~1", "/").replace("~0", "~") for token in pointer[1:].split("/")]
+
+
+class _SubtreeHasher:
+    """
+    Content hashes of all sub-trees of a document, computed bottom-up once per node. Scalars are their own "hash",
+    so that only containers pay for a digest.
+    """
+
+    def __init__(self):
+        # keyed by id(): the documents outlive the hasher, so ids are not reused while it exists
+        self.__hashes: dict[int, bytes] = {}
+
+    def __call__(self, node: object) -> object:
+        if isinstance(node, dict):
+            digest = self.__hashes.get(id(node))
+            if digest is None:
+                hasher = hashlib.blake2b(b"{", digest_size=16)
+                for key, value in node.items():
+                    hasher.update(repr(key).encode())
+                    hasher.update(repr(self(value)).encode())
+                digest = self.__hashes[id(node)] = hasher.digest()
+            return digest
+        if isinstance(node, list):
+            digest = self.__hashes.get(id(node))
+            if digest is None:
+                hasher = hashlib.blake2b(b"[", digest_size=16)
+                for value in node:
+                    hasher.update(repr(self(value)).encode())
+                digest = self.__hashes[id(node)] = hasher.digest()
+            return digest
+        # keep True, 1 and 1.0 apart
+        return type(node).__name__, node
+
+
+def _diff_dict(source: dict, target: dict, pointer: str, hasher: _SubtreeHasher, patch: list[dict]):
+    for key in source:
+        if key not in target:
+            patch.append({"op": "remove", "path": f"{pointer}/{escape_pointer_token(key)}"})
+    for key, value in target.items():
+        path = f"{pointer}/{escape_pointer_token(key)}"
+        if key not in source:
+            patch.append({"op": "add", "path": path, "value": value})
+        else:
+            _diff(source[key], value, path, hasher, patch)
+
+
+def _diff_list(source: list, target: list, pointer: str, hasher: _SubtreeHasher, patch: list[dict]):
+    matcher = SequenceMatcher(a=[hasher(v) for v in source], b=[hasher(v) for v in target], autojunk=False)
+    # working from the back keeps the source indices of the regions in front valid
+    for tag, i1, i2, j1, j2 in reversed(matcher.get_opcodes()):
+        if tag == "equal":
+            continue
+        common = min(i2 - i1, j2 - j1)
+        for i in range(i2 - 1, i1 + common - 1, -1):
+            patch.append({"op": "remove", "path": f"{pointer}/{i}"})
+        for k in range(common):
+            _diff(source[i1 + k], target[j1 + k], f"{pointer}/{i1 + k}", hasher, patch)
+        for j in range(j1 + common, j2):
+            patch.append({"op": "add", "path": f"{pointer}/{i1 + j - j1}", "value": target[j]})
+
+
+def _diff(source: object, target: object, pointer: str, hasher: _SubtreeHasher, patch: list[dict]):
+    if hasher(source) == hasher(target):
+        return
+    if isinstance(source, dict) and isinstance(target, dict):
+        _diff_dict(source, target, pointer, hasher, patch)
+    elif isinstance(source, list) and isinstance(target, list):
+        _diff_list(source, target, pointer, hasher, patch)
+    else:
+        patch.append({"op": "replace", "path": pointer, "value": target})
+
+
+def json_diff(source: object, target: object) -> list[dict]:
+    """
+    Create the json-patch (RFC 6902) that turns source into target.
+    Every sub-tree is hashed once, so that identical sub-trees are skipped without descending into them. Lists are
+    matched element-wise by hash, so that insertions and removals do not turn into replacements of the whole tail.
+    The values in the patch are references into target, not copies.
+    :param source: the original json data
+    :param target: the changed json data
+    :return: list of patch operations, empty if source and target are equal
+    """
+    patch = []
+    _diff(source, target, "", _SubtreeHasher(), patch)
+    return patch
+
+
+def _resolve(document: object, tokens: list[str], pointer: str) -> object:
+    node = document
+    for token in tokens:
+        if isinstance(node, dict):
+            if token not in node:
+                raise JsonGeneralError(f"Json-pointer '{pointer}': key '{token}' does not exist")
+            node = node[token]
+        elif isinstance(node, list):
+            node = node[_list_index(node, token, pointer, for_insert=False)]
+        else:
+            raise JsonGeneralError(f"Json-pointer '{pointer}': cannot descend into '{node}'")
+    return node
+
+
+def _list_index(container: list, token: str, pointer: str, for_insert: bool) -> int:
+    if for_insert and token == "-":
+        return len(container)
+    if not token.isdigit() or (len(token) > 1 and token.startswith("0")):
+        raise JsonGeneralError(f"Json-pointer '{pointer}': '{token}' is not a valid list-index")
+    index = int(token)
+    if index > len(container) or (index == len(container) and not for_insert):
+        raise JsonGeneralError(f"Json-pointer '{pointer}': index {index} is out of range")
+    return index
+
+
+def _add(document: object, pointer: str, value: object) -> object:
+    tokens = split_json_pointer(pointer)
+    if not tokens:
+        return value
+    parent = _resolve(document, tokens[:-1], pointer)
+    if isinstance(parent, dict):
+        parent[tokens[-1]] = value
+    elif isinstance(parent, list):
+        parent.insert(_list_index(parent, tokens[-1], pointer, for_insert=True), value)
+    else:
+        raise JsonGeneralError(f"Json-pointer '{pointer}': cannot add to '{parent}'")
+    return document
+
+
+def _remove(document: object, pointer: str) -> tuple[object, object]:
+    tokens = split_json_pointer(pointer)
+    if not tokens:
+        raise JsonGeneralError("Cannot remove the whole document")
+    parent = _resolve(document, tokens[:-1], pointer)
+    if isinstance(parent, dict):
+        if tokens[-1] not in parent:
+            raise JsonGeneralError(f"Json-pointer '{pointer}': key '{tokens[-1]}' does not exist")
+        return document, parent.pop(tokens[-1])
+    if isinstance(parent, list):
+        return document, parent.pop(_list_index(parent, tokens[-1], pointer, for_insert=False))
+    raise JsonGeneralError(f"Json-pointer '{pointer}': cannot remove from '{parent}'")
+
+
+def _replace(document: object, pointer: str, value: object) -> object:
+    tokens = split_json_pointer(pointer)
+    if not tokens:
+        return value
+    parent = _resolve(document, tokens[:-1], pointer)
+    if isinstance(parent, dict):
+        if tokens[-1] not in parent:
+            raise JsonGeneralError(f"Json-pointer '{pointer}': key '{tokens[-1]}' does not exist")
+        parent[tokens[-1]] = value
+    elif isinstance(parent, list):
+        parent[_list_index(parent, tokens[-1], pointer, for_insert=False)] = value
+    else:
+        raise JsonGeneralError(f"Json-pointer '{pointer}': cannot replace in '{parent}'")
+    return document
+
+
+def _json_equal(first: object, second: object) -> bool:
+    # RFC 6902 "test": values of different json types are never equal (True is not 1), but 1 and 1.0 are
+    if first != second:
+        return False
+    if isinstance(first, bool) or isinstance(second, bool):
+        return isinstance(first, bool) and isinstance(second, bool)
+    if isinstance(first, dict):
+        return isinstance(second, dict) and all(_json_equal(value, second[key]) for key, value in first.items())
+    if isinstance(first, list):
+        return isinstance(second, list) and all(_json_equal(a, b) for a, b in zip(first, second))
+    return True
+
+
+def apply_json_patch(document: object,
+                     patch: list[dict],
+                     before_operation: Callable[[object, dict], object] = None) -> object:
+    """
+    Apply a json-patch (RFC 6902) in place. Only the containers on the paths of the operations are touched; values
+    taken from the patch are copied, so that the patch (and the document it was created from) is not aliased.
+    The operations are applied one by one: if one fails, the ones before it remain applied.
+    :param document: the json data to change
+    :param patch: list of operations with "op" one of add, remove, replace, move, copy and test
+    :param before_operation: if given, called with the document and each operation before the operation is applied;
+                             returns the document to apply the operation to
+    :return: the patched document; a new root only if an operation replaced the whole document
+    :raise JsonGeneralError: if an operation is malformed, a path does not exist or a test fails
+    """
+    for op_index, operation in enumerate(patch):
+        if before_operation is not None:
+            document = before_operation(document, operation)
+        try:
+            op = operation["op"]
+            path = operation["path"]
+            if op == "add":
+                document = _add(document, path, copy.deepcopy(operation["value"]))
+            elif op == "remove":
+                document, _ = _remove(document, path)
+            elif op == "replace":
+                document = _replace(document, path, copy.deepcopy(operation["value"]))
+            elif op == "move":
+                if path.startswith(operation["from"] + "/"):
+                    raise JsonGeneralError(f"Cannot move '{operation['from']}' into its own child '{path}'")
+                document, value = _remove(document, operation["from"])
+                document = _add(document, path, value)
+            elif op == "copy":
+                value = _resolve(document, split_json_pointer(operation["from"]), operation["from"])
+                document = _add(document, path, copy.deepcopy(value))
+            elif op == "test":
+                value = _resolve(document, split_json_pointer(path), path)
+                if not _json_equal(value, operation["value"]):
+                    raise JsonGeneralError(f"Test failed: '{path}' is '{value}', not '{operation['value']}'")
+            else:
+                raise JsonGeneralError(f"Unknown json-patch operation '{op}'")
+        except KeyError as e:
+            raise JsonGeneralError(f"Json-patch operation {op_index} '{operation}' is missing {e}") from e
+        except JsonGeneralError as e:
+            raise JsonGeneralError(f"Json-patch operation {op_index} failed: {e.message}") from e
+    return document
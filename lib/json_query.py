@@ -0,0 +1,406 @@
+# Repository:   https://github.com/Python-utilities
+# File Name:    lib/json_query.py
+# Description:  compiled wildcard/slice/filter queries over json objects
+#
+# Copyright (C) 2024 Dieter J Kybelksties <github@kybelksties.com>
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 59 Temple Place - Suite 330, Boston, MA  02111-1307, USA.
+#
+# @date: 2024-07-13
+# @author: Dieter J Kybelksties
+
+from __future__ import annotations
+import json
+import operator
+import os
+import re
+import sys
+from typing import Callable
+
+this_dir = os.path.dirname(os.path.abspath(__file__))
+dk_lib_dir = os.path.abspath(f"{this_dir}/../../Python-utilities")
+if not os.path.isdir(dk_lib_dir):
+    raise FileNotFoundError(f"Library directory '{dk_lib_dir}' cannot be found")
+sys.path.insert(0, dk_lib_dir)
+
+# pylint: disable=wrong-import-position
+from lib.exceptions import JsonPathFormatError
+from lib.json_key_path import JsonKey, JsonKeyPath, JsonIndexKey
+
+_MISSING = object()
+
+_SLICE_RE = re.compile(r"^\[(-?\d*):(-?\d*)(?::(-?\d*))?\]$")
+_FILTER_RE = re.compile(r"^\[\?\s*(?P<field>[^=!<>]+?)\s*(?:(?P<op>==|!=|<=|>=|<|>)\s*(?P<value>.+?))?\s*\]$")
+
+_OPERATORS: dict[str, Callable[[object, object], bool]] = {
+    "==": operator.eq,
+    "!=": operator.ne,
+    "<": operator.lt,
+    "<=": operator.le,
+    ">": operator.gt,
+    ">=": operator.ge,
+}
+
+
+def split_query(query: str) -> list[str]:
+    """
+    Split a query string at the '/' separators that are not inside brackets, so that filters can use sub-paths.
+    :param query: the query string
+    :return: list of the query parts
+    """
+    parts = []
+    depth = 0
+    start = 0
+    for i, c in enumerate(query):
+        if c == "[":
+            depth += 1
+        elif c == "]":
+            depth -= 1
+        elif c == "/" and depth == 0:
+            parts.append(query[start:i])
+            start = i + 1
+    parts.append(query[start:])
+    return parts
+
+
+def get_relative(node: object, keys: list[JsonKey], default: object = None) -> object:
+    """
+    Follow a list of keys from a node of a json-object without any of the compatibility checks of JsonObject.get().
+    :param node: dict/list/scalar to start from
+    :param keys: list of keys
+    :param default: returned if the path does not exist in node
+    :return: the value at the end of the path, or the default
+    """
+    for key in keys:
+        if isinstance(key, JsonIndexKey):
+            if not isinstance(node, list) or len(node) == 0:
+                return default
+            if key.is_start_symbol:
+                node = node[0]
+            elif key.is_end_symbol:
+                node = node[-1]
+            elif key.index < len(node):
+                node = node[key.index]
+            else:
+                return default
+        else:
+            if not isinstance(node, dict):
+                return default
+            node = node.get(key.key, _MISSING)
+            if node is _MISSING:
+                return default
+    return node
+
+
+class _QueryStep:
+    """
+    One step of a compiled query. select() yields the (path-element, child) pairs of a node that the step matches.
+    """
+    recursive = False
+
+    def select(self, node: object):
+        raise NotImplementedError
+
+
+class _KeyStep(_QueryStep):
+    def __init__(self, key: str):
+        self.key = key
+
+    def select(self, node: object):
+        if isinstance(node, dict):
+            child = node.get(self.key, _MISSING)
+            if child is not _MISSING:
+                yield self.key, child
+
+    def __str__(self):
+        return self.key
+
+
+class _AnyKeyStep(_QueryStep):
+    def select(self, node: object):
+        if isinstance(node, dict):
+            yield from node.items()
+
+    def __str__(self):
+        return "*"
+
+
+class _IndexStep(_QueryStep):
+    def __init__(self, key: JsonIndexKey):
+        self.key = key
+
+    def select(self, node: object):
+        if isinstance(node, list) and len(node) > 0:
+            if self.key.is_start_symbol:
+                yield 0, node[0]
+            elif self.key.is_end_symbol:
+                yield len(node) - 1, node[-1]
+            elif self.key.index < len(node):
+                yield self.key.index, node[self.key.index]
+
+    def __str__(self):
+        return str(self.key)
+
+
+class _AnyIndexStep(_QueryStep):
+    def select(self, node: object):
+        if isinstance(node, list):
+            yield from enumerate(node)
+
+    def __str__(self):
+        return "[*]"
+
+
+class _SliceStep(_QueryStep):
+    def __init__(self, start: int | None, stop: int | None, step: int | None):
+        if step == 0:
+            raise ValueError("slice step cannot be zero")
+        self.slice = slice(start, stop, step)
+
+    def select(self, node: object):
+        if isinstance(node, list):
+            for index in range(*self.slice.indices(len(node))):
+                yield index, node[index]
+
+    def __str__(self):
+        s = self.slice
+        step = "" if s.step is None else f":{s.step}"
+        return f"[{'' if s.start is None else s.start}:{'' if s.stop is None else s.stop}{step}]"
+
+
+class _FilterStep(_QueryStep):
+    """
+    Selects the list elements for which a sub-path exists (no operator), or compares to a json literal.
+    """
+
+    def __init__(self, field: str, op: str | None, value: object):
+        self.field = field
+        self.field_keys = JsonKeyPath(field).key_list()
+        self.field_path = str(JsonKeyPath(field))
+        self.op = op
+        self.compare = _OPERATORS.get(op)
+        self.value = value
+
+    def matches(self, element: object) -> bool:
+        field_value = get_relative(element, self.field_keys, _MISSING)
+        if field_value is _MISSING:
+            return False
+        if self.compare is None:
+            return True
+        try:
+            return self.compare(field_value, self.value)
+        except TypeError:
+            return False
+
+    def select(self, node: object):
+        if isinstance(node, list):
+            for index, element in enumerate(node):
+                if self.matches(element):
+                    yield index, element
+
+    def select_indexed(self, node: object, index) -> list | None:
+        """
+        Select the matching elements of node with a JsonArrayIndex on the filter field.
+        :return: list of (index, element) pairs, or None if the index cannot answer this filter
+        """
+        if self.op != "==" or not isinstance(node, list):
+            return None
+        positions = index.lookup(node, self.value)
+        if positions is None:
+            return None
+        return [(position, node[position]) for position in positions if self.matches(node[position])]
+
+    def __str__(self):
+        if self.op is None:
+            return f"[?{self.field}]"
+        return f"[?{self.field}{self.op}{json.dumps(self.value)}]"
+
+
+class _DescendStep(_QueryStep):
+    """
+    '**': zero or more levels of any key or index.
+    """
+    recursive = True
+
+    def select(self, node: object):
+        if isinstance(node, dict):
+            yield from node.items()
+        elif isinstance(node, list):
+            yield from enumerate(node)
+
+    def __str__(self):
+        return "**"
+
+
+def _parse_literal(text: str) -> object:
+    try:
+        return json.loads(text)
+    except ValueError:
+        # bare words are taken as strings, e.g. [?state==opened]
+        return text.strip("'")
+
+
+def _compile_step(part: str, query: str) -> _QueryStep:
+    if part == "*":
+        return _AnyKeyStep()
+    if part == "**":
+        return _DescendStep()
+    if part == "[*]":
+        return _AnyIndexStep()
+    match = _SLICE_RE.match(part)
+    if match is not None:
+        start, stop, step = (int(v) if v not in (None, "") else None for v in match.groups())
+        try:
+            return _SliceStep(start, stop, step)
+        except ValueError as e:
+            raise JsonPathFormatError(path_string=query, extra_info=str(e)) from e
+    if part.startswith("[?"):
+        match = _FILTER_RE.match(part)
+        if match is None:
+            raise JsonPathFormatError(path_string=query, extra_info=f"malformed filter '{part}'")
+        value = None if match.group("op") is None else _parse_literal(match.group("value"))
+        try:
+            return _FilterStep(match.group("field"), match.group("op"), value)
+        except JsonPathFormatError as e:
+            raise JsonPathFormatError(path_string=query, extra_info=e.message) from e
+    try:
+        key = JsonKeyPath([part])[0]
+    except JsonPathFormatError as e:
+        raise JsonPathFormatError(path_string=query, extra_info=f"invalid query part '{part}'") from e
+    if isinstance(key, JsonIndexKey):
+        return _IndexStep(key)
+    return _KeyStep(key.get())
+
+
+class JsonQuery:
+    """
+    A query over json-objects, compiled once and reusable for any number of documents.
+    In addition to the keys of a JsonKeyPath a query can contain
+    — '*':           any key of an object
+    — '[*]':         any index of a list
+    — '**':          any number of levels (recursive descent)
+    — '[start:stop:step]': a python-style slice of a list
+    — '[?field]', '[?field<op>literal]': list elements whose sub-path exists, or compares with ==, !=, <, <=, >, >=
+                     to a json literal (bare words are strings), e.g. "merge_requests/[?author/name==Bob]/title"
+    The document is traversed once, following only the branches that can still match.
+    """
+
+    def __init__(self, query: str, project: (dict[str, str] | list[str]) = None):
+        """
+        Compile a query.
+        :param query: the query string
+        :param project: optional projection: relative key-paths (or a dict mapping result-names to relative key-paths)
+                        to extract from each match. Missing fields are None.
+        :raise JsonPathFormatError: if the query is malformed
+        """
+        self.query = query
+        parts = split_query(query) if query not in (None, "") else []
+        self.steps = [_compile_step(part, query) for part in parts]
+        if isinstance(project, list):
+            project = {field: field for field in project}
+        self.projection = None
+        if project is not None:
+            self.projection = {name: JsonKeyPath(path).key_list() for name, path in project.items()}
+
+    def __str__(self):
+        return "/".join(str(step) for step in self.steps)
+
+    def __closure(self, states: set[int]) -> set[int]:
+        # a recursive step can also match zero levels
+        closure = set(states)
+        for state in sorted(states):
+            while state < len(self.steps) and self.steps[state].recursive:
+                state += 1
+                closure.add(state)
+        return closure
+
+    def __evaluate(self, node: object, states: set[int], path: tuple, results: list, indexes: dict):
+        if len(self.steps) in states:
+            results.append((path, node))
+        if not isinstance(node, (dict, list)):
+            return
+        child_states: dict = {}
+        children: dict = {}
+        open_states = [state for state in states if state < len(self.steps)]
+        for state in open_states:
+            step = self.steps[state]
+            selected = None
+            if indexes and isinstance(step, _FilterStep):
+                index = indexes.get((tuple(str(p) for p in path), step.field_path))
+                if index is not None:
+                    selected = step.select_indexed(node, index)
+            for key, child in step.select(node) if selected is None else selected:
+                next_states = child_states.get(key)
+                if next_states is None:
+                    next_states = child_states[key] = set()
+                    children[key] = child
+                next_states.add(state + 1)
+                if step.recursive:
+                    next_states.add(state)
+        # a single step keeps its own order (e.g. reversed slices), otherwise children are visited in document order
+        if len(open_states) <= 1 or len(children) <= 1:
+            keys = list(children.keys())
+        elif isinstance(node, list):
+            keys = sorted(children.keys())
+        else:
+            keys = [key for key in node if key in children]
+        for key in keys:
+            self.__evaluate(children[key], self.__closure(child_states[key]), path + (key,), results, indexes)
+
+    def __project(self, value: object) -> object:
+        if self.projection is None:
+            return value
+        return {name: get_relative(value, keys) for name, keys in self.projection.items()}
+
+    def find_with_paths(self, obj: object, indexes: dict = None) -> list[tuple[str, object]]:
+        """
+        Evaluate the query.
+        :param obj: json data (dict/list) or a JsonObject
+        :param indexes: JsonArrayIndex objects by (array-path tokens, field-path) to answer '==' filters with,
+                        the indexes of obj if it is a JsonObject
+        :return: list of (key-path string, matched/projected value) in document order
+        """
+        results = self.__run(obj, indexes)
+        return [("/".join(f"[{p}]" if isinstance(p, int) else p for p in path), self.__project(value))
+                for path, value in results]
+
+    def find(self, obj: object, indexes: dict = None) -> list:
+        """
+        Evaluate the query.
+        :param obj: json data (dict/list) or a JsonObject
+        :param indexes: JsonArrayIndex objects by (array-path tokens, field-path) to answer '==' filters with,
+                        the indexes of obj if it is a JsonObject
+        :return: list of matched/projected values in document order
+        """
+        return [self.__project(value) for _, value in self.__run(obj, indexes)]
+
+    def __run(self, obj: object, indexes: dict) -> list[tuple[tuple, object]]:
+        if hasattr(obj, "json_"):
+            if indexes is None:
+                indexes = getattr(obj, "indexes", None)
+            obj = obj.json_
+        results = []
+        self.__evaluate(obj, self.__closure({0}), (), results, indexes)
+        return results
+
+    def first(self, obj: object, default: object = None) -> object:
+        """
+        Evaluate the query and return the first match.
+        :param obj: json data (dict/list) or a JsonObject
+        :param default: returned if nothing matches
+        :return: the first matched/projected value, or the default
+        """
+        results = self.find(obj)
+        return results[0] if results else default
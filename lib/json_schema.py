@@ -0,0 +1,462 @@
+# Repository:   https://github.com/Python-utilities
+# File Name:    lib/json_schema.py
+# Description:  json-schema subset compiled to validator closures
+#
+# Copyright (C) 2024 Dieter J Kybelksties <github@kybelksties.com>
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 59 Temple Place - Suite 330, Boston, MA  02111-1307, USA.
+#
+# @date: 2024-07-13
+# @author: Dieter J Kybelksties
+
+
+from __future__ import annotations
+import hashlib
+import os
+import re
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import cpu_count
+from typing import Callable, Iterable, Optional
+
+this_dir = os.path.dirname(os.path.abspath(__file__))
+dk_lib_dir = os.path.abspath(f"{this_dir}/../../Python-utilities")
+if not os.path.isdir(dk_lib_dir):
+    raise FileNotFoundError(f"Library directory '{dk_lib_dir}' cannot be found")
+sys.path.insert(0, dk_lib_dir)
+
+# pylint: disable=wrong-import-position
+from lib.exceptions import JsonSchemaError
+from lib.json_writer import canonical_dumps
+
+# below this number of documents, pickling them to worker processes costs more than validating them here
+MIN_DOCUMENTS_FOR_PROCESS_POOL = 1024
+
+# keywords of json-schema that would change the verdict, but are not supported: refuse rather than ignore them
+_UNSUPPORTED_KEYWORDS = ("$ref", "allOf", "anyOf", "oneOf", "not", "if", "then", "else", "patternProperties",
+                         "dependencies", "dependentRequired", "dependentSchemas", "prefixItems", "contains",
+                         "propertyNames", "unevaluatedItems", "unevaluatedProperties", "additionalItems")
+
+_TYPE_PREDICATES = {
+    "object": lambda value: isinstance(value, dict),
+    "array": lambda value: isinstance(value, list),
+    "string": lambda value: isinstance(value, str),
+    "number": lambda value: isinstance(value, (int, float)) and not isinstance(value, bool),
+    "integer": lambda value: ((isinstance(value, int) and not isinstance(value, bool))
+                              or (isinstance(value, float) and value.is_integer())),
+    "boolean": lambda value: isinstance(value, bool),
+    "null": lambda value: value is None,
+}
+
+# a validator checks value and returns whether it is valid. If errors is a list, all violations are appended to it,
+# otherwise the validator stops at the first one. path is the stack of keys/indices leading to value.
+Validator = Callable[[object, list, Optional[list]], bool]
+
+
+def _json_type(value: object) -> str:
+    if value is None:
+        return "null"
+    if isinstance(value, bool):
+        return "boolean"
+    if isinstance(value, (int, float)):
+        return "number"
+    if isinstance(value, str):
+        return "string"
+    if isinstance(value, list):
+        return "array"
+    if isinstance(value, dict):
+        return "object"
+    return type(value).__name__
+
+
+def _format_path(path: list) -> str:
+    if not path:
+        return "(root)"
+    return "/".join(f"[{p}]" if isinstance(p, int) else p for p in path)
+
+
+def _fail(path: list, errors: list | None, message: str) -> bool:
+    if errors is not None:
+        errors.append(f"{_format_path(path)}: {message}")
+    return False
+
+
+def _enum_key(value: object) -> tuple:
+    """
+    Hashable key with json equality: 1 and 1.0 are equal, 1 and true are not.
+    """
+    if isinstance(value, bool):
+        return "boolean", value
+    if isinstance(value, (int, float)):
+        return "number", value
+    if isinstance(value, str):
+        return "string", value
+    if value is None:
+        return ("null",)
+    return "json", canonical_dumps(value)
+
+
+def _valid(value, path, errors) -> bool:  # pylint: disable=unused-argument
+    return True
+
+
+def _invalid(value, path, errors) -> bool:  # pylint: disable=unused-argument
+    return _fail(path, errors, "no value allowed")
+
+
+def _require(condition: bool, location: str, message: str):
+    if not condition:
+        raise JsonSchemaError(f"Invalid schema at '{location}': {message}")
+
+
+def _is_number(value: object) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def _is_count(value: object) -> bool:
+    return isinstance(value, int) and not isinstance(value, bool) and value >= 0
+
+
+def _compile_type(type_names: (str | list[str]), location: str) -> Validator:
+    names = [type_names] if isinstance(type_names, str) else list(type_names)
+    _require(len(names) > 0 and all(name in _TYPE_PREDICATES for name in names),
+             location, f"unknown type {type_names}, expected one of {list(_TYPE_PREDICATES)}")
+    predicates = tuple(_TYPE_PREDICATES[name] for name in names)
+    expected = " or ".join(names)
+    if len(predicates) == 1:
+        predicate = predicates[0]
+
+        def check_type(value, path, errors):
+            return predicate(value) or _fail(path, errors, f"expected {expected}, got {_json_type(value)}")
+    else:
+        def check_type(value, path, errors):
+            for predicate in predicates:
+                if predicate(value):
+                    return True
+            return _fail(path, errors, f"expected {expected}, got {_json_type(value)}")
+    return check_type
+
+
+def _compile_enum(values: list, location: str) -> Validator:
+    _require(isinstance(values, list), location, "'enum' must be a list")
+    keys = frozenset(_enum_key(value) for value in values)
+
+    def check_enum(value, path, errors):
+        return _enum_key(value) in keys or _fail(path, errors, f"{value!r} is not one of {values}")
+    return check_enum
+
+
+def _compile_const(const: object) -> Validator:
+    key = _enum_key(const)
+
+    def check_const(value, path, errors):
+        return _enum_key(value) == key or _fail(path, errors, f"{value!r} is not {const!r}")
+    return check_const
+
+
+def _compile_number(schema: dict, location: str) -> Validator | None:
+    bounds = []
+    for keyword, holds, relation in (("minimum", lambda v, b: v >= b, ">="),
+                                     ("maximum", lambda v, b: v <= b, "<="),
+                                     ("exclusiveMinimum", lambda v, b: v > b, ">"),
+                                     ("exclusiveMaximum", lambda v, b: v < b, "<")):
+        if keyword in schema:
+            _require(_is_number(schema[keyword]), location, f"'{keyword}' must be a number")
+            bounds.append((holds, schema[keyword], relation))
+    if not bounds:
+        return None
+    bounds = tuple(bounds)
+
+    def check_number(value, path, errors):
+        if not isinstance(value, (int, float)) or isinstance(value, bool):
+            return True
+        for holds, bound, relation in bounds:
+            if not holds(value, bound):
+                return _fail(path, errors, f"{value} is not {relation} {bound}")
+        return True
+    return check_number
+
+
+def _compile_string(schema: dict, location: str) -> Validator | None:
+    min_length = schema.get("minLength", 0)
+    max_length = schema.get("maxLength")
+    _require(_is_count(min_length), location, "'minLength' must be a non-negative integer")
+    _require(max_length is None or _is_count(max_length), location, "'maxLength' must be a non-negative integer")
+    pattern = None
+    if "pattern" in schema:
+        try:
+            pattern = re.compile(schema["pattern"])
+        except (re.error, TypeError) as e:
+            raise JsonSchemaError(f"Invalid schema at '{location}': bad 'pattern' {schema['pattern']!r}: {e}") from e
+    if min_length == 0 and max_length is None and pattern is None:
+        return None
+
+    def check_string(value, path, errors):
+        if not isinstance(value, str):
+            return True
+        valid = True
+        if len(value) < min_length or (max_length is not None and len(value) > max_length):
+            valid = _fail(path, errors, f"length {len(value)} is not in [{min_length}, {max_length}]")
+            if errors is None:
+                return False
+        if pattern is not None and pattern.search(value) is None:
+            valid = _fail(path, errors, f"{value!r} does not match '{pattern.pattern}'")
+        return valid
+    return check_string
+
+
+def _compile_array(schema: dict, location: str) -> Validator | None:
+    min_items = schema.get("minItems", 0)
+    max_items = schema.get("maxItems")
+    unique = schema.get("uniqueItems", False)
+    _require(_is_count(min_items), location, "'minItems' must be a non-negative integer")
+    _require(max_items is None or _is_count(max_items), location, "'maxItems' must be a non-negative integer")
+    items = None
+    if "items" in schema:
+        _require(isinstance(schema["items"], (dict, bool)), location, "only a single schema is supported for 'items'")
+        items = compile_schema(schema["items"], f"{location}/items")
+        if items is _valid:
+            items = None
+    if min_items == 0 and max_items is None and not unique and items is None:
+        return None
+
+    def check_array(value, path, errors):
+        if not isinstance(value, list):
+            return True
+        valid = True
+        if len(value) < min_items or (max_items is not None and len(value) > max_items):
+            valid = _fail(path, errors, f"{len(value)} items is not in [{min_items}, {max_items}]")
+            if errors is None:
+                return False
+        if unique and len({_enum_key(item) for item in value}) != len(value):
+            valid = _fail(path, errors, "items are not unique")
+            if errors is None:
+                return False
+        if items is not None:
+            for index, item in enumerate(value):
+                path.append(index)
+                if not items(item, path, errors):
+                    if errors is None:
+                        return False
+                    valid = False
+                path.pop()
+        return valid
+    return check_array
+
+
+def _compile_object(schema: dict, location: str) -> Validator | None:
+    properties = schema.get("properties", {})
+    required = schema.get("required", [])
+    additional = schema.get("additionalProperties", True)
+    min_properties = schema.get("minProperties", 0)
+    max_properties = schema.get("maxProperties")
+    _require(isinstance(properties, dict), location, "'properties' must be an object")
+    _require(isinstance(required, list) and all(isinstance(name, str) for name in required),
+             location, "'required' must be a list of strings")
+    _require(isinstance(additional, (dict, bool)), location, "'additionalProperties' must be a schema")
+    _require(_is_count(min_properties), location, "'minProperties' must be a non-negative integer")
+    _require(max_properties is None or _is_count(max_properties),
+             location, "'maxProperties' must be a non-negative integer")
+    property_validators = {name: compile_schema(sub_schema, f"{location}/properties/{name}")
+                           for name, sub_schema in properties.items()}
+    checked_properties = tuple((name, validator) for name, validator in property_validators.items()
+                               if validator is not _valid)
+    required = tuple(required)
+    additional = compile_schema(additional, f"{location}/additionalProperties")
+    if additional is _valid:
+        additional = None
+    if not checked_properties and not required and additional is None \
+            and min_properties == 0 and max_properties is None:
+        return None
+    missing = object()
+
+    def check_object(value, path, errors):
+        if not isinstance(value, dict):
+            return True
+        valid = True
+        if len(value) < min_properties or (max_properties is not None and len(value) > max_properties):
+            valid = _fail(path, errors, f"{len(value)} properties is not in [{min_properties}, {max_properties}]")
+            if errors is None:
+                return False
+        for name in required:
+            if name not in value:
+                valid = _fail(path, errors, f"required property '{name}' is missing")
+                if errors is None:
+                    return False
+        for name, validator in checked_properties:
+            item = value.get(name, missing)
+            if item is not missing:
+                path.append(name)
+                if not validator(item, path, errors):
+                    if errors is None:
+                        return False
+                    valid = False
+                path.pop()
+        if additional is not None:
+            for name, item in value.items():
+                if name not in property_validators:
+                    path.append(name)
+                    if not additional(item, path, errors):
+                        if errors is None:
+                            return False
+                        valid = False
+                    path.pop()
+        return valid
+    return check_object
+
+
+def compile_schema(schema: (dict | bool), location: str = "#") -> Validator:
+    """
+    Compile a json-schema into a validator closure. Supported keywords: type, enum, const, minimum, maximum,
+    exclusiveMinimum, exclusiveMaximum, minLength, maxLength, pattern, items (single schema), minItems, maxItems,
+    uniqueItems, properties, required, additionalProperties, minProperties and maxProperties. Annotations like title,
+    description or format are ignored.
+    :param schema: the schema, True accepts everything, False nothing
+    :param location: location of the schema in the enclosing schema, for error messages
+    :return: a validator(value, path, errors) -> bool
+    :raise JsonSchemaError: if the schema is malformed or uses unsupported keywords
+    """
+    if schema is True:
+        return _valid
+    if schema is False:
+        return _invalid
+    _require(isinstance(schema, dict), location, f"schema must be an object or a boolean, not {_json_type(schema)}")
+    unsupported = [keyword for keyword in _UNSUPPORTED_KEYWORDS if keyword in schema]
+    _require(not unsupported, location, f"unsupported keywords {unsupported}")
+
+    checks = []
+    if "type" in schema:
+        checks.append(_compile_type(schema["type"], location))
+    if "enum" in schema:
+        checks.append(_compile_enum(schema["enum"], location))
+    if "const" in schema:
+        checks.append(_compile_const(schema["const"]))
+    for compile_checks in (_compile_number, _compile_string, _compile_array, _compile_object):
+        check = compile_checks(schema, location)
+        if check is not None:
+            checks.append(check)
+
+    if not checks:
+        return _valid
+    if len(checks) == 1:
+        return checks[0]
+    checks = tuple(checks)
+
+    def check_all(value, path, errors):
+        valid = True
+        for check in checks:
+            if not check(value, path, errors):
+                if errors is None:
+                    return False
+                valid = False
+        return valid
+    return check_all
+
+
+def _validate_document(job: tuple[JsonSchema, object]) -> list[str]:
+    """
+    Worker: validate one document.
+    :param job: tuple of schema and document
+    :return: list of violations
+    """
+    schema, document = job
+    return schema.validate(document)
+
+
+class JsonSchema:
+    """
+    A json-schema (subset, see compile_schema()) compiled once into a tree of closures, so that validating a
+    document does no schema interpretation: each node runs only the checks its schema defines.
+    Compile the schema once and reuse the JsonSchema object in hot paths.
+    Example: JsonSchema({"type": "object", "required": ["name"], "properties": {"name": {"type": "string"}}})
+    """
+
+    def __init__(self, schema: (dict | bool | object)):
+        """
+        :param schema: schema as dict/bool or as a JsonObject
+        :raise JsonSchemaError: if the schema is malformed or uses unsupported keywords
+        """
+        if hasattr(schema, "json_"):
+            schema = schema.json_
+        self.schema = schema
+        self.__validator = compile_schema(schema)
+        self.__digest = None
+
+    def __reduce__(self):
+        # closures cannot be pickled: worker processes compile the schema again, once per chunk of jobs
+        return JsonSchema, (self.schema,)
+
+    @property
+    def digest(self) -> str:
+        """
+        Hash of the canonical form of the schema, equal for equal schemas.
+        """
+        if self.__digest is None:
+            self.__digest = hashlib.blake2b(canonical_dumps(self.schema).encode("utf-8"), digest_size=16).hexdigest()
+        return self.__digest
+
+    def is_valid(self, document: object) -> bool:
+        """
+        Check a document, stopping at the first violation.
+        :param document: json data (dict/list/...) or a JsonObject
+        :return: True if the document is valid, False otherwise
+        """
+        if hasattr(document, "json_"):
+            document = document.json_
+        return self.__validator(document, [], None)
+
+    def validate(self, document: object) -> list[str]:
+        """
+        Find all violations of the schema in a document.
+        :param document: json data (dict/list/...) or a JsonObject
+        :return: list of violations as "key-path: message", empty if the document is valid
+        """
+        if hasattr(document, "json_"):
+            document = document.json_
+        errors = []
+        self.__validator(document, [], errors)
+        return errors
+
+    def assert_valid(self, document: object):
+        """
+        Raise if a document does not conform to the schema.
+        :param document: json data (dict/list/...) or a JsonObject
+        :raise JsonSchemaError: with the list of violations in errors
+        """
+        errors = self.validate(document)
+        if errors:
+            raise JsonSchemaError(f"Document does not match schema: {errors[0]}"
+                                  f"{f' (and {len(errors) - 1} more)' if len(errors) > 1 else ''}", errors)
+
+    def validate_many(self,
+                      documents: Iterable[object],
+                      workers: int = None,
+                      chunk_size: int = None) -> list[list[str]]:
+        """
+        Validate many documents, in parallel if there are enough of them to pay for sending them to worker processes.
+        :param documents: json data or JsonObjects
+        :param workers: number of worker processes, default: number of cores, 1 to validate in this process
+        :param chunk_size: number of documents handed to a worker at a time, default: spread evenly in 4 rounds
+        :return: the list of violations per document, in the order of the documents
+        """
+        jobs = [(self, document.json_ if hasattr(document, "json_") else document) for document in documents]
+        if workers is None:
+            workers = cpu_count()
+        if workers <= 1 or len(jobs) < MIN_DOCUMENTS_FOR_PROCESS_POOL:
+            return [self.validate(document) for _, document in jobs]
+        if chunk_size is None:
+            chunk_size = max(1, len(jobs) // (workers * 4))
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            return list(executor.map(_validate_document, jobs, chunksize=chunk_size))
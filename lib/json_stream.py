@@ -0,0 +1,417 @@
+# Repository:   https://github.com/Python-utilities
+# File Name:    lib/json_stream.py
+# Description:  incremental json reading of huge files and JSON Lines support
+#
+# Copyright (C) 2024 Dieter J Kybelksties <github@kybelksties.com>
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 59 Temple Place - Suite 330, Boston, MA  02111-1307, USA.
+#
+# @date: 2024-07-13
+# @author: Dieter J Kybelksties
+
+from __future__ import annotations
+import json
+import os
+import re
+import sys
+from contextlib import nullcontext
+from os import PathLike
+from typing import Callable, Iterable, Iterator, IO
+
+this_dir = os.path.dirname(os.path.abspath(__file__))
+dk_lib_dir = os.path.abspath(f"{this_dir}/../../Python-utilities")
+if not os.path.isdir(dk_lib_dir):
+    raise FileNotFoundError(f"Library directory '{dk_lib_dir}' cannot be found")
+sys.path.insert(0, dk_lib_dir)
+
+# pylint: disable=wrong-import-position
+from lib.exceptions import JsonGeneralError, JsonPathFormatError
+from lib.json_backend import JsonBackend, JsonBackendType, get_json_backend
+from lib.json_key_path import JsonKeyPath, JsonIndexKey, JsonStringKey
+
+ANY_KEY = "*"
+ANY_INDEX = "[*]"
+
+_WHITESPACE_RE = re.compile(r"[ \t\n\r]*")
+_STRING_RE = re.compile(r'"(?:[^"\\]|\\.)*"', re.DOTALL)
+_SCALAR_RE = re.compile(r"[^,\]}\s]+")
+_STRUCTURE_RE = re.compile(r'[\[\]{}"]')
+# tokens are delimited loosely with the regexes above and then checked with the strict ones below
+_VALID_STRING = r'"(?:[^"\\\x00-\x1f]|\\["\\/bfnrt]|\\u[0-9a-fA-F]{4})*"'
+_VALID_SCALAR = r"-?(?:0|[1-9][0-9]*)(?:\.[0-9]+)?(?:[eE][-+]?[0-9]+)?|true|false|null|NaN|-?Infinity"
+_VALID_STRING_RE = re.compile(_VALID_STRING)
+_VALID_SCALAR_RE = re.compile(_VALID_SCALAR)
+# runs of complete non-container members, from a value position to the next value position, checked in one match
+_JSON_WS = r"[ \t\n\r]*"
+_ARRAY_RUN_RE = re.compile(rf"(?:{_JSON_WS}(?:{_VALID_STRING}|{_VALID_SCALAR}){_JSON_WS},)*")
+_OBJECT_RUN_RE = re.compile(
+    rf"(?:{_JSON_WS}(?:{_VALID_STRING}|{_VALID_SCALAR}){_JSON_WS},{_JSON_WS}{_VALID_STRING}{_JSON_WS}:)*")
+
+
+def parse_stream_prefix(prefix: (str | list | None)) -> list:
+    """
+    Parse a prefix for streaming. In addition to the concrete keys of a JsonKeyPath the wildcards '*' (any key) and
+    '[*]' (any index) are allowed. '[$]' cannot be used as the end of a list is unknown while streaming.
+    :param prefix: prefix string like "items/[*]", or a list of its parts. None or "" denote the root.
+    :return: list of prefix-elements, each either a JsonKey, ANY_KEY or ANY_INDEX
+    :raise JsonPathFormatError: if the prefix is malformed
+    """
+    if prefix is None or prefix in ("", []):
+        return []
+    parts = prefix.split("/") if isinstance(prefix, str) else list(prefix)
+    reval = []
+    for part in parts:
+        if part in (ANY_KEY, ANY_INDEX):
+            reval.append(part)
+            continue
+        key = JsonKeyPath([part])[0]
+        if isinstance(key, JsonIndexKey) and key.is_end_symbol:
+            raise JsonPathFormatError(path_string=str(prefix), extra_info="'[$]' is not supported when streaming")
+        reval.append(key)
+    return reval
+
+
+def _selects_key(prefix_element) -> bool:
+    return prefix_element == ANY_KEY or isinstance(prefix_element, JsonStringKey)
+
+
+def _selects_index(prefix_element) -> bool:
+    return prefix_element == ANY_INDEX or isinstance(prefix_element, JsonIndexKey)
+
+
+def _matches(prefix_element, path_element: (str | int)) -> bool:
+    if prefix_element == ANY_KEY:
+        return isinstance(path_element, str)
+    if prefix_element == ANY_INDEX:
+        return isinstance(path_element, int)
+    if isinstance(prefix_element, JsonIndexKey):
+        return isinstance(path_element, int) and path_element == prefix_element.get()
+    return isinstance(path_element, str) and path_element == prefix_element.get()
+
+
+class _JsonStreamScanner:
+    """
+    Walks through a json text chunk by chunk. Only the values that match the prefix are materialised, everything
+    else is skipped over on the raw text, so that memory use is bounded by the chunk size plus the largest
+    matching value.
+    """
+
+    def __init__(self, file: IO, prefix: list, backend: JsonBackend, chunk_size: int):
+        self.file = file
+        self.prefix = prefix
+        self.backend = backend
+        self.chunk_size = chunk_size
+        self.buf = ""
+        self.pos = 0
+        self.offset = 0  # offset of buf[0] in the whole stream
+        self.pin = None  # buffer position that must not be discarded
+        self.eof = False
+
+    def _fill(self) -> bool:
+        if self.eof:
+            return False
+        keep_from = self.pos if self.pin is None else min(self.pos, self.pin)
+        if keep_from > 0:
+            self.buf = self.buf[keep_from:]
+            self.offset += keep_from
+            self.pos -= keep_from
+            if self.pin is not None:
+                self.pin -= keep_from
+        # grow the read-size with the pending data to keep re-scanning of large values linear
+        chunk = self.file.read(max(self.chunk_size, len(self.buf)))
+        if not chunk:
+            self.eof = True
+            return False
+        self.buf += chunk
+        return True
+
+    def _error(self, message: str):
+        raise JsonGeneralError(f"Invalid json at offset {self.offset + self.pos}: {message}")
+
+    def _peek(self) -> str:
+        while True:
+            self.pos = _WHITESPACE_RE.match(self.buf, self.pos).end()
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self._fill():
+                return ""
+
+    def _expect(self, chars: str) -> str:
+        c = self._peek()
+        if c == "" or c not in chars:
+            self._error(f"expected one of '{chars}' but found '{c or 'EOF'}'")
+        self.pos += 1
+        return c
+
+    def _match_token(self, regex: re.Pattern) -> re.Match:
+        # a token is complete when it ends before the end of the buffer, or the stream is exhausted
+        while True:
+            match = regex.match(self.buf, self.pos)
+            if match is not None and (match.end() < len(self.buf) or self.eof):
+                return match
+            if not self._fill() and match is None:
+                self._error("unterminated token")
+
+    def _read_key(self) -> str:
+        if self._peek() != '"':
+            self._error("expected a string key")
+        match = self._match_token(_STRING_RE)
+        self.pos = match.end()
+        try:
+            return json.loads(match.group())
+        except json.JSONDecodeError as e:
+            self._error(e.msg)
+        return None
+
+    def _skip_token(self):
+        c = self._peek()
+        if c == "":
+            self._error("unexpected end of input")
+        if c == '"':
+            match = self._match_token(_STRING_RE)
+            if _VALID_STRING_RE.fullmatch(self.buf, match.start(), match.end()) is None:
+                self._error("invalid string")
+        else:
+            if c in ",:]}":
+                self._error(f"unexpected '{c}'")
+            match = self._match_token(_SCALAR_RE)
+            if _VALID_SCALAR_RE.fullmatch(self.buf, match.start(), match.end()) is None:
+                self._error(f"invalid value '{match.group()}'")
+        self.pos = match.end()
+
+    def _skip_member_key(self):
+        if self._peek() != '"':
+            self._error("expected a string key")
+        self._skip_token()
+        self._expect(":")
+
+    def _skip_value(self):
+        # walk over the value without building it, but check its syntax on the way
+        closers = []
+        while True:
+            if closers:
+                run_re = _OBJECT_RUN_RE if closers[-1] == "}" else _ARRAY_RUN_RE
+                self.pos = run_re.match(self.buf, self.pos).end()
+            c = self._peek()
+            if c in {"{", "["}:
+                self.pos += 1
+                closer = "}" if c == "{" else "]"
+                if self._peek() != closer:
+                    closers.append(closer)
+                    if closer == "}":
+                        self._skip_member_key()
+                    continue
+                self.pos += 1
+            else:
+                self._skip_token()
+            # a complete value has been skipped, close all containers that end here
+            while closers:
+                if self._expect("," + closers[-1]) == ",":
+                    if closers[-1] == "}":
+                        self._skip_member_key()
+                    break
+                closers.pop()
+            if not closers:
+                return
+
+    def _find_value_end(self):
+        # only match the brackets, the value is parsed (and so checked) by the backend afterwards
+        c = self._peek()
+        if c == "":
+            self._error("unexpected end of input")
+        if c == '"':
+            self.pos = self._match_token(_STRING_RE).end()
+            return
+        if c not in "[{":
+            self.pos = self._match_token(_SCALAR_RE).end()
+            return
+        depth = 0
+        while True:
+            match = _STRUCTURE_RE.search(self.buf, self.pos)
+            if match is None:
+                self.pos = len(self.buf)
+                if not self._fill():
+                    self._error("unterminated container")
+                continue
+            self.pos = match.start()
+            c = match.group()
+            if c == '"':
+                self.pos = self._match_token(_STRING_RE).end()
+                continue
+            self.pos += 1
+            depth += 1 if c in "[{" else -1
+            if depth == 0:
+                return
+
+    def _decode_value(self) -> object:
+        self._peek()
+        self.pin = self.pos
+        try:
+            self._find_value_end()
+            text = self.buf[self.pin:self.pos]
+        finally:
+            self.pin = None
+        try:
+            return self.backend.loads(text)
+        except json.JSONDecodeError as e:
+            self._error(e.msg)
+        return None
+
+    def items(self, path: list) -> Iterator[tuple[list, object]]:
+        """
+        Yield (path, value) for all values below the current position that match the prefix.
+        :param path: the path of the value at the current position
+        """
+        depth = len(path)
+        if depth == len(self.prefix):
+            yield path, self._decode_value()
+            return
+        c = self._peek()
+        if c == "{" and _selects_key(self.prefix[depth]):
+            self.pos += 1
+            if self._peek() == "}":
+                self.pos += 1
+                return
+            while True:
+                key = self._read_key()
+                self._expect(":")
+                if _matches(self.prefix[depth], key):
+                    yield from self.items(path + [key])
+                else:
+                    self._skip_value()
+                if self._expect(",}") == "}":
+                    return
+        elif c == "[" and _selects_index(self.prefix[depth]):
+            self.pos += 1
+            if self._peek() == "]":
+                self.pos += 1
+                return
+            index = 0
+            while True:
+                if _matches(self.prefix[depth], index):
+                    yield from self.items(path + [index])
+                else:
+                    self._skip_value()
+                index += 1
+                if self._expect(",]") == "]":
+                    return
+        else:
+            self._skip_value()
+
+    def assert_at_end(self):
+        if self._peek() != "":
+            self._error("extra data after the document")
+
+
+def _open_text(source: (str | PathLike | IO), encoding: str):
+    # streams passed in by the caller are left open
+    if isinstance(source, (str, PathLike)):
+        if not os.path.isfile(source):
+            raise JsonGeneralError(f"Cannot stream json from file '{source}': file does not exist")
+        return open(source, encoding=encoding)
+    return nullcontext(source)
+
+
+def iter_json_items(source: (str | PathLike | IO),
+                    prefix: (str | list) = None,
+                    encoding: str = "utf-8",
+                    chunk_size: int = 65536,
+                    backend: (str | JsonBackendType | JsonBackend) = None,
+                    with_paths: bool = False) -> Iterator:
+    """
+    Stream the values at the given prefix out of a json document without loading the whole document.
+    Example: prefix "items/[*]" yields the elements of the list under the key "items" one by one.
+    :param source: json file name or a readable text stream
+    :param prefix: path of the values to yield, may contain the wildcards '*' and '[*]'
+    :param encoding: encoding of the file, if source is a file name
+    :param chunk_size: number of characters to read at a time
+    :param backend: json backend used to parse the matching values, default backend if None
+    :param with_paths: if True, then yield tuples of (JsonKeyPath-string, value) instead of values
+    :return: generator of matching values
+    :raise JsonGeneralError: if the document is not valid json
+    """
+    with _open_text(source, encoding) as file:
+        scanner = _JsonStreamScanner(file=file,
+                                     prefix=parse_stream_prefix(prefix),
+                                     backend=get_json_backend(backend),
+                                     chunk_size=chunk_size)
+        for path, value in scanner.items([]):
+            if with_paths:
+                yield "/".join(f"[{p}]" if isinstance(p, int) else p for p in path), value
+            else:
+                yield value
+        scanner.assert_at_end()
+
+
+def read_json_lines(source: (str | PathLike | IO),
+                    predicate: Callable[[object], bool] = None,
+                    encoding: str = "utf-8",
+                    backend: (str | JsonBackendType | JsonBackend) = None,
+                    skip_invalid: bool = False) -> Iterator:
+    """
+    Read a JSON Lines file (one json value per line) lazily, one line at a time.
+    :param source: file name or readable text stream
+    :param predicate: if given, only values for which the predicate returns True are yielded
+    :param encoding: encoding of the file, if source is a file name
+    :param backend: json backend to use, default backend if None
+    :param skip_invalid: if True, lines that are not valid json are skipped, otherwise an error is raised
+    :return: generator of the parsed values
+    :raise JsonGeneralError: on invalid lines, unless skip_invalid is set
+    """
+    backend = get_json_backend(backend)
+    with _open_text(source, encoding) as file:
+        for line_number, line in enumerate(file, start=1):
+            if line.isspace() or line == "":
+                continue
+            try:
+                value = backend.loads(line)
+            except json.JSONDecodeError as e:
+                if skip_invalid:
+                    continue
+                raise JsonGeneralError(f"Invalid json in line {line_number}: {e.msg}") from e
+            if predicate is None or predicate(value):
+                yield value
+
+
+def write_json_lines(target: (str | PathLike | IO),
+                     values: Iterable,
+                     mode: str = "w",
+                     encoding: str = "utf-8",
+                     backend: (str | JsonBackendType | JsonBackend) = None) -> int:
+    """
+    Write values as JSON Lines, one compact json value per line. The values are consumed one at a time, so
+    generators, e.g. from read_json_lines(), can be filtered from file to file in constant memory.
+    :param target: file name or writable text stream
+    :param values: the values to write, objects with a get()-method (like JsonObject) are unwrapped
+    :param mode: 'w' to overwrite, 'a' to append, if target is a file name
+    :param encoding: encoding of the file, if target is a file name
+    :param backend: json backend to use, default backend if None
+    :return: number of lines written
+    """
+    backend = get_json_backend(backend)
+    close = isinstance(target, (str, PathLike))
+    file = open(target, mode, encoding=encoding) if close else target  # pylint: disable=consider-using-with
+    count = 0
+    try:
+        for value in values:
+            if hasattr(value, "json_"):
+                value = value.json_
+            file.write(backend.dumps(value))
+            file.write("\n")
+            count += 1
+    finally:
+        if close:
+            file.close()
+    return count
@@ -0,0 +1,201 @@
+# Repository:   https://github.com/Python-utilities
+# File Name:    lib/json_writer.py
+# Description:  streaming, atomic json-file output with compact/canonical formats and compression
+#
+# Copyright (C) 2024 Dieter J Kybelksties <github@kybelksties.com>
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 59 Temple Place - Suite 330, Boston, MA  02111-1307, USA.
+#
+# @date: 2024-07-13
+# @author: Dieter J Kybelksties
+
+from __future__ import annotations
+import codecs
+import gzip
+import json
+import os
+import sys
+import tempfile
+from os import PathLike
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+this_dir = os.path.dirname(os.path.abspath(__file__))
+dk_lib_dir = os.path.abspath(f"{this_dir}/../../Python-utilities")
+if not os.path.isdir(dk_lib_dir):
+    raise FileNotFoundError(f"Library directory '{dk_lib_dir}' cannot be found")
+sys.path.insert(0, dk_lib_dir)
+
+# pylint: disable=wrong-import-position
+from lib.exceptions import JsonGeneralError
+from lib.json_backend import JsonBackend, JsonBackendType, OrjsonBackend, UjsonBackend, get_json_backend
+
+COMPRESSIONS = ("gzip", "zstd")
+COMPRESSION_EXTENSIONS = {".gz": "gzip", ".zst": "zstd"}
+# encoder chunks are collected to about this size before they are written
+WRITE_BUFFER_SIZE = 1 << 16
+# the umask can only be read by setting it, which is not thread-safe, so it is read once on import
+_UMASK = os.umask(0)
+os.umask(_UMASK)
+
+
+def compression_of(filename: (str | PathLike), compression: str = "auto") -> str | None:
+    """
+    Resolve the compression of a json-file.
+    :param filename: the file name
+    :param compression: "gzip", "zstd", None for none, or "auto" to derive it from the extension (.gz, .zst)
+    :return: "gzip", "zstd" or None
+    :raise JsonGeneralError: if the compression is unknown or zstd is not installed
+    """
+    if compression == "auto":
+        compression = COMPRESSION_EXTENSIONS.get(os.path.splitext(str(filename))[1])
+    if compression is not None and compression not in COMPRESSIONS:
+        raise JsonGeneralError(f"Unknown compression '{compression}', must be one of {COMPRESSIONS} or None")
+    if compression == "zstd" and zstandard is None:
+        raise JsonGeneralError("zstd compression needs the zstandard package to be installed")
+    return compression
+
+
+def canonical_dumps(obj: object) -> str:
+    """
+    Serialise to canonical json: sorted keys, no whitespace, non-ascii characters as they are. Equal objects give
+    equal strings, independent of key order and json backend, so the result can be hashed.
+    :param obj: the object to serialise
+    :return: the canonical json string
+    :raise ValueError: for NaN and infinite floats, which are not json
+    """
+    return json.dumps(obj, sort_keys=True, separators=(",", ":"), ensure_ascii=False, allow_nan=False)
+
+
+def _encoder(indent: int, compact: bool, canonical: bool) -> json.JSONEncoder:
+    if canonical:
+        return json.JSONEncoder(sort_keys=True, separators=(",", ":"), ensure_ascii=False, allow_nan=False)
+    if compact:
+        return json.JSONEncoder(separators=(",", ":"))
+    return json.JSONEncoder(indent=indent)
+
+
+def _write_chunks(file, chunks, encoding: str):
+    buffer = []
+    size = 0
+    for chunk in chunks:
+        buffer.append(chunk)
+        size += len(chunk)
+        if size >= WRITE_BUFFER_SIZE:
+            file.write("".join(buffer).encode(encoding))
+            buffer = []
+            size = 0
+    if buffer:
+        file.write("".join(buffer).encode(encoding))
+
+
+def _serialise(obj: object, file, indent: int, compact: bool, canonical: bool, encoding: str, backend: JsonBackend):
+    if compact or canonical:
+        indent = None
+    if not canonical:
+        # the C serialisers are faster than streaming, as long as they support the format
+        if isinstance(backend, OrjsonBackend) and indent in {None, 2} and codecs.lookup(encoding).name == "utf-8":
+            file.write(backend.dumps_bytes(obj, indent=indent))
+            return
+        if isinstance(backend, UjsonBackend) and indent is None:
+            file.write(backend.dumps(obj).encode(encoding))
+            return
+    encoder = _encoder(indent, compact, canonical)
+    if indent is None:
+        # without indentation the C encoder can be used, which only works in one shot but is many times faster
+        file.write(encoder.encode(obj).encode(encoding))
+    else:
+        _write_chunks(file, encoder.iterencode(obj), encoding)
+
+
+def write_json_file(obj: object,
+                    filename: (str | PathLike),
+                    indent: int = None,
+                    compact: bool = False,
+                    canonical: bool = False,
+                    compression: str = "auto",
+                    encoding: str = "utf-8",
+                    backend: (str | JsonBackendType | JsonBackend) = None):
+    """
+    Write json to a file atomically: the output goes to a temporary file in the same directory, which replaces the
+    target only when complete, so readers never see a truncated file. Indented output is streamed in chunks instead
+    of being built as one string; compact and canonical output is built by the C encoders in one go.
+    :param obj: the object to serialise
+    :param filename: the output filename
+    :param indent: number of indentation chars to use, None for compact output
+    :param compact: no whitespace at all, ignores indent
+    :param canonical: sorted keys and no whitespace, deterministic for hashing, see canonical_dumps()
+    :param compression: "gzip", "zstd", None, or "auto" to derive it from the extension (.gz, .zst)
+    :param encoding: encoding of the file
+    :param backend: json backend for non-canonical output, default backend if None
+    :raise JsonGeneralError: if the compression is not available
+    :raise ValueError, TypeError: if obj cannot be serialised; the target is then left untouched
+    :raise BaseException: any other error while writing is re-raised after the temporary file is removed
+    """
+    filename = os.path.abspath(str(filename))
+    compression = compression_of(filename, compression)
+    backend = get_json_backend(backend)
+    directory = os.path.dirname(filename)
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_file = tempfile.mkstemp(dir=directory, prefix=f".{os.path.basename(filename)}.", suffix=".tmp")
+    try:
+        with open(fd, "wb") as raw:
+            if compression == "gzip":
+                with gzip.GzipFile(fileobj=raw, mode="wb", mtime=0) as file:
+                    _serialise(obj, file, indent, compact, canonical, encoding, backend)
+            elif compression == "zstd":
+                with zstandard.ZstdCompressor().stream_writer(raw, closefd=False) as file:
+                    _serialise(obj, file, indent, compact, canonical, encoding, backend)
+            else:
+                _serialise(obj, raw, indent, compact, canonical, encoding, backend)
+            raw.flush()
+            os.fsync(raw.fileno())
+        if os.path.exists(filename):
+            os.chmod(tmp_file, os.stat(filename).st_mode & 0o7777)
+        else:
+            os.chmod(tmp_file, 0o666 & ~_UMASK)
+        os.replace(tmp_file, filename)
+    except BaseException:
+        if os.path.exists(tmp_file):
+            os.remove(tmp_file)
+        raise
+
+
+def read_json_file(filename: (str | PathLike),
+                   compression: str = "auto",
+                   encoding: str = "utf-8",
+                   backend: (str | JsonBackendType | JsonBackend) = None) -> object:
+    """
+    Parse a json-file, that may be compressed.
+    :param filename: json-file
+    :param compression: "gzip", "zstd", None, or "auto" to derive it from the extension (.gz, .zst)
+    :param encoding: encoding of the file
+    :param backend: json backend to use, default backend if None
+    :return: the parsed object
+    :raise json.JSONDecodeError: if the file is not valid json
+    """
+    compression = compression_of(filename, compression)
+    backend = get_json_backend(backend)
+    if compression is None:
+        return backend.load_file(filename, encoding=encoding)
+    with open(filename, "rb") as raw:
+        if compression == "gzip":
+            content = gzip.decompress(raw.read())
+        else:
+            content = zstandard.ZstdDecompressor().stream_reader(raw).read()
+    return backend.loads(content.decode(encoding))
@@ -0,0 +1,289 @@
+# Repository:   https://github.com/Python-utilities
+# File Name:    lib/lazy_json_object.py
+# Description:  read-only json object on a memory-mapped file that parses sub-trees on demand
+#
+# Copyright (C) 2024 Dieter J Kybelksties <github@kybelksties.com>
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 59 Temple Place - Suite 330, Boston, MA  02111-1307, USA.
+#
+# @date: 2024-07-13
+# @author: Dieter J Kybelksties
+
+from __future__ import annotations
+import json
+import mmap
+import os
+import re
+import sys
+from array import array
+from bisect import bisect_left
+from os import PathLike
+
+this_dir = os.path.dirname(os.path.abspath(__file__))
+dk_lib_dir = os.path.abspath(f"{this_dir}/../../Python-utilities")
+if not os.path.isdir(dk_lib_dir):
+    raise FileNotFoundError(f"Library directory '{dk_lib_dir}' cannot be found")
+sys.path.insert(0, dk_lib_dir)
+
+# pylint: disable=wrong-import-position
+from lib.exceptions import JsonGeneralError, JsonIndexRequired, JsonKeyStringRequired
+from lib.json_backend import JsonBackend, JsonBackendType, get_json_backend
+from lib.json_key_path import JsonKey, JsonKeyPath, JsonIndexKey
+from lib.json_object import JsonObject
+
+# everything up to the next bracket that is not inside a string, so that only brackets reach the Python loop
+_NEXT_BRACKET_RE = re.compile(rb'[^"\[\]{}]*+(?:"[^"\\]*+(?:\\.[^"\\]*+)*+"[^"\[\]{}]*+)*+([\[\]{}])', re.DOTALL)
+_WHITESPACE_RE = re.compile(rb"[ \t\n\r]*")
+_STRING_RE = re.compile(rb'"(?:[^"\\]|\\.)*"', re.DOTALL)
+_SCALAR_RE = re.compile(rb"[^,\]}\s]+")
+
+_OBJECT = ord("{")
+_ARRAY = ord("[")
+_NULL = ord("n")
+
+
+class LazyJsonObject:
+    """
+    Read-only counterpart of JsonObject for big files of which only a few keys are needed.
+    The file is memory-mapped and a structural index is built in one pass: the offsets of all object/array
+    boundaries, stored as two flat arrays (the "tape"). Containers that get() walks through are indexed by key or
+    position when first visited, and only the value at the end of the path is parsed.
+    get() and key_exists() follow the same JsonKeyPath semantics as JsonObject.
+    """
+
+    def __init__(self,
+                 filename: (str | PathLike),
+                 backend: (str | JsonBackendType | JsonBackend) = None):
+        if not os.path.isfile(filename):
+            raise JsonGeneralError(f"Cannot load json from file '{filename}': file does not exist")
+        self.filename = str(filename)
+        self.backend = get_json_backend(backend)
+        self.__file = open(filename, "rb")  # pylint: disable=consider-using-with
+        if os.path.getsize(filename) == 0:
+            self.__data = b"{}"
+            self.__mmap = None
+        else:
+            self.__mmap = mmap.mmap(self.__file.fileno(), 0, access=mmap.ACCESS_READ)
+            self.__data = self.__mmap
+        self.__container_starts = array("q")
+        self.__container_ends = array("q")
+        self.__children: dict[int, dict[str, int] | list[int]] = {}
+        self.__build_structural_index()
+        self.__root = self.__skip_whitespace(0)
+        if self.__root >= len(self.__data):
+            raise JsonGeneralError(f"Cannot load json from file '{filename}': no json value found")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def close(self):
+        """
+        Release the memory map and the file.
+        """
+        self.__children.clear()
+        if self.__mmap is not None:
+            self.__mmap.close()
+            self.__mmap = None
+        self.__file.close()
+
+    def __build_structural_index(self):
+        open_stack = []
+        for match in _NEXT_BRACKET_RE.finditer(self.__data):
+            pos = match.start(1)
+            if self.__data[pos] in (_OBJECT, _ARRAY):
+                open_stack.append(len(self.__container_starts))
+                self.__container_starts.append(pos)
+                self.__container_ends.append(-1)
+            else:
+                if not open_stack:
+                    raise JsonGeneralError(f"Invalid json in '{self.filename}': unbalanced bracket at offset {pos}")
+                self.__container_ends[open_stack.pop()] = pos
+        if open_stack:
+            pos = self.__container_starts[open_stack[-1]]
+            raise JsonGeneralError(f"Invalid json in '{self.filename}': unclosed bracket at offset {pos}")
+
+    def __skip_whitespace(self, pos: int) -> int:
+        return _WHITESPACE_RE.match(self.__data, pos).end()
+
+    def __value_end(self, pos: int) -> int:
+        first = self.__data[pos]
+        if first in (_OBJECT, _ARRAY):
+            return self.__container_ends[bisect_left(self.__container_starts, pos)] + 1
+        match = (_STRING_RE if first == ord('"') else _SCALAR_RE).match(self.__data, pos)
+        if match is None:
+            raise JsonGeneralError(f"Invalid json in '{self.filename}' at offset {pos}")
+        return match.end()
+
+    def __expect(self, pos: int, chars: bytes) -> tuple[int, int]:
+        pos = self.__skip_whitespace(pos)
+        if pos >= len(self.__data) or self.__data[pos] not in chars:
+            raise JsonGeneralError(f"Invalid json in '{self.filename}' at offset {pos}: expected one of {chars}")
+        return self.__data[pos], pos + 1
+
+    def __index_container(self, pos: int) -> dict[str, int] | list[int]:
+        """
+        Map the keys/indices of the container at pos to the offsets of their values.
+        """
+        children = self.__children.get(pos)
+        if children is not None:
+            return children
+        is_object = self.__data[pos] == _OBJECT
+        closing = b"}" if is_object else b"]"
+        children = {} if is_object else []
+        cur = self.__skip_whitespace(pos + 1)
+        if self.__data[cur:cur + 1] == closing:
+            self.__children[pos] = children
+            return children
+        while True:
+            if is_object:
+                cur = self.__skip_whitespace(cur)
+                key_end = self.__value_end(cur)
+                key = json.loads(self.__data[cur:key_end])
+                _, cur = self.__expect(key_end, b":")
+                cur = self.__skip_whitespace(cur)
+                children[key] = cur
+            else:
+                cur = self.__skip_whitespace(cur)
+                children.append(cur)
+            separator, cur = self.__expect(self.__value_end(cur), b"," + closing)
+            if separator == closing[0]:
+                break
+        self.__children[pos] = children
+        return children
+
+    def __materialise(self, pos: int) -> object:
+        try:
+            return self.backend.loads(self.__data[pos:self.__value_end(pos)])
+        except json.JSONDecodeError as e:
+            raise JsonGeneralError(f"Invalid json in '{self.filename}' at offset {pos}: {e.msg}") from e
+
+    def __kind(self, pos: int) -> type | None:
+        first = self.__data[pos]
+        if first == _OBJECT:
+            return dict
+        if first == _ARRAY:
+            return list
+        if first == _NULL:
+            return None
+        return object
+
+    @classmethod
+    def __key_list(cls, keys: (str | list | tuple | JsonKeyPath)) -> (list | tuple)[JsonKey]:
+        if isinstance(keys, JsonKeyPath):
+            return keys.key_list()
+        if isinstance(keys, (list, tuple)) and all(isinstance(key, JsonKey) for key in keys):
+            return keys
+        return JsonKeyPath(keys).key_list()
+
+    def get(self, keys: (str | list[str] | JsonKeyPath | None) = None,
+            default: (bool | int | float | str | list | dict) = None):
+        """
+        Get the value of the given key-path, parsing only the sub-tree at the end of the path.
+        See JsonObject.get() for the handling of defaults.
+        :param keys: key-path
+        :param default: default-value
+        :return: the value of the given key, or the default if key is compatible
+        :raise JsonKeyStringRequired, JsonIndexRequired, JsonGeneralError: on compatibility problems
+        """
+        if keys is None:
+            return self.__materialise(self.__root)
+        keys = self.__key_list(keys)
+
+        pos = self.__root
+        for key_index, key in enumerate(keys):
+            kind = self.__kind(pos)
+            if kind is None:
+                raise JsonGeneralError(f"get({keys}, {default}) and key_index {key_index}({key}) iterator is None")
+            if kind is list and not isinstance(key, JsonIndexKey):
+                raise JsonIndexRequired(key_index=key_index, keys=keys, json_obj=[])
+            if kind is dict and isinstance(key, JsonIndexKey):
+                raise JsonKeyStringRequired(key_index=key_index, keys=keys, json_obj={})
+            if kind is object:
+                if isinstance(key, JsonIndexKey):
+                    if default is not None:
+                        return default
+                    raise JsonGeneralError(message=f"Cannot get key number '{key_index}' in json. '{key}'")
+                raise JsonKeyStringRequired(key_index=key_index, keys=keys, json_obj=self.__materialise(pos))
+
+            is_last_key = (key_index >= len(keys) - 1)
+            children = self.__index_container(pos)
+            if kind is list:
+                if key.is_start_symbol:
+                    index = 0
+                elif key.is_end_symbol:
+                    index = len(children) - 1
+                else:
+                    index = key.index
+                if index >= len(children) or index < 0:
+                    if default is not None:
+                        return default
+                    raise JsonGeneralError(message=f"Index '{key}' at key-number {key_index} is out of range")
+                pos = children[index]
+            else:
+                child = children.get(key.get())
+                if child is None or (is_last_key and self.__kind(child) is None):
+                    if default is not None:
+                        return default
+                    if is_last_key:
+                        raise JsonKeyStringRequired(key_index=key_index, keys=keys, json_obj={})
+                    raise JsonGeneralError(message=f"Cannot get key number '{key_index}' in json. '{key}'")
+                pos = child
+        return self.__materialise(pos)
+
+    def key_exists(self, keys: (str | list[str] | JsonKeyPath)) -> bool:
+        """
+        Check if a key exists.
+        :param keys: path to a key
+        :return: True if key exists, False otherwise
+        """
+        not_exist = object()
+        try:
+            return self.get(keys, default=not_exist) is not not_exist
+        except (JsonKeyStringRequired, JsonIndexRequired):
+            return False
+
+    def size(self, keys: (str | list[str] | JsonKeyPath | None) = None) -> int:
+        """
+        Number of elements of the list at the given key-path, without parsing the elements.
+        :param keys: key-path, the root if None
+        :return: the size of the list, 0 if the value is not a list
+        """
+        pos = self.__root
+        if keys is not None:
+            for key in self.__key_list(keys):
+                children = self.__index_container(pos) if self.__kind(pos) in (dict, list) else None
+                if isinstance(children, list) and isinstance(key, JsonIndexKey):
+                    index = len(children) - 1 if key.is_end_symbol else key.get()
+                    if index >= len(children):
+                        return 0
+                    pos = children[index]
+                elif isinstance(children, dict) and key.get() in children:
+                    pos = children[key.get()]
+                else:
+                    return 0
+        if self.__kind(pos) is list:
+            return len(self.__index_container(pos))
+        return 0
+
+    def to_json_object(self, keys: (str | list[str] | JsonKeyPath | None) = None) -> JsonObject:
+        """
+        Materialise the whole document, or the sub-tree at the given key-path, as a JsonObject.
+        :param keys: key-path, the whole document if None
+        :return: a JsonObject owning the parsed data
+        """
+        return JsonObject(json_obj=self.get(keys), adopt=True)
@@ -22,11 +22,16 @@
 # @author: Dieter J Kybelksties
 
 from __future__ import annotations
+import atexit
 import datetime
 import logging
 import os
 import os.path
+import queue
 import sys
+import threading
+import weakref
+from enum import auto
 from logging import LogRecord
 from os import PathLike
 from colorama import Fore, Style
@@ -68,6 +73,152 @@ class LogLevels(ExtendedEnum):
         return int(self.value)
 
 
+class LogOverflowPolicy(ExtendedEnum):
+    """
+    What an asynchronous logger does with a message when its queue is full. Errors are never dropped.
+    """
+    BLOCK = auto()  # wait until the writer has made room, no message is lost
+    DROP = auto()  # drop the message, the number of dropped messages is reported
+    SAMPLE = auto()  # wait for every n-th message, drop the others
+
+
+# number of messages an asynchronous logger queues before its overflow policy applies
+LOG_QUEUE_SIZE = 10000
+# with LogOverflowPolicy.SAMPLE, one in this many overflowing messages is kept
+LOG_SAMPLE_EVERY = 10
+# writers whose thread does not exist in a forked child, see AsyncLogWriter._reset_after_fork()
+_ASYNC_LOG_WRITERS = weakref.WeakSet()
+
+
+class AsyncLogWriter:
+    """
+    Writes the console and file output of a ScriptLogger on a background thread, so that logging threads, like the
+    monitors of a chatty subprocess, are not held up by the terminal or the disk.
+    Messages go through one bounded queue, so their order is kept. Console lines are written in batches and the
+    streams flushed whenever the queue runs empty. File messages are turned into log-records on the logging thread,
+    so that they keep its thread-name and time, and handed to the logging handlers by the writer.
+    The queue is flushed on exit. In a forked child process, like a worker of a process pool, the writer thread does
+    not exist; there the messages are written synchronously, as after close().
+    """
+
+    def __init__(self,
+                 queue_size: int = LOG_QUEUE_SIZE,
+                 overflow_policy: LogOverflowPolicy = LogOverflowPolicy.BLOCK,
+                 sample_every: int = LOG_SAMPLE_EVERY):
+        self.queue: queue.Queue = queue.Queue(maxsize=max(1, queue_size))
+        self.overflow_policy = overflow_policy
+        self.sample_every = max(1, sample_every)
+        self.dropped = 0
+        self.__reported_dropped = 0
+        self.__overflows = 0
+        self.__lock = threading.Lock()
+        self.__dirty_streams = set()
+        self.__thread = threading.Thread(target=self.__run, name="AsyncLogWriter", daemon=True)
+        self.__thread.start()
+        atexit.register(self.close)
+        _ASYNC_LOG_WRITERS.add(self)
+
+    def put(self, item: (tuple | LogRecord), important: bool = False):
+        """
+        Queue a console line, as tuple of stream and text, or a log-record.
+        :param item: the line or record
+        :param important: if True, wait for room in the queue whatever the overflow policy
+        """
+        # under the lock that close() takes, so that nothing is queued after the writer was told to stop
+        with self.__lock:
+            if self.__thread is None:
+                self.__write(item)
+                self.__flush_streams()
+                return
+            if important or self.overflow_policy == LogOverflowPolicy.BLOCK:
+                self.queue.put(item)
+                return
+            try:
+                self.queue.put_nowait(item)
+                return
+            except queue.Full:
+                pass
+            self.__overflows += 1
+            if self.overflow_policy == LogOverflowPolicy.SAMPLE and self.__overflows % self.sample_every == 0:
+                self.queue.put(item)
+            else:
+                self.dropped += 1
+
+    def flush(self):
+        """
+        Wait until all queued messages are written.
+        """
+        if self.__thread is not None:
+            self.queue.join()
+
+    def close(self):
+        """
+        Write all queued messages and stop the writer thread. Messages logged afterwards are written directly.
+        """
+        with self.__lock:
+            thread = self.__thread
+            if thread is None:
+                return
+            self.__thread = None
+            self.queue.put(None)
+        thread.join()
+        atexit.unregister(self.close)
+
+    def _reset_after_fork(self):
+        # the writer thread was not forked, and the locks may have been held by threads that were not forked either.
+        # What is queued is written by the parent.
+        self.__lock = threading.Lock()
+        self.__thread = None
+        self.queue = queue.Queue(maxsize=self.queue.maxsize)
+        self.__dirty_streams = set()
+        self.__reported_dropped = self.dropped
+
+    def __run(self):
+        while True:
+            item = self.queue.get()
+            try:
+                if item is None:
+                    return
+                self.__write(item)
+                if self.queue.empty():
+                    self.__flush_streams()
+            finally:
+                self.queue.task_done()
+
+    def __write(self, item: (tuple | LogRecord)):
+        if isinstance(item, LogRecord):
+            logging.getLogger().handle(item)
+            return
+        stream, text = item
+        try:
+            stream.write(f"{text}\n")
+            self.__dirty_streams.add(stream)
+        except (OSError, ValueError):
+            pass  # the stream has been closed, like a redirection that has ended
+
+    def __flush_streams(self):
+        if self.dropped != self.__reported_dropped:
+            dropped = self.dropped - self.__reported_dropped
+            self.__reported_dropped = self.dropped
+            self.__write((sys.stdout, f"[{now_string()}] {Fore.YELLOW}WARNING{Style.RESET_ALL}: "
+                                      f"{dropped} log messages dropped"))
+        for stream in self.__dirty_streams:
+            try:
+                stream.flush()
+            except (OSError, ValueError):
+                pass
+        self.__dirty_streams.clear()
+
+
+def _reset_async_log_writers_after_fork():
+    for writer in list(_ASYNC_LOG_WRITERS):
+        writer._reset_after_fork()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_async_log_writers_after_fork)
+
+
 class CustomFormatter(logging.Formatter):
     """
     A formatter class to customize how log-entries should be displayed.
@@ -127,9 +278,13 @@ class ScriptLogger:
                  logfile_name: (str | PathLike) = None,
                  verbosity: (str | LogLevels) = LogLevels.INFO,
                  logfile_open_mode: str = "w",
-                 encoding="utf-8"):
+                 encoding="utf-8",
+                 asynchronous: bool = False,
+                 queue_size: int = LOG_QUEUE_SIZE,
+                 overflow_policy: LogOverflowPolicy = LogOverflowPolicy.BLOCK):
         self.do_file_log = False
         self.verbosity = self.set_verbosity(verbosity)
+        self.writer = AsyncLogWriter(queue_size=queue_size, overflow_policy=overflow_policy) if asynchronous else None
 
         if not is_empty_string(logfile_name):
             log_dir = os.path.dirname(logfile_name)
@@ -161,10 +316,42 @@ class ScriptLogger:
     def get_verbosity(self):
         return self.verbosity
 
+    def flush(self):
+        """
+        Wait until all messages of an asynchronous logger are written.
+        """
+        if self.writer is not None:
+            self.writer.flush()
+
+    def close(self):
+        """
+        Write all messages of an asynchronous logger and stop its writer. The logger keeps working synchronously.
+        """
+        if self.writer is not None:
+            self.writer.close()
+            self.writer = None
+
+    def __console(self, text: str, important: bool = False):
+        if self.writer is None:
+            print(text)
+        else:
+            self.writer.put((sys.stdout, text), important=important)
+
+    def __file_log(self, level: int, msg: str, *args, important: bool = False):
+        if self.writer is None:
+            logging.log(level, msg, *args)
+            return
+        root_logger = logging.getLogger()
+        if root_logger.isEnabledFor(level):
+            self.writer.put(root_logger.makeRecord(root_logger.name, level, "(unknown file)", 0, msg, args, None),
+                            important=important)
+
     def __error__(self, err_type: str, message):
         if self.do_file_log:
-            logging.error("%s: %s", err_type, message)
-        print(f"{Fore.RED}{err_type}{Style.RESET_ALL}: {Fore.YELLOW}{message}{Style.RESET_ALL}")
+            self.__file_log(logging.ERROR, "%s: %s", err_type, message, important=True)
+        self.__console(f"{Fore.RED}{err_type}{Style.RESET_ALL}: {Fore.YELLOW}{message}{Style.RESET_ALL}", important=True)
+        # errors often end the script, they must be out before that
+        self.flush()
 
     def log_critical(self, message):
         self.__error__(err_type="CRITICAL", message=message)
@@ -177,21 +364,21 @@ class ScriptLogger:
 
     def log_warning(self, message):
         if self.do_file_log:
-            logging.warning(message)
+            self.__file_log(logging.WARNING, message)
         if self.verbosity.logging_level() <= logging.WARNING:
-            print(f"[{now_string()}] {Fore.YELLOW}WARNING{Style.RESET_ALL}: {message}")
+            self.__console(f"[{now_string()}] {Fore.YELLOW}WARNING{Style.RESET_ALL}: {message}")
 
     def log_info(self, message):
         if self.do_file_log:
-            logging.info(message)
+            self.__file_log(logging.INFO, message)
         if self.verbosity.logging_level() <= logging.INFO:
-            print(f"[{now_string()}] {Fore.GREEN}INFO{Style.RESET_ALL}: {message}")
+            self.__console(f"[{now_string()}] {Fore.GREEN}INFO{Style.RESET_ALL}: {message}")
 
     def log_debug(self, message):
         if self.do_file_log:
-            logging.debug(message)
+            self.__file_log(logging.DEBUG, message)
         if self.verbosity.logging_level() <= logging.DEBUG:
-            print(f"[{now_string()}] {Fore.LIGHTWHITE_EX}DEBUG{Style.RESET_ALL}: {message}")
+            self.__console(f"[{now_string()}] {Fore.LIGHTWHITE_EX}DEBUG{Style.RESET_ALL}: {message}")
 
     def log_command(self, command_str: str, extra_comment: str = None, dryrun: bool = False):
         comment = ""
@@ -204,34 +391,32 @@ class ScriptLogger:
         if not is_empty_string(comment):
             comment = " ### " + comment
         if self.do_file_log:
-            logging.log(level=LogLevels.COMMAND.logging_level(), msg=f"{command_str}{comment}")
+            self.__file_log(LogLevels.COMMAND.logging_level(), f"{command_str}{comment}")
         if self.verbosity.logging_level() <= LogLevels.COMMAND.value:
             spaces_len = max(100 - len(command_str) - len(comment), 1)
             spaces = " " * spaces_len
-            print(f"{Fore.MAGENTA}{command_str}{Fore.LIGHTBLACK_EX}{spaces}{comment}{Style.RESET_ALL}")
+            self.__console(f"{Fore.MAGENTA}{command_str}{Fore.LIGHTBLACK_EX}{spaces}{comment}{Style.RESET_ALL}")
 
     def log_command_stdout(self, command_stdout: str):
         if self.do_file_log:
-            logging.log(level=LogLevels.COMMAND_OUTPUT.logging_level(),
-                        msg=command_stdout)
+            self.__file_log(LogLevels.COMMAND_OUTPUT.logging_level(), command_stdout)
         if self.verbosity.logging_level() <= LogLevels.COMMAND_OUTPUT.value:
-            print(f"{Fore.GREEN}(stdout){Style.RESET_ALL} {Fore.LIGHTWHITE_EX}{command_stdout}{Style.RESET_ALL}")
+            self.__console(f"{Fore.GREEN}(stdout){Style.RESET_ALL} {Fore.LIGHTWHITE_EX}{command_stdout}{Style.RESET_ALL}")
 
     def log_command_stderr(self, command_stderr: str):
         if self.do_file_log:
-            logging.log(level=LogLevels.COMMAND_STDERR.logging_level(),
-                        msg=command_stderr)
+            self.__file_log(LogLevels.COMMAND_STDERR.logging_level(), command_stderr)
         if self.verbosity.logging_level() <= LogLevels.COMMAND_STDERR.value:
-            print(f"{Fore.RED}(stderr){Style.RESET_ALL} {Fore.LIGHTWHITE_EX}{command_stderr}{Style.RESET_ALL}")
+            self.__console(f"{Fore.RED}(stderr){Style.RESET_ALL} {Fore.LIGHTWHITE_EX}{command_stderr}{Style.RESET_ALL}")
 
     def log_header(self, header, filler: str = "="):
         if len(header) <= 96:
             filler_len = int((100 - len(header) - 2) / 2)
             filler = filler * filler_len
         if self.do_file_log:
-            logging.info("%s %s %s", filler, header, filler)
+            self.__file_log(logging.INFO, "%s %s %s", filler, header, filler)
         if self.verbosity.logging_level() <= logging.INFO:
-            print(f"{Fore.YELLOW}{filler}{Style.RESET_ALL} {header} {Fore.YELLOW}{filler}{Style.RESET_ALL}")
+            self.__console(f"{Fore.YELLOW}{filler}{Style.RESET_ALL} {header} {Fore.YELLOW}{filler}{Style.RESET_ALL}")
 
     def log_progress_output(self,
                             message,
@@ -266,18 +451,26 @@ global_logger = ScriptLogger()
 def set_logger(script_logger: ScriptLogger = None,
                logfile_name: (str | PathLike) = None,
                logfile_open_mode: str = "w",
-               verbosity: (str | LogLevels) = None) -> ScriptLogger:
+               verbosity: (str | LogLevels) = None,
+               asynchronous: bool = False,
+               overflow_policy: LogOverflowPolicy = LogOverflowPolicy.BLOCK) -> ScriptLogger:
     global global_logger
+    previous_logger = global_logger
     if not is_empty_string(logfile_name):
         global_logger = ScriptLogger(logfile_name=logfile_name,
                                      verbosity=verbosity,
-                                     logfile_open_mode=logfile_open_mode)
+                                     logfile_open_mode=logfile_open_mode,
+                                     asynchronous=asynchronous,
+                                     overflow_policy=overflow_policy)
     elif script_logger is not None:
         if verbosity is not None:
             script_logger.set_verbosity(verbosity)
         global_logger = script_logger
     else:
-        global_logger = ScriptLogger(verbosity=verbosity)
+        global_logger = ScriptLogger(verbosity=verbosity, asynchronous=asynchronous, overflow_policy=overflow_policy)
+    if previous_logger is not global_logger:
+        # what the replaced logger still has queued must come out before the messages of the new one
+        previous_logger.close()
     return global_logger
 
 
@@ -285,6 +478,13 @@ def get_logger() -> ScriptLogger:
     return global_logger
 
 
+def flush_logger():
+    """
+    Wait until all messages of the global logger are written, if it is asynchronous.
+    """
+    global_logger.flush()
+
+
 def fatal(message, exception=SystemExit, error_code=1):
     get_logger().log_fatal(message=message)
     raise exception(error_code)
@@ -29,7 +29,13 @@ import random
 import re
 import string
 import sys
+import threading
+import weakref
+from concurrent.futures import ProcessPoolExecutor
 from enum import auto
+from functools import lru_cache, partial
+from multiprocessing import cpu_count
+from typing import Callable, Iterable, Iterator, IO
 
 from colorama import init as colorama_init
 
@@ -43,6 +49,7 @@ sys.path.insert(0, dk_lib_dir)
 from lib.extended_enum import ExtendedFlag
 from lib.basic_functions import is_empty_string
 from lib.exceptions import StringUtilError
+from lib.text_processor_abc import TextProcessor
 
 colorama_init()
 
@@ -56,6 +63,11 @@ class IdentifierStringCase(ExtendedFlag):
     MIXED = auto()
 
 
+# below this number of keywords, one str.find() per keyword is faster than one regex scan for all of them
+MIN_KEYWORDS_FOR_SINGLE_SCAN = 128
+# below this number of texts, starting worker processes costs more than it saves
+MIN_TEXTS_FOR_PROCESS_POOL = 256
+
 FALSE_STRINGS = ["false", "f", "no", "n", "0"]
 TRUE_STRINGS = ["true", "t", "yes", "y", "1"]
 
@@ -121,6 +133,65 @@ def __get_user_input(prompt: str) -> str:
     return input(prompt)
 
 
+class Squeezer:
+    """
+    Squeeze runs of characters of a squeeze-set into a single replacement char, see squeeze_chars().
+    The regex matching runs of the squeeze-set (and of the replacement char) is compiled once, so a Squeezer that is
+    reused costs only one substitution and a strip per string. Use get_squeezer() to share Squeezers with the same
+    parameters.
+    """
+
+    def __init__(self, squeeze_set: str, replace_with: str = ' '):
+        """
+        :param squeeze_set: characters to squeeze out.
+        :param replace_with: the replacement char.
+        :raise StringUtilError: if replace_with is not a single char
+        """
+        if replace_with is None or len(replace_with) != 1:
+            raise StringUtilError(f"replace_with must be 1 char long but is '{replace_with}'")
+        self.squeeze_set = "" if squeeze_set is None else squeeze_set
+        self.replace_with = replace_with
+        self.__sub = re.compile(f"[{re.escape(self.squeeze_set + replace_with)}]+").sub
+
+    def squeeze(self, source: str) -> str:
+        """
+        Squeeze a string.
+        :param source: the original string.
+        :return: the modified squeezed string.
+        """
+        if is_empty_string(source):
+            return ""
+        if not self.squeeze_set:
+            return source
+        return self.__sub(self.replace_with, source).strip(self.replace_with)
+
+    __call__ = squeeze
+
+    def squeeze_all(self, sources: Iterable[str]) -> list[str]:
+        """
+        Squeeze many strings.
+        :param sources: the original strings.
+        :return: list of the squeezed strings, in the same order.
+        """
+        if not self.squeeze_set:
+            return ["" if is_empty_string(source) else source for source in sources]
+        sub = self.__sub
+        replace_with = self.replace_with
+        return [sub(replace_with, source).strip(replace_with) if source else "" for source in sources]
+
+
+@lru_cache(maxsize=256)
+def get_squeezer(squeeze_set: str, replace_with: str = ' ') -> Squeezer:
+    """
+    Get a shared Squeezer for the given parameters.
+    :param squeeze_set: characters to squeeze out.
+    :param replace_with: the replacement char.
+    :return: the Squeezer
+    :raise StringUtilError: if replace_with is not a single char
+    """
+    return Squeezer(squeeze_set, replace_with)
+
+
 def squeeze_chars(source: str, squeeze_set: str, replace_with: str = ' ') -> str:
     """
     Return a string that is identical to the given source, but with sub-strings containing
@@ -134,31 +205,40 @@ def squeeze_chars(source: str, squeeze_set: str, replace_with: str = ' ') -> str
         return ""
     if is_empty_string(squeeze_set):
         return source
-    if len(replace_with) != 1:
-        raise StringUtilError(f"replace_with must be 1 char long but is '{replace_with}'")
-    # translate all occurrences of chars in squeeze_set to replacement char.
-    translater = source.maketrans(squeeze_set, replace_with * len(squeeze_set))
-    source = source.translate(translater)
+    return get_squeezer(squeeze_set, replace_with).squeeze(source)
 
-    # compress multiple consecutive occurrences of the replacement char to a single one.
-    compress_re = re.compile(f"{replace_with}+")
-    source = re.sub(compress_re, replace_with, source)
 
-    # remove replacement char from front ad back
-    return source.strip(replace_with)
+# ASCII control characters become spaces, bytes outside ASCII are deleted
+_CONTROL_CHAR_BYTES_TABLE = bytes(0x20 if c < 0x20 or c == 0x7f else c for c in range(256))
+_NON_ASCII_BYTES = bytes(range(0x80, 0x100))
+CONTROL_CHARS_CHUNK_SIZE = 1 << 16
 
 
-def remove_control_chars(text: str) -> str:
+def remove_control_chars(text: (str | bytes)) -> (str | bytes):
     """
-    Remove ASCII control characters from a string.
-    :param text: the string containing control characters.
-    :return: the same string without control characters.
+    Remove ASCII control characters from a string. Control characters are replaced by spaces and characters outside
+    ASCII are dropped.
+    :param text: the string containing control characters, or the raw bytes of it.
+    :return: the same string without control characters, of the same type as the text.
     """
-    text = text.encode("ascii", "ignore")
-    text = text.decode()
-    control_chars = ''.join(chr(c) for c in itertools.chain(range(0x00, 0x20), range(0x7f, 0xa0)))
-    control_char_re = re.compile(f'[{re.escape(control_chars)}]')
-    return control_char_re.sub(' ', text)
+    if isinstance(text, str):
+        return text.encode("ascii", "ignore").translate(_CONTROL_CHAR_BYTES_TABLE).decode("ascii")
+    return text.translate(_CONTROL_CHAR_BYTES_TABLE, _NON_ASCII_BYTES)
+
+
+def iter_without_control_chars(stream: (IO | Iterable[str | bytes]),
+                               chunk_size: int = CONTROL_CHARS_CHUNK_SIZE) -> Iterator[str | bytes]:
+    """
+    Remove ASCII control characters from a big text or file piece by piece, see remove_control_chars().
+    Characters are filtered one by one, so the pieces can be cut anywhere, even inside a UTF-8 sequence.
+    :param stream: a file opened in text or binary mode, or an iterable of str or bytes, like a list of lines
+    :param chunk_size: number of characters or bytes read from a file at a time
+    :return: generator of the cleaned pieces, of the type of the input pieces
+    """
+    if hasattr(stream, "read"):
+        stream = iter(partial(stream.read, chunk_size), stream.read(0))
+    for piece in stream:
+        yield remove_control_chars(piece)
 
 
 def matches_any(search_string: str, patterns: (str | list[str]) = None) -> bool:
@@ -177,52 +257,279 @@ def matches_any(search_string: str, patterns: (str | list[str]) = None) -> bool:
     return False
 
 
-def replace_all(content: str, replacements: dict[str, str]) -> str:
+def _trie_pattern(node: dict) -> str:
+    parts = []
+    # follow chains of single characters without recursion, so that long tags do not hit the recursion limit
+    chars = [c for c in node if c != ""]
+    while len(chars) == 1 and "" not in node:
+        parts.append(re.escape(chars[0]))
+        node = node[chars[0]]
+        chars = [c for c in node if c != ""]
+    if chars:
+        group = f"(?:{'|'.join(re.escape(c) + _trie_pattern(node[c]) for c in sorted(chars))})"
+        # a tag ending here is optional: greedy, so the longer tags are tried first
+        parts.append(f"{group}?" if "" in node else group)
+    return "".join(parts)
+
+
+@lru_cache(maxsize=64)
+def _tags_regex(tags: tuple[str, ...]) -> re.Pattern:
+    """
+    Compile tags into a regex of their prefix-trie: e.g. for "{{a}}" and "{{ab}}" the prefix "{{a" is matched once,
+    instead of once per tag as in a plain alternation. At each position the longest matching tag wins.
+    """
+    root = {}
+    for tag in tags:
+        node = root
+        for c in tag:
+            node = node.setdefault(c, {})
+        node[""] = {}
+    return re.compile(_trie_pattern(root))
+
+
+class MultiReplacer:
+    """
+    Replace many strings in one left-to-right pass over the content, instead of one pass per string. The tags are
+    compiled into one regex; at each position the longest matching tag is replaced, and replacements are not
+    searched again, unless fixpoint is set.
+    Example: MultiReplacer({"{{name}}": "x", "{{name_upper}}": "X"}).replace(template)
+    """
+
+    def __init__(self, replacements: dict[str, str], fixpoint: bool = False):
+        """
+        :param replacements: a mapping from original strings to replacements.
+        :param fixpoint: if True, replace again until no tag is left, so that replacements can contain tags.
+        :raise StringUtilError: if a tag is empty
+        """
+        if any(is_empty_string(tag) for tag in replacements):
+            raise StringUtilError("Cannot replace empty strings")
+        self.replacements = dict(replacements)
+        self.fixpoint = fixpoint
+        self.__sub = _tags_regex(tuple(self.replacements)).sub if self.replacements else None
+
+    def __replacement(self, match: re.Match) -> str:
+        return self.replacements[match.group()]
+
+    def replace(self, content: str) -> str:
+        """
+        Replace all occurrences of the tags.
+        :param content: the original string.
+        :return: the modified string.
+        :raise StringUtilError: if fixpoint is set and the replacements contain each other in a cycle
+        """
+        if self.__sub is None or not content:
+            return content
+        content = self.__sub(self.__replacement, content)
+        if not self.fixpoint:
+            return content
+        # without cycles, each pass resolves one level of nesting, and there cannot be more levels than tags
+        for _ in range(len(self.replacements)):
+            replaced = self.__sub(self.__replacement, content)
+            if replaced == content:
+                return content
+            content = replaced
+        raise StringUtilError(f"Replacements do not reach a fixpoint, tags are nested in a cycle: "
+                              f"{list(self.replacements)}")
+
+    __call__ = replace
+
+
+def replace_all(content: str, replacements: dict[str, str], fixpoint: bool = False) -> str:
     """
-    Replace all occurrences of the given replacements.
+    Replace all occurrences of the given replacements, in one pass, see MultiReplacer.
     :param content: the original string.
     :param replacements: a mapping from original strings to replacements.
+    :param fixpoint: if True, replace again until no tag is left, so that replacements can contain tags.
     :return: the modified string.
     """
-    for tag in replacements.keys():
-        content = content.replace(tag, replacements[tag])
-    return content
+    return MultiReplacer(replacements, fixpoint=fixpoint).replace(content)
+
+
+DEFAULT_SENTENCE_SQUEEZE_SET = "\n\t\r *#\\*@><|^&~"
+DEFAULT_EXPECTED_NON_AL_NUMS = ('.', '!', '?', ',', ';',
+                                '"', "'", '/', '%',
+                                '(', ')',
+                                '{', '}',
+                                '[', ']')
+
+
+@lru_cache(maxsize=64)
+def _sentence_normaliser(squeeze_set: str, expected_non_al_nums: tuple[str, ...]) -> Callable[[str], str]:
+    # expected non-alpha-numerics get a space on either side, unless they are pollutants, then pollutants and
+    # spaces are squeezed to single spaces
+    expected = "".join(c for c in expected_non_al_nums if len(c) == 1 and c not in squeeze_set)
+    squeeze = get_squeezer(squeeze_set + " ").squeeze
+    if not expected:
+        return squeeze
+    pad = partial(re.compile(f"[{re.escape(expected)}]").sub, r" \g<0> ")
+    return lambda text: squeeze(pad(text))
 
 
 def normalise_sentence(sentence: str,
-                       squeeze_set: str = "\n\t\r *#\\*@><|^&~",
+                       squeeze_set: str = DEFAULT_SENTENCE_SQUEEZE_SET,
                        expected_non_al_nums: (str | list[str]) = None) -> str:
     """
     Remove most common non-sentence characters, repeated whitespace etc. from a string.
+    Runs in linear time: one regex substitution pads the expected chars, one squeezes the pollutants and spaces.
+    See SentenceNormaliser to normalise many texts.
     :param sentence: the original string containing a sentence.
     :param squeeze_set: pollutant characters to remove.
     :param expected_non_al_nums: list of non-alpha-numeric chars that should not to be stripped.
-    :return:
+    :return: the normalised sentence, empty if it has less than two words
     """
-    sentence = squeeze_chars(source=sentence,
-                             squeeze_set=squeeze_set,
-                             replace_with=" ")
+    if is_empty_string(sentence):
+        return ""
     if expected_non_al_nums is None:
-        expected_non_al_nums = ['.', '!', '?', ',', ';',
-                                '"', "'", '/', '%',
-                                '(', ')',
-                                '{', '}',
-                                '[', ']']
-    reval = ""
-    for c in sentence:
-        if c in expected_non_al_nums:
-            reval += f" {c} "
-        else:
-            reval += c
-    reval = squeeze_chars(source=reval, squeeze_set=" ", replace_with=" ")
+        expected_non_al_nums = DEFAULT_EXPECTED_NON_AL_NUMS
+    normalise = _sentence_normaliser("" if squeeze_set is None else squeeze_set, tuple(expected_non_al_nums))
+    reval = normalise(sentence)
     if reval.count(' ') < 1:
         reval = ""
     return reval
 
 
+class SentenceNormaliser(TextProcessor):
+    """
+    Text-processor stage that applies normalise_sentence() to each text, with the regexes compiled once.
+    """
+
+    def __init__(self,
+                 squeeze_set: str = DEFAULT_SENTENCE_SQUEEZE_SET,
+                 expected_non_al_nums: (str | list[str]) = None):
+        """
+        :param squeeze_set: pollutant characters to remove.
+        :param expected_non_al_nums: list of non-alpha-numeric chars that should not to be stripped.
+        """
+        if expected_non_al_nums is None:
+            expected_non_al_nums = DEFAULT_EXPECTED_NON_AL_NUMS
+        self.squeeze_set = "" if squeeze_set is None else squeeze_set
+        self.expected_non_al_nums = tuple(expected_non_al_nums)
+
+    def process(self, original_text: (str | list[str])) -> list[str]:
+        """
+        Normalise one text or a list of texts.
+        :param original_text: text or list of texts
+        :return: list with a normalised sentence per text, empty strings for texts with less than two words
+        """
+        if isinstance(original_text, str):
+            original_text = [original_text]
+        normalise = _sentence_normaliser(self.squeeze_set, self.expected_non_al_nums)
+        normalised = (normalise(text) if text else "" for text in original_text)
+        return [text if ' ' in text else "" for text in normalised]
+
+
+# number of random bytes drawn at a time, enough for many short strings
+RANDOM_BYTES_BATCH_SIZE = 4096
+# generators that are not seeded, their buffered letters must not be handed out by both parent and child after fork
+_UNSEEDED_RANDOM_STRING_GENERATORS = weakref.WeakSet()
+
+
+class RandomStringGenerator:
+    """
+    Generate random strings from an alphabet, drawing random bytes in bulk rather than one random number per character.
+    Each byte is mapped to a letter by a translate table; bytes beyond the largest multiple of the alphabet size are
+    rejected, so that all letters are equally likely. Letters that occur several times in the alphabet are chosen
+    correspondingly more often, as with random.choice().
+    Modes:
+    - default: Python's global Mersenne-Twister, as random.choice()
+    - secure=True: the operating system's CSPRNG (os.urandom), for tokens and ids that must not be guessable
+    - seed=...: a private, seeded Mersenne-Twister, for reproducible strings in tests
+    Letters are buffered between calls. Forked child processes discard the buffer of unseeded generators, so that
+    they do not repeat the letters of their parent or of each other.
+    Example: RandomStringGenerator("0123456789abcdef", secure=True).strings(count=1000, length=32)
+    """
+
+    def __init__(self, letters: str = None, secure: bool = False, seed: (int | str | bytes) = None):
+        if letters is None:
+            letters = string.ascii_lowercase
+        if not letters:
+            raise StringUtilError("Cannot generate random strings from an empty alphabet")
+        if secure and seed is not None:
+            raise StringUtilError("A seeded random string generator cannot be secure")
+        self.letters = letters
+        if secure:
+            self.__random_bytes = os.urandom
+        elif seed is not None:
+            self.__random_bytes = random.Random(seed).randbytes
+        else:
+            self.__random_bytes = random.randbytes
+        self.__lock = threading.Lock()
+        self.__buffer = ""
+        if seed is None:
+            _UNSEEDED_RANDOM_STRING_GENERATORS.add(self)
+        if len(letters) > 256:
+            # one byte cannot select a letter, this is the slow path
+            self.__byte_table = None
+            return
+        accepted = 256 - 256 % len(letters)
+        self.__rejected = bytes(range(accepted, 256))
+        if all(ord(letter) < 256 for letter in letters):
+            self.__byte_table = bytes(ord(letters[b % len(letters)]) for b in range(256))
+            self.__str_table = None
+        else:
+            self.__byte_table = bytes(b % len(letters) for b in range(256))
+            self.__str_table = dict(enumerate(letters))
+
+    def _reset_after_fork(self):
+        # the lock may have been held by another thread of the parent, which does not exist in the child
+        self.__lock = threading.Lock()
+        self.__buffer = ""
+
+    def __draw(self, size: int) -> str:
+        """
+        Random letters, at least size of them.
+        """
+        if self.__byte_table is None:
+            accepted = (1 << 32) - (1 << 32) % len(self.letters)
+            numbers = (int.from_bytes(self.__random_bytes(4)) for _ in itertools.count())
+            return "".join(self.letters[number % len(self.letters)]
+                           for number in itertools.islice((n for n in numbers if n < accepted), size))
+        # expected bytes per accepted letter is 256 / accepted, ask for a little more than that
+        size = max(size, RANDOM_BYTES_BATCH_SIZE) * 256 // (256 - len(self.__rejected)) + 16
+        letters = self.__random_bytes(size).translate(self.__byte_table, self.__rejected).decode("latin-1")
+        if self.__str_table is not None:
+            letters = letters.translate(self.__str_table)
+        return letters
+
+    def string(self, length: int) -> str:
+        """
+        Create a random string.
+        :param length: number of characters
+        :return: a random string of letters of the alphabet
+        """
+        if length <= 0:
+            return ""
+        with self.__lock:
+            while len(self.__buffer) < length:
+                self.__buffer += self.__draw(length - len(self.__buffer))
+            reval = self.__buffer[:length]
+            self.__buffer = self.__buffer[length:]
+        return reval
+
+    def strings(self, count: int, length: int) -> list[str]:
+        """
+        Create many random strings at once.
+        :param count: number of strings
+        :param length: number of characters per string
+        :return: list of random strings of letters of the alphabet
+        """
+        letters = self.string(count * length)
+        return [letters[i:i + length] for i in range(0, count * length, length)]
+
+
+def _reset_random_string_generators_after_fork():
+    for generator in list(_UNSEEDED_RANDOM_STRING_GENERATORS):
+        generator._reset_after_fork()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_random_string_generators_after_fork)
+
+
 def get_random_string(length: int, letters: str = None) -> str:
     """
-    Create a random string of given length.
+    Create a random string of given length, from Python's global random generator without reading ahead, so that
+    random.seed() makes the strings reproducible. Use a RandomStringGenerator to create many strings fast.
     :param length: number of characters.
     :param letters: characters to choose from.
     :return: a random string.
@@ -230,7 +537,126 @@ def get_random_string(length: int, letters: str = None) -> str:
     # choose from all lowercase letter
     if letters is None:
         letters = string.ascii_lowercase
-    return ''.join(random.choice(letters) for i in range(length))
+    return "".join(random.choices(letters, k=length))
+
+
+def _classify_texts(job: tuple[KeywordMatcher, int, list[str]]) -> list[bool]:
+    """
+    Worker: classify a batch of texts.
+    :param job: tuple of matcher, minimum and texts
+    :return: per text, whether it contains at least minimum keywords
+    """
+    matcher, minimum, texts = job
+    return [matcher.contains_at_least(text, minimum) for text in texts]
+
+
+class KeywordMatcher:
+    """
+    Count how many of a set of keywords occur in texts, as sub-strings. The keywords are compiled once into a regex of
+    their prefix-trie, which finds the keywords starting at each position in one scan of the text; counting stops as
+    soon as a threshold is reached.
+    For few keywords, searching the text for each keyword with str.find() is faster than one scan in Python's regex
+    engine; then the keywords are searched one after the other, also stopping as soon as the result is certain.
+    Example: KeywordMatcher(["invoice", "total", "vat"]).contains_at_least(text, 2)
+    """
+
+    def __init__(self, keywords: (str | Iterable[str])):
+        """
+        :param keywords: the keywords; a keyword that is listed n times counts n times
+        """
+        self.weights: dict[str, int] = {}
+        for word in keywords:
+            self.weights[word] = self.weights.get(word, 0) + 1
+        # the empty string is in every text
+        self.__always = self.weights.pop("", 0)
+        self.__scan = None
+        if len(self.weights) >= MIN_KEYWORDS_FOR_SINGLE_SCAN:
+            self.__scan = re.compile(f"(?=({_tags_regex(tuple(self.weights)).pattern}))").finditer
+            # a match is the longest keyword at its position, the keywords among its prefixes (itself included)
+            # occur at the same position
+            self.__prefix_words = {word: [prefix for prefix in (word[:i] for i in range(1, len(word) + 1))
+                                          if prefix in self.weights]
+                                   for word in self.weights}
+
+    def count(self, text: str, stop_at: int = None) -> int:
+        """
+        Count the keywords contained in the text.
+        :param text: the text to search.
+        :param stop_at: stop counting as soon as this number is reached
+        :return: the number of keywords found, up to the point where counting stopped
+        """
+        found = self.__always
+        if stop_at is not None and found >= stop_at:
+            return found
+        if self.__scan is None:
+            remaining = sum(self.weights.values())
+            for word, weight in self.weights.items():
+                remaining -= weight
+                if word in text:
+                    found += weight
+                    if stop_at is not None and found >= stop_at:
+                        break
+                elif stop_at is not None and found + remaining < stop_at:
+                    # stop_at cannot be reached anymore
+                    break
+            return found
+        seen = set()
+        for match in self.__scan(text):
+            word = match.group(1)
+            if word in seen:
+                continue
+            for prefix in self.__prefix_words[word]:
+                if prefix not in seen:
+                    seen.add(prefix)
+                    found += self.weights[prefix]
+            if stop_at is not None and found >= stop_at:
+                break
+        return found
+
+    def contains_at_least(self, text: str, minimum: int) -> bool:
+        """
+        Check whether a text contains at least `minimum` of the keywords.
+        :param text: the text to check.
+        :param minimum: minimum number of keywords to be found.
+        :return: True if at least `minimum` keywords are in the text, False otherwise.
+        """
+        if minimum < 1:
+            return True
+        return self.count(text, stop_at=minimum) >= minimum
+
+    def classify_many(self,
+                      texts: Iterable[str],
+                      minimum: int,
+                      workers: int = None,
+                      chunk_size: int = None) -> list[bool]:
+        """
+        Check many texts, in parallel if there are enough of them.
+        :param texts: the texts to check.
+        :param minimum: minimum number of keywords to be found.
+        :param workers: number of worker processes, default: number of cores, 1 to check in this process
+        :param chunk_size: number of texts handed to a worker at a time, default: texts spread evenly in 4 rounds
+        :return: per text, whether it contains at least `minimum` keywords, in the order of the texts
+        """
+        texts = list(texts)
+        if workers is None:
+            workers = cpu_count()
+        if workers <= 1 or len(texts) < MIN_TEXTS_FOR_PROCESS_POOL:
+            return [self.contains_at_least(text, minimum) for text in texts]
+        if chunk_size is None:
+            chunk_size = max(1, len(texts) // (workers * 4))
+        jobs = [(self, minimum, texts[i:i + chunk_size]) for i in range(0, len(texts), chunk_size)]
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            return list(itertools.chain.from_iterable(executor.map(_classify_texts, jobs)))
+
+
+@lru_cache(maxsize=64)
+def get_keyword_matcher(keywords: tuple[str, ...]) -> KeywordMatcher:
+    """
+    Get a shared KeywordMatcher for the given keywords.
+    :param keywords: the keywords, as tuple
+    :return: the KeywordMatcher
+    """
+    return KeywordMatcher(keywords)
 
 
 def contains_at_least_n_of(text: str, specified_words: (str | list[str]) = None, minimum: int = 10) -> bool:
@@ -245,8 +671,7 @@ def contains_at_least_n_of(text: str, specified_words: (str | list[str]) = None,
         return False
     if minimum < 1:
         return True
-    word_count = sum(1 for word in specified_words if word in text)
-    return word_count >= minimum
+    return get_keyword_matcher(tuple(specified_words)).contains_at_least(text, minimum)
 
 
 def is_cpp_id(identifier: str) -> bool:
@@ -259,6 +684,10 @@ def is_cpp_id(identifier: str) -> bool:
     if not identifier:
         return False
 
+    # for ASCII, str.isidentifier() checks exactly the letter/digit/underscore rules below
+    if identifier.isascii():
+        return identifier.isidentifier() and not keyword.iskeyword(identifier)
+
     # Check if the first character is a letter or an underscore
     if not (identifier[0].isalpha() or identifier[0] == '_'):
         return False
@@ -294,6 +723,19 @@ def is_cpp_id(identifier: str) -> bool:
 #     return processed_string
 #
 #
+# one pattern for all cases, tried in order; the empty last alternative makes any other identifier MIXED
+_IDENTIFIER_CASE_RE = re.compile(r"^(?=[a-zA-Z_][a-zA-Z0-9_]*$)(?:"
+                                 r"(?P<CONSTANT>[A-Z]+(?:_[A-Z]+)*)$"
+                                 r"|(?P<SNAKE>[a-z]+(?:_[a-z]+)*)$"
+                                 r"|(?P<CAMEL>[a-z]+(?:[A-Z][a-z]*)*(?:_[A-Z]+)*)$"
+                                 r"|(?P<CLASS>[A-Z][a-z]+(?:[A-Z][a-z]*)*(?:_[A-Z]+)*)$"
+                                 r"|(?P<MIXED>))")
+_NON_ID_CHARS_RE = re.compile(r"[^a-zA-Z0-9]+")
+_DIGIT_LETTER_RE = re.compile(r"(?<=[0-9])(?=[a-zA-Z])")
+_CAMEL_HUMP_RE = re.compile(r"(?<!^)(?=[A-Z])")
+CPP_ID_CACHE_SIZE = 4096
+
+
 def identify_case(input_str: str) -> IdentifierStringCase:
     """
     Identifies the case of a string based on IdentifierStringCase.
@@ -302,18 +744,25 @@ def identify_case(input_str: str) -> IdentifierStringCase:
 
     :return: IdentifierStringCase: The matching case type or NO_IDENTIFIER if invalid.
     """
-    if not re.match(r'^[a-zA-Z_][a-zA-Z0-9_]*$', input_str):
+    match = _IDENTIFIER_CASE_RE.match(input_str)
+    if match is None:
         return IdentifierStringCase.NO_IDENTIFIER
+    return IdentifierStringCase[match.lastgroup]
 
-    if re.match(r'^[A-Z]+(_[A-Z]+)*$', input_str):
-        return IdentifierStringCase.CONSTANT
-    if re.match(r'^[a-z]+(_[a-z]+)*$', input_str):
-        return IdentifierStringCase.SNAKE
-    if re.match(r'^[a-z]+([A-Z][a-z]*)*(?:_[A-Z]+)*$', input_str):
-        return IdentifierStringCase.CAMEL
-    if re.match(r'^[A-Z][a-z]+([A-Z][a-z]*)*(?:_[A-Z]+)*$', input_str):
-        return IdentifierStringCase.CLASS
-    return IdentifierStringCase.MIXED
+
+def _camel_from_words(words: (list[str] | tuple[str, ...])) -> str:
+    camel_str = ""
+    for i, word in enumerate(words):
+        if word.isnumeric():
+            if i == 0 or words[i - 1].isnumeric():
+                camel_str += "_" + word
+            else:
+                camel_str += word
+        elif i > 0:
+            camel_str += word.capitalize()
+        else:
+            camel_str += word
+    return camel_str
 
 
 def snake_to_camel(snake_str: str):
@@ -330,20 +779,7 @@ def snake_to_camel(snake_str: str):
     if snake_str.startswith("_"):
         snake_str = snake_str[1:]
 
-    components = snake_str.split('_')
-    camel_str = ""
-    for i, component in enumerate(components):
-        if component.isnumeric():
-            if i == 0 or (i > 0 and components[i - 1].isnumeric()):
-                camel_str += "_" + component
-            else:
-                camel_str += component
-        elif i > 0:
-            camel_str += component.capitalize()
-        else:
-            camel_str += component
-
-    return camel_str  # components[0] + ''.join(x.capitalize() for x in components[1:])
+    return _camel_from_words(snake_str.split('_'))
 
 
 def camel_to_snake(camel_str: str) -> str:
@@ -354,97 +790,231 @@ def camel_to_snake(camel_str: str) -> str:
 
     :return: The string converted to snake_case.
     """
-    snake_str = re.sub(r'(?<!^)(?=[A-Z])', '_', camel_str).lower()
-    return snake_str
+    return _CAMEL_HUMP_RE.sub('_', camel_str).lower()
+
+
+@lru_cache(maxsize=CPP_ID_CACHE_SIZE)
+def _tokenise_id(raw_id: str) -> tuple[str, IdentifierStringCase, tuple[str, ...]]:
+    """
+    Clean a raw string into an identifier and split it into its underscore-separated words, once for all cases.
+    :param raw_id: the raw string
+    :return: tuple of the cleaned identifier, its case and its words (without a leading empty word)
+    """
+    # runs of non-identifier characters and underscores become one underscore
+    valid_id = _NON_ID_CHARS_RE.sub("_", raw_id).strip("_")
+    if not valid_id:
+        return "_", IdentifierStringCase.NO_IDENTIFIER, ()
+    valid_id = _DIGIT_LETTER_RE.sub("_", valid_id)
+    if valid_id[0].isdigit():
+        valid_id = "_" + valid_id
+    words = valid_id.split("_")
+    if not words[0]:
+        words = words[1:]
+    return valid_id, identify_case(valid_id), tuple(words)
 
 
+@lru_cache(maxsize=CPP_ID_CACHE_SIZE)
 def make_cpp_id(raw_id: str, case_flag: IdentifierStringCase) -> str:
     """
     Converts a raw string into a valid identifier based on the provided case flag.
+    Conversions are memoised, so that repeated ids, as in graph nodes and edges, are only converted once.
     :param raw_id: The raw string to convert.
     :param case_flag: The case style to apply.
 
     :return: A valid identifier in the desired case style.
     """
-    valid_id = __pre_clean_id_string(raw_id)
+    valid_id, current_case, words = _tokenise_id(raw_id)
     if valid_id == '_':
         return valid_id
 
-    # Identify the current case of the input
-    current_case = identify_case(valid_id)
-
     # Convert based on target case
     if case_flag == IdentifierStringCase.SNAKE:
         if current_case in {IdentifierStringCase.CAMEL, IdentifierStringCase.CLASS}:
             return camel_to_snake(valid_id)
         return valid_id.lower()
     if case_flag == IdentifierStringCase.CAMEL:
-        return snake_to_camel(valid_id.lower())
+        return _camel_from_words([word.lower() for word in words])
     if case_flag == IdentifierStringCase.CLASS:
         if current_case in {IdentifierStringCase.SNAKE, IdentifierStringCase.CONSTANT}:
-            components = valid_id.lower().split('_')
-            return ''.join(x.capitalize() for x in components)
-        valid_id = snake_to_camel(valid_id)
+            return ''.join(word.capitalize() for word in words)
+        valid_id = _camel_from_words(words)
         return valid_id[0].upper() + valid_id[1:]  # Ensure class-case starts with uppercase
     if case_flag == IdentifierStringCase.CONSTANT:
         return camel_to_snake(valid_id).upper()
     return valid_id
 
 
-def __pre_clean_id_string(raw_id):
-    # Replace non-identifier characters with underscores
-    valid_id = re.sub(r'[^a-zA-Z0-9_]', '_', raw_id)
-    # Collapse consecutive underscores
-    valid_id = re.sub(r'_+', '_', valid_id)
-    # Remove leading/trailing underscores
-    valid_id = valid_id.strip('_') or '_'
-    if valid_id[0].isdigit():
-        valid_id = '_' + valid_id
-    for i in range(len(valid_id) - 1):
-        if valid_id[i].isdigit() and valid_id[i + 1].isalpha():
-            valid_id = valid_id[:i + 1] + "_" + valid_id[i + 1:]
-    return valid_id
+def make_cpp_ids(raw_ids: Iterable[str], case_flag: IdentifierStringCase) -> list[str]:
+    """
+    Converts many raw strings into valid identifiers of the same case style.
+    :param raw_ids: the raw strings to convert
+    :param case_flag: the case style to apply
+
+    :return: the identifiers, in the order of the raw strings
+    """
+    return [make_cpp_id(raw_id, case_flag) for raw_id in raw_ids]
+
+
+# whitespace after '.' or '?' ends a sentence, unless it ends an abbreviation like "e.g." or "Mr."
+_SENTENCE_BOUNDARY_RE = re.compile(r'(?<!\w\.\w.)(?<![A-Z][a-z]\.)(?<=\.|\?)\s')
+# text without a sentence boundary is broken at whitespace (or hard) beyond this size, so it is not kept in memory
+MAX_PENDING_SENTENCE_SIZE = 1 << 16
+CHUNK_MEASURES = ("chars", "bytes")
+
+
+def _utf8_size(text: str) -> int:
+    return len(text.encode("utf-8"))
+
+
+def _iter_sentences(text: (str | Iterable[str])) -> Iterator[str]:
+    pending: list[str] = []
+    pending_size = 0
+    # the boundary regex looks back at most 4 chars, a boundary is only searched in the new piece
+    context = ""
+    for piece in ([text] if isinstance(text, str) else text):
+        start = 0
+        for boundary in _SENTENCE_BOUNDARY_RE.finditer(context + piece, len(context)):
+            end = boundary.start() - len(context)
+            pending.append(piece[start:end])
+            sentence = "".join(pending).strip()
+            if sentence:
+                yield sentence
+            pending = []
+            pending_size = 0
+            start = end + 1
+        pending.append(piece[start:])
+        pending_size += len(piece) - start
+        context = (context + piece)[-4:]
+        if pending_size > MAX_PENDING_SENTENCE_SIZE:
+            # a last word longer than half the limit is split hard, so that the text kept pending is at most half
+            # the limit and the pending pieces are only joined again after at least as many new characters
+            rest = "".join(pending)
+            words = rest.rsplit(None, 1)
+            if len(words) == 2 and len(words[1]) <= MAX_PENDING_SENTENCE_SIZE // 2:
+                yield words[0].strip()
+                rest = words[1]
+            while len(rest) > MAX_PENDING_SENTENCE_SIZE // 2:
+                sentence = rest[:MAX_PENDING_SENTENCE_SIZE].strip()
+                if sentence:
+                    yield sentence
+                rest = rest[MAX_PENDING_SENTENCE_SIZE:]
+            pending = [rest]
+            pending_size = len(rest)
+    sentence = "".join(pending).strip()
+    if sentence:
+        yield sentence
+
+
+def _split_to_budget(sentence: str, max_chunk_size: int, size: Callable[[str], int], additive: bool) -> list[str]:
+    """
+    Split a sentence that exceeds the budget at spaces; words that still exceed it are split into characters, if
+    the measure is additive, otherwise they are kept whole.
+    """
+    pieces = []
+    words = []
+    words_size = 0
+    space_size = size(" ")
+    for word in sentence.split():
+        word_size = size(word)
+        if words and words_size + space_size + word_size > max_chunk_size:
+            pieces.append(" ".join(words))
+            words = []
+            words_size = 0
+        if word_size > max_chunk_size and additive:
+            start = 0
+            part_size = 0
+            for end, c in enumerate(word):
+                c_size = size(c)
+                if part_size + c_size > max_chunk_size and end > start:
+                    pieces.append(word[start:end])
+                    start = end
+                    part_size = 0
+                part_size += c_size
+            word = word[start:]
+            word_size = part_size
+        words_size = words_size + space_size + word_size if words else word_size
+        words.append(word)
+    if words:
+        pieces.append(" ".join(words))
+    return pieces
+
+
+def iter_text_chunks(text: (str | Iterable[str]),
+                     max_chunk_size: int,
+                     measure: (str | Callable[[str], int]) = "chars",
+                     overlap: int = 0) -> Iterator[str]:
+    """
+    Split a text into chunks of whole sentences, lazily. Sentences that do not fit into a chunk on their own are
+    split at spaces, and, for characters and bytes, words that do not fit are split too.
+    :param text: the text, or an iterable of pieces of it, e.g. an open file
+    :param max_chunk_size: maximal size of a chunk
+    :param measure: "chars", "bytes" (utf-8), or a function returning the size of a string, e.g. a token counter;
+                    the size of a chunk is the sum of the sizes of its sentences and the spaces between them
+    :param overlap: maximal size of the sentences at the end of a chunk that are repeated at the start of the next
+    :return: iterator over the chunks, sentences separated by single spaces
+    :raise StringUtilError: if the measure is unknown, or the sizes are not positive, or overlap is not smaller
+    """
+    if measure == "chars":
+        size = len
+    elif measure == "bytes":
+        size = _utf8_size
+    elif callable(measure):
+        size = measure
+    else:
+        raise StringUtilError(f"Unknown chunk measure '{measure}', expected one of {CHUNK_MEASURES} or a function")
+    if max_chunk_size < 1 or overlap < 0 or overlap >= max_chunk_size:
+        raise StringUtilError(f"Need 0 <= overlap ({overlap}) < max_chunk_size ({max_chunk_size})")
+    additive = measure in CHUNK_MEASURES
+    space_size = size(" ")
+
+    chunk: list[tuple[str, int]] = []
+    chunk_size = 0
+    has_new = False
+    for sentence in _iter_sentences(text):
+        sentence_size = size(sentence)
+        pieces = [(sentence, sentence_size)] if sentence_size <= max_chunk_size else \
+            [(piece, size(piece)) for piece in _split_to_budget(sentence, max_chunk_size, size, additive)]
+        for piece, piece_size in pieces:
+            if chunk and chunk_size + space_size + piece_size > max_chunk_size:
+                if has_new:
+                    yield " ".join(sentence for sentence, _ in chunk)
+                # carry the tail of the chunk over, as far as it fits into the overlap and leaves room for the piece
+                carried = []
+                carried_size = 0
+                for previous, previous_size in reversed(chunk):
+                    new_size = carried_size + space_size + previous_size if carried else previous_size
+                    if new_size > overlap or new_size + space_size + piece_size > max_chunk_size:
+                        break
+                    carried.append((previous, previous_size))
+                    carried_size = new_size
+                chunk = carried[::-1]
+                chunk_size = carried_size
+                has_new = False
+            chunk_size = chunk_size + space_size + piece_size if chunk else piece_size
+            chunk.append((piece, piece_size))
+            has_new = True
+    if has_new:
+        yield " ".join(sentence for sentence, _ in chunk)
 
 
 def split_text_into_chunks(text: str, max_chunk_size: int) -> list[str]:
     """
-    Split a text into smaller texts and without splitting words or sentences.
+    Split a text into smaller texts and without splitting words or sentences, unless they are too long.
+    See iter_text_chunks() for big texts, files, other measures and overlapping chunks.
     :param text: the text to split.
-    :param max_chunk_size: the approximate size of the resulting chunks.
+    :param max_chunk_size: the maximal size of the resulting chunks, in characters.
     :return: a list of smaller texts.
     """
-    # Split the text into sentences
-    sentences = re.split(r'(?<!\w\.\w.)(?<![A-Z][a-z]\.)(?<=\.|\?)\s', text)
-
-    # Initialize variables
-    current_chunk = ""
-    chunks = []
+    return list(iter_text_chunks(text, max_chunk_size))
 
-    for sentence in sentences:
-        # Check if adding the sentence to the current chunk exceeds the max_chunk_size
-        if len(current_chunk) + len(sentence) <= max_chunk_size:
-            current_chunk += sentence + " "
-        else:
-            chunks.append(current_chunk)
-            current_chunk = sentence + " "
 
-    # Add the last chunk
-    chunks.append(current_chunk)
-
-    return chunks
-
-
-def is_utf8_ascii(text: str) -> bool:
+def is_utf8_ascii(text: (str | bytes)) -> bool:
     """
     Check whether a string is a UTF-8 ASCII character.
     :param text: the text to check.
     :return: True if the string is a UTF-8 ASCII character, False otherwise.
     """
-    try:
-        text.encode(encoding='utf-8').decode('ascii')
-        return True
-    except UnicodeDecodeError:
-        return False
+    return text.isascii()
 
 
 def is_roman_numeral(text: str) -> bool:
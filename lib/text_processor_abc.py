@@ -1,5 +1,5 @@
 # Repository:   https://github.com/Python-utilities
-# File Name:    lib/test_processor_abc.py
+# File Name:    lib/text_processor_abc.py
 # Description:  abstract base class to formalize text-processors
 #
 # Copyright (C) 2024 Dieter J Kybelksties <github@kybelksties.com>
@@ -22,7 +22,12 @@
 # @author: Dieter J Kybelksties
 
 from __future__ import annotations
+import itertools
 from abc import ABC, abstractmethod
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import cpu_count
+from typing import Iterable, Iterator
 
 
 class TextProcessor(ABC):
@@ -30,3 +35,76 @@ class TextProcessor(ABC):
     @abstractmethod
     def process(self, original_text: (str | list[str])) -> list:
         pass
+
+    def stream(self, texts: Iterable[str]) -> Iterator:
+        """
+        Process texts one at a time, so that only one of them needs to be in memory.
+        :param texts: iterable of texts, e.g. a generator reading documents
+        :return: iterator over the results of all texts
+        """
+        for text in texts:
+            yield from self.process(text)
+
+
+def _process_batch(job: tuple[TextProcessor, list[str]]) -> list[list]:
+    """
+    Worker: process a batch of documents.
+    :param job: tuple of processor and documents
+    :return: the results per document
+    """
+    processor, documents = job
+    return [processor.process(document) for document in documents]
+
+
+class TextPipeline(TextProcessor):
+    """
+    Text-processor that chains stages: each stage processes the list of results of the stage before.
+    Example: TextPipeline([SentenceNormaliser(), ...]).process_many(read_documents(), workers=8)
+    """
+
+    def __init__(self, stages: Iterable[TextProcessor]):
+        self.stages = list(stages)
+
+    def process(self, original_text: (str | list[str])) -> list:
+        """
+        Run a text, or a list of texts, through all stages.
+        :param original_text: text or list of texts
+        :return: the results of the last stage
+        """
+        texts = [original_text] if isinstance(original_text, str) else original_text
+        for stage in self.stages:
+            texts = stage.process(texts)
+        return list(texts)
+
+    def process_many(self,
+                     documents: Iterable[str],
+                     workers: int = None,
+                     chunk_size: int = 64) -> Iterator[list]:
+        """
+        Run many documents through the pipeline, in batches across worker processes. Documents are read from the
+        iterable only as fast as they are processed, so it can be a generator over more documents than fit in memory.
+        The stages must be picklable. If all documents fit into one batch, they are processed in this process.
+        :param documents: iterable of documents
+        :param workers: number of worker processes, default: number of cores, 1 to process in this process
+        :param chunk_size: number of documents handed to a worker at a time
+        :return: iterator over the results per document, in the order of the documents
+        """
+        if workers is None:
+            workers = cpu_count()
+        documents = iter(documents)
+        first_batch = list(itertools.islice(documents, chunk_size))
+        if workers <= 1 or len(first_batch) < chunk_size:
+            for document in itertools.chain(first_batch, documents):
+                yield self.process(document)
+            return
+
+        batches = itertools.chain([first_batch], iter(lambda: list(itertools.islice(documents, chunk_size)), []))
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            pending = deque()
+            for batch in batches:
+                pending.append(executor.submit(_process_batch, (self, batch)))
+                # keep the workers busy, but do not read ahead more than two batches per worker
+                if len(pending) >= 2 * workers:
+                    yield from pending.popleft().result()
+            while pending:
+                yield from pending.popleft().result()
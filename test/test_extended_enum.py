@@ -34,6 +34,7 @@ if not os.path.isdir(dk_lib_dir):
 sys.path.insert(0, dk_lib_dir)
 
 # pylint: disable=wrong-import-position
+import lib.extended_enum
 from lib.exceptions import ExtendedEnumError
 from lib.extended_enum import ExtendedEnum, EnumListType, ExtendedFlag
 from lib.logger import LogLevels, set_logger
@@ -175,6 +176,58 @@ class ExtendedEnumTests(unittest.TestCase):
         with self.assertRaises(ExtendedEnumError):
             SimpleFlag.from_string("SIM")
 
+    def test_repeated_from_string(self):
+        class Level(ExtendedEnum):
+            DEBUG = "debug"
+            DEBUG_ALL = "debug_all"
+            INFO = "info"
+
+        for _ in range(3):
+            self.assertEqual(Level.from_string("inf"), Level.INFO)
+            self.assertEqual(Level.from_string("_A"), Level.DEBUG_ALL)
+            # "debug" is also a sub-sequence of "debug_all", the ambiguity is reported every time
+            with self.assertRaises(ExtendedEnumError) as context:
+                Level.from_string("debug")
+            self.assertIn("multiple matches ['debug', 'debug_all']", str(context.exception))
+            with self.assertRaises(ValueError):
+                Level.from_string("")
+        self.assertEqual(Level.from_string("debug", predicate=lambda alternative: "_" not in alternative), Level.DEBUG)
+
+    def test_from_string_cache_size(self):
+        cache_size = lib.extended_enum.FROM_STRING_CACHE_SIZE
+        lib.extended_enum.FROM_STRING_CACHE_SIZE = 2
+        try:
+            for partial in ("warn", "crit", "inf", "warn", "dbg"):
+                self.assertEqual(LogLevels.from_string(partial), LogLevels.from_string(partial.upper()))
+        finally:
+            lib.extended_enum.FROM_STRING_CACHE_SIZE = cache_size
+
+    def test_flag_bitmasks(self):
+        # pylint cannot infer the values of auto() members, so it takes '|' on them for an unsupported operation
+        # pylint: disable=unsupported-binary-operation
+        class Permission(ExtendedFlag):
+            READ = auto()
+            WRITE = auto()
+            EXECUTE = auto()
+            READ_WRITE = READ | WRITE
+
+        read_write = Permission.READ | Permission.WRITE
+        self.assertIs(read_write, Permission.READ_WRITE)
+        self.assertIs(Permission.READ_WRITE & Permission.WRITE, Permission.WRITE)
+        self.assertIs(Permission.READ | Permission.EXECUTE, Permission.from_mask(5))
+        self.assertEqual(Permission.mask(Permission.READ_WRITE), 3)
+        self.assertEqual(Permission.mask(4), 4)
+        self.assertEqual(Permission.mask("exec"), 4)
+        self.assertEqual(Permission.mask([Permission.READ, "exec"]), 5)
+        with self.assertRaises(ExtendedEnumError):
+            Permission.mask(1.5)
+        with self.assertRaises(TypeError):
+            _ = Permission.READ | 1
+
+        names = Permission.list(EnumListType.NAME)
+        names.append("changed")
+        self.assertListEqual(Permission.list(EnumListType.NAME), ["READ", "WRITE", "EXECUTE"])
+
 
 if __name__ == '__main__':
     set_logger(verbosity=LogLevels.WARNING)
@@ -190,9 +190,43 @@ class FileSystemObjectTests(unittest.TestCase):
         results = find(f"{tmp_dir}", file_type_filter=FileSystemObjectType.DIR, min_depth=0, max_depth=2)
         # print(results)
         self.assertEqual(7, len(results))
+        self.assertEqual(find(f"{tmp_dir}", file_type_filter="fd"), find(f"{tmp_dir}"))
+        self.assertEqual(len(find(f"{tmp_dir}", file_type_filter=FileSystemObjectType.FILE.value)), 6)
 
         remove(tmp_dir)
 
+    def test_file_system_object_type(self):
+        tmp_dir = "/tmp/test_file_system_object_type"
+        mkdir([f"{tmp_dir}/empty", f"{tmp_dir}/full"])
+        touch(f"{tmp_dir}/full/file.txt")
+        os.symlink(f"{tmp_dir}/full/file.txt", f"{tmp_dir}/link")
+        os.symlink(f"{tmp_dir}/missing", f"{tmp_dir}/stale")
+        try:
+            self.assertEqual(FileSystemObjectType.from_file_system_object(f"{tmp_dir}/full/file.txt"),
+                             FileSystemObjectType.FILE)
+            self.assertEqual(FileSystemObjectType.from_file_system_object(Path(f"{tmp_dir}/empty")),
+                             FileSystemObjectType.EMPTY_DIR)
+            self.assertEqual(FileSystemObjectType.from_file_system_object(f"{tmp_dir}/full"),
+                             FileSystemObjectType.NOT_EMPTY_DIR)
+            self.assertEqual(FileSystemObjectType.from_file_system_object(f"{tmp_dir}/link"),
+                             FileSystemObjectType.FILE)
+            self.assertEqual(FileSystemObjectType.from_file_system_object(f"{tmp_dir}/stale"),
+                             FileSystemObjectType.STALE_LINK)
+            self.assertEqual(FileSystemObjectType.from_file_system_object(f"{tmp_dir}/missing"),
+                             FileSystemObjectType.NONE)
+            self.assertEqual(FileSystemObjectType.from_file_system_object(""), FileSystemObjectType.NONE)
+        finally:
+            remove(tmp_dir)
+
+    def test_file_system_object_type_from_string(self):
+        self.assertEqual(FileSystemObjectType.from_string("f"), FileSystemObjectType.FILE)
+        self.assertEqual(FileSystemObjectType.from_string("d"), FileSystemObjectType.DIR)
+        self.assertEqual(FileSystemObjectType.from_string("fd"), FileSystemObjectType.FILE | FileSystemObjectType.DIR)
+        self.assertEqual(FileSystemObjectType.from_string("lfd"), FileSystemObjectType.from_string("dfl"))
+        self.assertEqual(FileSystemObjectType.from_string("mount"), FileSystemObjectType.MOUNT)
+        self.assertEqual(FileSystemObjectType.mask("dl"),
+                         FileSystemObjectType.DIR.value | FileSystemObjectType.LINK.value)
+
 
 if __name__ == '__main__':
     set_logger(verbosity=LogLevels.WARNING)
@@ -0,0 +1,112 @@
+#!/bin/env python3
+# Repository:   https://github.com/Python-utilities
+# File Name:    test/test_json_backend.py
+# Description:  test json backends
+#
+# Copyright (C) 2024 Dieter J Kybelksties <github@kybelksties.com>
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 59 Temple Place - Suite 330, Boston, MA  02111-1307, USA.
+#
+# @date: 2024-07-13
+# @author: Dieter J Kybelksties
+
+import json
+import math
+import os
+import sys
+import unittest
+
+this_dir = os.path.dirname(os.path.abspath(__file__))
+dk_lib_dir = os.path.abspath(f"{this_dir}/../../Python-utilities")
+if not os.path.isdir(dk_lib_dir):
+    raise FileNotFoundError(f"Library directory '{dk_lib_dir}' cannot be found")
+sys.path.insert(0, dk_lib_dir)
+
+# pylint: disable=wrong-import-position
+from lib.file_system_object import remove
+from lib.json_backend import JsonBackendType, available_json_backends, get_json_backend, set_default_json_backend
+from lib.json_object import JsonObject
+from lib.logger import set_logger, LogLevels
+
+
+class JsonBackendTestCase(unittest.TestCase):
+    DOCUMENT = {"key": "value", "list": [1, 2.5, True, None, "ü"], "nested": {"a": {"b": []}}}
+
+    def test_std_json_always_available(self):
+        self.assertIn(JsonBackendType.JSON, available_json_backends())
+        self.assertEqual(get_json_backend("json").backend_type, JsonBackendType.JSON)
+        self.assertEqual(get_json_backend(JsonBackendType.JSON).backend_type, JsonBackendType.JSON)
+        self.assertIn(get_json_backend().backend_type, available_json_backends())
+
+    def test_round_trip_all_backends(self):
+        for backend_type in available_json_backends():
+            with self.subTest(backend=str(backend_type)):
+                backend = get_json_backend(backend_type)
+                self.assertEqual(backend.loads(backend.dumps(self.DOCUMENT)), self.DOCUMENT)
+                self.assertEqual(backend.loads(backend.dumps(self.DOCUMENT, indent=2)), self.DOCUMENT)
+                self.assertEqual(backend.loads(backend.dumps(self.DOCUMENT, indent=4)), self.DOCUMENT)
+
+    def test_decode_errors_are_uniform(self):
+        for backend_type in available_json_backends():
+            with self.subTest(backend=str(backend_type)):
+                with self.assertRaises(json.JSONDecodeError):
+                    get_json_backend(backend_type).loads('{"key": ')
+
+    def test_stdlib_is_default(self):
+        self.assertEqual(get_json_backend().backend_type, JsonBackendType.JSON)
+        self.assertEqual(str(JsonObject(json_obj={"a": 1, "b": "ü"})), '{"a": 1, "b": "\\u00fc"}')
+
+    def test_values_beyond_native_range(self):
+        big_int = 123456789012345678901234567890
+        for backend_type in available_json_backends():
+            with self.subTest(backend=str(backend_type)):
+                backend = get_json_backend(backend_type)
+                self.assertEqual(backend.loads(str(big_int)), big_int)
+                self.assertEqual(backend.loads(f'{{"x": [{-big_int}]}}'), {"x": [-big_int]})
+                self.assertEqual(backend.loads("18446744073709551616"), 2 ** 64)
+                self.assertEqual(backend.loads(backend.dumps([big_int])), [big_int])
+                parsed = backend.loads('{"x": NaN, "y": Infinity, "z": -Infinity, "w": 1e400}')
+                self.assertTrue(math.isnan(parsed["x"]))
+                self.assertEqual(parsed["y"], math.inf)
+                self.assertEqual(parsed["z"], -math.inf)
+                self.assertEqual(parsed["w"], math.inf)
+                self.assertTrue(math.isnan(backend.loads(backend.dumps({"x": math.nan}))["x"]))
+                self.assertEqual(backend.loads(backend.dumps([math.inf, None])), [math.inf, None])
+
+    def test_json_object_per_call_backend(self):
+        json_file = "/tmp/test_json_backend.json"
+        for backend_type in available_json_backends():
+            with self.subTest(backend=str(backend_type)):
+                json_obj = JsonObject(json_str=json.dumps(self.DOCUMENT))
+                json_obj.to_file(json_file, backend=backend_type)
+                reloaded = JsonObject(filename=json_file, backend=backend_type)
+                self.assertEqual(reloaded.get(), self.DOCUMENT)
+                self.assertEqual(JsonObject(json_obj.to_str(backend=backend_type)).get(), self.DOCUMENT)
+        remove(json_file)
+
+    def test_set_default_backend(self):
+        try:
+            set_default_json_backend(JsonBackendType.AUTO)
+            self.assertEqual(get_json_backend().backend_type, available_json_backends()[0])
+            set_default_json_backend("json")
+            self.assertEqual(get_json_backend().backend_type, JsonBackendType.JSON)
+            self.assertEqual(str(JsonObject(json_obj={"key": 1})), '{"key": 1}')
+        finally:
+            set_default_json_backend()
+
+
+if __name__ == '__main__':
+    set_logger(verbosity=LogLevels.WARNING)
+    unittest.main()
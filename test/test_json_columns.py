@@ -0,0 +1,85 @@
+#!/bin/env python3
+# Repository:   https://github.com/Python-utilities
+# File Name:    test/test_json_columns.py
+# Description:  test flattening json arrays into columns
+#
+# Copyright (C) 2024 Dieter J Kybelksties <github@kybelksties.com>
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 59 Temple Place - Suite 330, Boston, MA  02111-1307, USA.
+#
+# @date: 2024-07-13
+# @author: Dieter J Kybelksties
+
+
+import math
+import os
+import sys
+import unittest
+
+this_dir = os.path.dirname(os.path.abspath(__file__))
+dk_lib_dir = os.path.abspath(f"{this_dir}/../../Python-utilities")
+if not os.path.isdir(dk_lib_dir):
+    raise FileNotFoundError(f"Library directory '{dk_lib_dir}' cannot be found")
+sys.path.insert(0, dk_lib_dir)
+
+# pylint: disable=wrong-import-position
+import lib.json_columns
+from lib.exceptions import JsonGeneralError
+from lib.json_object import JsonObject
+from lib.logger import set_logger, LogLevels
+
+
+class JsonColumnsTestCase(unittest.TestCase):
+    def setUp(self):
+        self.json_obj = JsonObject(json_obj={"merge_requests": [
+            {"id": 1, "votes": 2, "draft": False, "author": {"name": "Alice"}, "labels": ["bug"]},
+            {"id": 2, "votes": 0.5, "draft": True, "author": {"name": "Bob"}, "labels": []},
+            {"id": 3, "draft": False, "labels": ["bug", "ui"]},
+        ]})
+
+    def test_python_columns(self):
+        columns = self.json_obj.to_columns("merge_requests", ["id", "author.name", "labels/[0]"], "python")
+        self.assertEqual(columns, {"id": [1, 2, 3],
+                                   "author.name": ["Alice", "Bob", None],
+                                   "labels/[0]": ["bug", None, "bug"]})
+        columns = self.json_obj.to_columns("merge_requests", {"author": "author/name"}, "python")
+        self.assertEqual(columns, {"author": ["Alice", "Bob", None]})
+
+        with self.assertRaises(JsonGeneralError):
+            self.json_obj.to_columns("merge_requests/[0]", ["id"], "python")
+        with self.assertRaises(JsonGeneralError):
+            self.json_obj.to_columns("merge_requests", ["id"], "excel")
+
+    @unittest.skipIf(lib.json_columns.numpy is None, "numpy is not installed")
+    def test_numpy_columns(self):
+        columns = self.json_obj.to_columns("merge_requests", ["id", "votes", "draft", "author.name"], "numpy")
+        self.assertEqual(columns["id"].dtype.name, "int64")
+        self.assertEqual(columns["votes"].dtype.name, "float64")
+        self.assertTrue(math.isnan(columns["votes"][2]))
+        self.assertEqual(columns["draft"].dtype.name, "bool")
+        self.assertEqual(columns["author.name"].dtype.name, "object")
+        self.assertEqual(columns["votes"][:2].sum(), 2.5)
+
+    @unittest.skipIf(lib.json_columns.pandas is None, "pandas is not installed")
+    def test_pandas_columns(self):
+        data_frame = self.json_obj.to_columns("merge_requests", ["id", "author.name"], "pandas")
+        self.assertEqual(list(data_frame.columns), ["id", "author.name"])
+        self.assertEqual(list(data_frame["id"]), [1, 2, 3])
+        self.assertEqual(data_frame["author.name"][1], "Bob")
+
+
+if __name__ == '__main__':
+    set_logger(verbosity=LogLevels.WARNING)
+    unittest.main()
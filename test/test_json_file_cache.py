@@ -0,0 +1,134 @@
+#!/bin/env python3
+# Repository:   https://github.com/Python-utilities
+# File Name:    test/test_json_file_cache.py
+# Description:  test the cache of parsed json-files
+#
+# Copyright (C) 2024 Dieter J Kybelksties <github@kybelksties.com>
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 59 Temple Place - Suite 330, Boston, MA  02111-1307, USA.
+#
+# @date: 2024-07-13
+# @author: Dieter J Kybelksties
+
+
+import json
+import os
+import sys
+import unittest
+from datetime import datetime, timedelta
+
+this_dir = os.path.dirname(os.path.abspath(__file__))
+dk_lib_dir = os.path.abspath(f"{this_dir}/../../Python-utilities")
+if not os.path.isdir(dk_lib_dir):
+    raise FileNotFoundError(f"Library directory '{dk_lib_dir}' cannot be found")
+sys.path.insert(0, dk_lib_dir)
+
+# pylint: disable=wrong-import-position
+import lib.json_file_cache
+from lib.file_system_object import remove, set_file_last_modified
+from lib.file_utils import write_file
+from lib.json_file_cache import JsonFileCache, enable_json_file_cache, disable_json_file_cache
+from lib.json_object import JsonObject
+from lib.logger import set_logger, LogLevels
+
+
+class JsonFileCacheTestCase(unittest.TestCase):
+    TEST_DIR = "/tmp/test_json_file_cache"
+    CACHE_DIR = "/tmp/test_json_file_cache/cache"
+
+    def setUp(self):
+        remove(self.TEST_DIR, force=True)
+        self.min_cached_file_size = lib.json_file_cache.MIN_CACHED_FILE_SIZE
+        lib.json_file_cache.MIN_CACHED_FILE_SIZE = 0
+        self.parsed = 0
+
+    def tearDown(self):
+        lib.json_file_cache.MIN_CACHED_FILE_SIZE = self.min_cached_file_size
+        disable_json_file_cache()
+        remove(self.TEST_DIR, force=True)
+
+    def parser(self, filename: str):
+        def parse():
+            self.parsed += 1
+            with open(filename, encoding="utf-8") as file:
+                return json.load(file)
+        return parse
+
+    def test_load(self):
+        filename = f"{self.TEST_DIR}/file.json"
+        for serialiser in ("marshal", "pickle"):
+            with self.subTest(serialiser=serialiser):
+                write_file(filename, '{"key": [1, 2.5, "three", null, true]}')
+                self.parsed = 0
+                cache = JsonFileCache(self.CACHE_DIR, serialiser=serialiser)
+                self.assertEqual(cache.load(filename, self.parser(filename)), {"key": [1, 2.5, "three", None, True]})
+                self.assertEqual(cache.load(filename, self.parser(filename)), {"key": [1, 2.5, "three", None, True]})
+                self.assertEqual(self.parsed, 1)
+
+                write_file(filename, '{"key": "changed"}')
+                set_file_last_modified(filename, datetime.now() + timedelta(seconds=10))
+                self.assertEqual(cache.load(filename, self.parser(filename)), {"key": "changed"})
+                self.assertEqual(self.parsed, 2)
+                self.assertEqual([entry.source for entry in cache.entries()], [filename])
+
+    def test_eviction(self):
+        cache = JsonFileCache(self.CACHE_DIR)
+        for i in range(3):
+            filename = f"{self.TEST_DIR}/file{i}.json"
+            write_file(filename, json.dumps({"data": "x" * 1000}))
+            cache.load(filename, self.parser(filename))
+        self.assertEqual(len(cache.entries()), 3)
+        cache.load(f"{self.TEST_DIR}/file0.json", self.parser(f"{self.TEST_DIR}/file0.json"))
+
+        removed = cache.evict(max_size=cache.total_size() - 1)
+        self.assertEqual([entry.source for entry in removed], [f"{self.TEST_DIR}/file1.json"])
+        remove(f"{self.TEST_DIR}/file2.json")
+        self.assertEqual([entry.source for entry in cache.evict()], [f"{self.TEST_DIR}/file2.json"])
+        self.assertEqual(cache.clear(), 1)
+        self.assertEqual(cache.entries(), [])
+
+    def test_json_object(self):
+        filename = f"{self.TEST_DIR}/file.json"
+        write_file(filename, '{"key": "value"}')
+        cache = enable_json_file_cache(self.CACHE_DIR)
+        self.assertEqual(JsonObject(filename=filename).get("key"), "value")
+        self.assertEqual(len(cache.entries()), 1)
+        self.assertEqual(JsonObject(filename=filename).get("key"), "value")
+        # different parse options are cached separately
+        json_obj = JsonObject()
+        json_obj.from_file(filename, encoding="latin-1")
+        self.assertEqual(json_obj.get("key"), "value")
+        self.assertEqual(len(cache.entries()), 2)
+
+    def test_size_tracking(self):
+        cache = JsonFileCache(self.CACHE_DIR)
+        filenames = [f"{self.TEST_DIR}/file{i}.json" for i in range(3)]
+        for filename in filenames:
+            write_file(filename, json.dumps({"data": "x" * 1000}))
+        cache.load(filenames[0], self.parser(filenames[0]))
+        cache.max_size = 2 * cache.total_size()
+        remove(filenames[0])
+
+        # below the maximum size the cache directory is not scanned, so the stale entry survives
+        cache.load(filenames[1], self.parser(filenames[1]))
+        self.assertEqual(len(cache.entries()), 2)
+        # crossing it removes stale entries first
+        cache.load(filenames[2], self.parser(filenames[2]))
+        self.assertEqual([entry.source for entry in cache.entries()], filenames[1:])
+
+
+if __name__ == '__main__':
+    set_logger(verbosity=LogLevels.WARNING)
+    unittest.main()
@@ -0,0 +1,122 @@
+#!/bin/env python3
+# Repository:   https://github.com/Python-utilities
+# File Name:    test/test_json_file_validator.py
+# Description:  test parallel validation of json files
+#
+# Copyright (C) 2024 Dieter J Kybelksties <github@kybelksties.com>
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 59 Temple Place - Suite 330, Boston, MA  02111-1307, USA.
+#
+# @date: 2024-07-13
+# @author: Dieter J Kybelksties
+
+import os
+import sys
+import unittest
+from datetime import datetime, timedelta
+
+this_dir = os.path.dirname(os.path.abspath(__file__))
+dk_lib_dir = os.path.abspath(f"{this_dir}/../../Python-utilities")
+if not os.path.isdir(dk_lib_dir):
+    raise FileNotFoundError(f"Library directory '{dk_lib_dir}' cannot be found")
+sys.path.insert(0, dk_lib_dir)
+
+# pylint: disable=wrong-import-position
+import lib.json_file_validator
+from lib.file_system_object import remove, set_file_last_modified
+from lib.file_utils import write_file
+from lib.json_backend import available_json_backends
+from lib.json_file_validator import validate_json_files
+from lib.json_object import JsonObject
+from lib.logger import set_logger, LogLevels
+
+
+class JsonFileValidatorTestCase(unittest.TestCase):
+    TEST_DIR = "/tmp/test_json_file_validator"
+    CACHE_FILE = "/tmp/test_json_file_validator_cache/cache.json"
+
+    def setUp(self):
+        remove([self.TEST_DIR, os.path.dirname(self.CACHE_FILE)], force=True)
+        write_file(f"{self.TEST_DIR}/good.json", '{"key": [1, 2, 3]}')
+        write_file(f"{self.TEST_DIR}/sub/good2.json", '[]')
+        write_file(f"{self.TEST_DIR}/sub/bad.json", '{\n  "key": [1, 2,\n}')
+        write_file(f"{self.TEST_DIR}/not_json.txt", '{')
+
+    def tearDown(self):
+        remove([self.TEST_DIR, os.path.dirname(self.CACHE_FILE)], force=True)
+
+    def test_assert_json_files_valid(self):
+        reval, failed_files = JsonObject.assert_json_files_valid(self.TEST_DIR, workers=1)
+        self.assertEqual(reval, -1)
+        self.assertEqual(failed_files, [f"{self.TEST_DIR}/sub/bad.json"])
+
+        remove(f"{self.TEST_DIR}/sub/bad.json")
+        self.assertEqual(JsonObject.assert_json_files_valid(self.TEST_DIR, workers=1), (0, []))
+
+    def test_error_positions(self):
+        verdicts = {os.path.basename(v.path): v for v in validate_json_files(self.TEST_DIR, workers=1)}
+        self.assertEqual(sorted(verdicts.keys()), ["bad.json", "good.json", "good2.json"])
+        self.assertTrue(verdicts["good.json"].valid)
+        bad = verdicts["bad.json"]
+        self.assertFalse(bad.valid)
+        self.assertEqual(bad.line, 3)
+        self.assertIsNotNone(bad.column)
+        self.assertIsNotNone(bad.offset)
+
+    def test_process_pool(self):
+        min_files = lib.json_file_validator.MIN_FILES_FOR_PROCESS_POOL
+        lib.json_file_validator.MIN_FILES_FOR_PROCESS_POOL = 0
+        try:
+            verdicts = validate_json_files(self.TEST_DIR, workers=2, chunk_size=1)
+        finally:
+            lib.json_file_validator.MIN_FILES_FOR_PROCESS_POOL = min_files
+        self.assertEqual([v.valid for v in verdicts], [True, False, True])
+
+    def test_cache(self):
+        verdicts = validate_json_files(self.TEST_DIR, workers=1, cache_file=self.CACHE_FILE)
+        self.assertFalse(any(v.from_cache for v in verdicts))
+        self.assertTrue(os.path.isfile(self.CACHE_FILE))
+
+        verdicts = validate_json_files(self.TEST_DIR, workers=1, cache_file=self.CACHE_FILE)
+        self.assertTrue(all(v.from_cache for v in verdicts))
+        self.assertEqual([v.valid for v in verdicts], [True, False, True])
+
+        # touched, but same content: verdict taken from the cache by hash
+        set_file_last_modified(f"{self.TEST_DIR}/good.json", datetime.now() + timedelta(seconds=10))
+        verdicts = validate_json_files(self.TEST_DIR, workers=1, cache_file=self.CACHE_FILE)
+        self.assertTrue(verdicts[0].valid)
+
+        # changed content is validated again
+        write_file(f"{self.TEST_DIR}/good.json", '{"key": ')
+        set_file_last_modified(f"{self.TEST_DIR}/good.json", datetime.now() + timedelta(seconds=20))
+        verdicts = validate_json_files(self.TEST_DIR, workers=1, cache_file=self.CACHE_FILE)
+        self.assertFalse(verdicts[0].valid)
+        self.assertFalse(verdicts[0].from_cache)
+
+    def test_cache_per_backend(self):
+        backends = [str(backend_type) for backend_type in available_json_backends()]
+        if len(backends) < 2:
+            self.skipTest("only one json backend installed")
+        validate_json_files(self.TEST_DIR, workers=1, cache_file=self.CACHE_FILE, backend=backends[-1])
+        verdicts = validate_json_files(self.TEST_DIR, workers=1, cache_file=self.CACHE_FILE, backend=backends[-1])
+        self.assertTrue(all(v.from_cache for v in verdicts))
+        verdicts = validate_json_files(self.TEST_DIR, workers=1, cache_file=self.CACHE_FILE, backend=backends[0])
+        self.assertFalse(any(v.from_cache for v in verdicts))
+        self.assertEqual([v.valid for v in verdicts], [True, False, True])
+
+
+if __name__ == '__main__':
+    set_logger(verbosity=LogLevels.WARNING)
+    unittest.main()
@@ -0,0 +1,95 @@
+#!/bin/env python3
+# Repository:   https://github.com/Python-utilities
+# File Name:    test/test_json_index.py
+# Description:  test hash indexes on json arrays
+#
+# Copyright (C) 2024 Dieter J Kybelksties <github@kybelksties.com>
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 59 Temple Place - Suite 330, Boston, MA  02111-1307, USA.
+#
+# @date: 2024-07-13
+# @author: Dieter J Kybelksties
+
+
+import os
+import sys
+import unittest
+
+this_dir = os.path.dirname(os.path.abspath(__file__))
+dk_lib_dir = os.path.abspath(f"{this_dir}/../../Python-utilities")
+if not os.path.isdir(dk_lib_dir):
+    raise FileNotFoundError(f"Library directory '{dk_lib_dir}' cannot be found")
+sys.path.insert(0, dk_lib_dir)
+
+# pylint: disable=wrong-import-position
+from lib.exceptions import JsonPathFormatError
+from lib.json_index import JsonArrayIndex
+from lib.json_object import JsonObject
+from lib.logger import set_logger, LogLevels
+
+
+class JsonIndexTestCase(unittest.TestCase):
+    def setUp(self):
+        self.json_obj = JsonObject(json_obj={"pipelines": [{"id": 1, "status": "running"},
+                                                           {"id": 2, "status": "failed"},
+                                                           {"id": 3, "status": "failed"},
+                                                           {"id": 4}]})
+        self.json_obj.create_index("pipelines", "status")
+
+    def statuses(self, status: str) -> list[int]:
+        return [pipeline["id"] for pipeline in self.json_obj.lookup("pipelines", "status", status)]
+
+    def test_lookup(self):
+        self.assertEqual(self.statuses("failed"), [2, 3])
+        self.assertEqual(self.statuses("unknown"), [])
+        # without index
+        self.assertEqual(self.json_obj.lookup("pipelines", "id", 4), [{"id": 4}])
+        self.assertEqual(self.json_obj.lookup("missing", "id", 4), [])
+        with self.assertRaises(JsonPathFormatError):
+            self.json_obj.create_index("pipelines/[$]", "id")
+
+    def test_consistent_through_set(self):
+        self.json_obj.set("pipelines/[0]/status", "failed")
+        self.assertEqual(self.statuses("failed"), [1, 2, 3])
+        self.json_obj.set_many({"pipelines/[2]/status": "success", "pipelines/[3]/status": "failed"}, force=True)
+        self.assertEqual(self.statuses("failed"), [1, 2, 4])
+        self.json_obj.set("pipelines/[^]", {"id": 0, "status": "failed"}, force=True)
+        self.assertEqual(self.statuses("failed"), [0, 1, 2, 4])
+        self.json_obj.set("pipelines", [{"id": 7, "status": "failed"}])
+        self.assertEqual(self.statuses("failed"), [7])
+
+    def test_consistent_through_patches(self):
+        target = JsonObject(json_obj=self.json_obj.get())
+        target.set("pipelines/[1]/status", "success")
+        target.set("pipelines/[$]", {"id": 5, "status": "failed"}, force=True)
+        self.json_obj.apply_patch(self.json_obj.diff(target))
+        self.assertEqual(self.statuses("failed"), [3, 5])
+        self.json_obj.apply_patch([{"op": "remove", "path": "/pipelines/0"}])
+        self.assertEqual(self.statuses("failed"), [3, 5])
+        self.assertEqual(self.statuses("running"), [])
+
+    def test_used_by_queries(self):
+        index = self.json_obj.indexes[(("pipelines",), "status")]
+        self.assertIsInstance(index, JsonArrayIndex)
+        self.assertEqual(self.json_obj.query("pipelines/[?status==failed]/id"), [2, 3])
+        # the query is answered from the index, not by scanning
+        self.json_obj.json_["pipelines"][0]["status"] = "failed"
+        self.assertEqual(self.json_obj.query("pipelines/[?status==failed]/id"), [2, 3])
+        self.assertEqual(self.json_obj.query("pipelines/[?status!=failed]/id"), [])
+
+
+if __name__ == '__main__':
+    set_logger(verbosity=LogLevels.WARNING)
+    unittest.main()
@@ -22,7 +22,9 @@
 # @date: 2024-07-13
 # @author: Dieter J Kybelksties
 
+import copy
 import os
+import pickle
 import sys
 import unittest
 
@@ -181,6 +183,36 @@ class JsonKeyPathTestCase(unittest.TestCase):
         json_keys = JsonKeyPath(["key", "[$]", "path", "[123]", "xxx", "[$]", "yyy"])
         self.assertEqual(str(json_keys), "key/[$]/path/[123]/xxx/[$]/yyy")
 
+    def test_immutable_and_hashable(self):
+        path = JsonKeyPath("key/[$]/path/[123]")
+        self.assertEqual(path, JsonKeyPath(["key", "[$]", "path", "[123]"]))
+        self.assertEqual(hash(path), hash(JsonKeyPath(["key", "[$]", "path", "[123]"])))
+        self.assertNotEqual(path, JsonKeyPath("key/[^]/path/[123]"))
+        self.assertEqual({path: 1}[JsonKeyPath("key/[$]/path/[123]")], 1)
+        self.assertIsInstance(path.key_list(), tuple)
+        self.assertEqual(JsonKeyPath(path), path)
+        self.assertEqual(JsonKeyPath(list(path)), path)
+        with self.assertRaises(AttributeError):
+            path.keys = ()
+        with self.assertRaises(AttributeError):
+            path[0].key = "other"
+        with self.assertRaises(AttributeError):
+            path[1].index = 1
+
+        for key in path:
+            self.assertEqual(hash(key), hash(copy.deepcopy(key)))
+            self.assertEqual(pickle.loads(pickle.dumps(key)), key)
+        self.assertEqual(pickle.loads(pickle.dumps(path)), path)
+        self.assertNotEqual(JsonStringKey("0"), JsonIndexKey(0))
+        self.assertNotEqual(JsonIndexKey("^"), JsonIndexKey("$"))
+
+    def test_interning(self):
+        self.assertIs(JsonStringKey("key"), JsonStringKey("key"))
+        self.assertIs(JsonIndexKey(7), JsonIndexKey("7"))
+        self.assertIs(JsonIndexKey("$"), JsonKeyPath("[$]")[0])
+        self.assertIs(JsonKeyPath("a/[1]")[1], JsonKeyPath(["b", "[1]"])[1])
+        self.assertEqual(JsonIndexKey(10 ** 6), JsonIndexKey(str(10 ** 6)))
+
 
 if __name__ == '__main__':
     set_logger(verbosity=LogLevels.WARNING)
@@ -22,9 +22,11 @@
 # @date: 2024-07-13
 # @author: Dieter J Kybelksties
 
+import json
 import os
 import sys
 import unittest
+from enum import IntEnum, StrEnum
 
 this_dir = os.path.dirname(os.path.abspath(__file__))
 dk_lib_dir = os.path.abspath(f"{this_dir}/../../Python-utilities")
@@ -33,7 +35,7 @@ if not os.path.isdir(dk_lib_dir):
 sys.path.insert(0, dk_lib_dir)
 
 # pylint: disable=wrong-import-position
-from lib.exceptions import JsonKeyStringRequired, JsonValueMismatch, JsonIndexRequired
+from lib.exceptions import JsonGeneralError, JsonKeyStringRequired, JsonValueMismatch, JsonIndexRequired
 from lib.file_system_object import remove
 from lib.file_utils import write_file
 from lib.json_object import JsonObject
@@ -77,6 +79,39 @@ class JsonObjectTestCase(unittest.TestCase):
         self.assertEqual(json_obj.get("list/[1]"), 2)
         remove("/tmp/test_json.json")
 
+    def test_from_object_conversion(self):
+        original = {"set": {3}, "tuple": (1, (2, 3)), 1: None, None: True, "obj": LogLevels.INFO}
+        json_obj = JsonObject(json_obj=original)
+        self.assertEqual(json_obj.get(), {"set": [3], "tuple": [1, [2, 3]], "1": None, "null": True, "obj": "info"})
+        json_obj.set("tuple/[0]", 5)
+        self.assertEqual(original["tuple"], (1, (2, 3)))
+
+        nested = {"key": ["val"]}
+        json_obj = JsonObject(json_obj=nested)
+        json_obj.set("key/[0]", "changed")
+        self.assertEqual(nested, {"key": ["val"]})
+
+        json_obj = JsonObject(json_obj=nested, adopt=True)
+        json_obj.set("key/[0]", "changed")
+        self.assertEqual(nested, {"key": ["changed"]})
+
+    def test_from_object_enum_conversion(self):
+        class Number(IntEnum):
+            ONE = 1
+
+        class Letter(StrEnum):
+            A = "a"
+
+        # enum keys and values are reduced to their plain values, the same as a json.dumps/json.loads round-trip
+        original = {Number.ONE: Letter.A, Letter.A: [Number.ONE, 2.5], "nested": {Number.ONE: Number.ONE}}
+        converted = JsonObject(json_obj=original).get()
+        self.assertEqual(converted, json.loads(json.dumps(original)))
+        self.assertEqual(converted, {"1": "a", "a": [1, 2.5], "nested": {"1": 1}})
+        self.assertEqual({type(key) for key in converted}, {str})
+        self.assertIs(type(converted["1"]), str)
+        self.assertIs(type(converted["a"][0]), int)
+        self.assertIs(type(converted["nested"]["1"]), int)
+
     def test_key_exists(self):
         json_obj = JsonObject(json_obj={"key": ["val"]})
         self.assertTrue(json_obj.key_exists("key"))
@@ -234,6 +269,57 @@ class JsonObjectTestCase(unittest.TestCase):
         with self.assertRaises(JsonValueMismatch):
             json_obj.set(keys="key/path/[3]/mixed/[$]", value=1234, force=False)
 
+    def test_snapshots(self):
+        json_obj = JsonObject(json_obj={"config": {"hosts": ["a", "b"], "port": 80}, "other": {"big": [1, 2, 3]}})
+        snapshot = json_obj.snapshot()
+        self.assertTrue(snapshot.frozen)
+        with self.assertRaises(JsonGeneralError):
+            snapshot.set("config/port", 81)
+        json_file = "/tmp/test_json_object_snapshot.json"
+        write_file(json_file, '{"replaced": true}')
+        for replace in (lambda: snapshot.from_string('{"replaced": true}'),
+                        lambda: snapshot.from_object({"replaced": True}),
+                        lambda: snapshot.from_object({"replaced": True}, adopt=True),
+                        lambda: snapshot.from_file(json_file)):
+            with self.assertRaises(JsonGeneralError):
+                replace()
+        remove(json_file)
+        self.assertEqual(snapshot.get("config/port"), 80)
+
+        variant = snapshot.derive()
+        variant.set("config/hosts/[$]", "c")
+        json_obj.set("config/port", 8080)
+        self.assertEqual(snapshot.get("config"), {"hosts": ["a", "b"], "port": 80})
+        self.assertEqual(variant.get("config"), {"hosts": ["a", "c"], "port": 80})
+        self.assertEqual(json_obj.get("config"), {"hosts": ["a", "b"], "port": 8080})
+        # unchanged sub-trees are shared, changed paths are copied
+        self.assertIs(variant.get("other"), snapshot.get("other"))
+        self.assertIsNot(variant.get("config"), snapshot.get("config"))
+
+        variant.apply_patch([{"op": "remove", "path": "/other/big/0"}])
+        self.assertEqual(snapshot.get("other/big"), [1, 2, 3])
+        self.assertEqual(variant.get("other/big"), [2, 3])
+
+        # the paths of later operations are only known after the operations before them, e.g. after a move
+        json_obj = JsonObject(json_obj={"a": {"x": 1}})
+        snapshot = json_obj.snapshot()
+        json_obj.apply_patch([{"op": "move", "from": "/a", "path": "/b"},
+                              {"op": "replace", "path": "/b/x", "value": 2}])
+        self.assertEqual(snapshot.get(), {"a": {"x": 1}})
+        self.assertEqual(json_obj.get(), {"b": {"x": 2}})
+        variant = snapshot.derive()
+        variant.apply_patch([{"op": "add", "path": "/a/y", "value": 3},
+                             {"op": "move", "from": "/a", "path": "/c"},
+                             {"op": "replace", "path": "/c/x", "value": 4}])
+        self.assertEqual(snapshot.get(), {"a": {"x": 1}})
+        self.assertEqual(variant.get(), {"c": {"x": 4, "y": 3}})
+        json_obj = JsonObject(json_obj={"a": {"x": {"z": 1}}})
+        snapshot = json_obj.snapshot()
+        json_obj.apply_patch([{"op": "move", "from": "/a/x", "path": "/b"},
+                              {"op": "add", "path": "/b/z", "value": 2}])
+        self.assertEqual(snapshot.get(), {"a": {"x": {"z": 1}}})
+        self.assertEqual(json_obj.get(), {"a": {}, "b": {"z": 2}})
+
     if __name__ == '__main__':
         set_logger(verbosity=LogLevels.WARNING)
         unittest.main()
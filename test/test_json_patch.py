@@ -0,0 +1,114 @@
+#!/bin/env python3
+# Repository:   https://github.com/Python-utilities
+# File Name:    test/test_json_patch.py
+# Description:  test json diff and patch
+#
+# Copyright (C) 2024 Dieter J Kybelksties <github@kybelksties.com>
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 59 Temple Place - Suite 330, Boston, MA  02111-1307, USA.
+#
+# @date: 2024-07-13
+# @author: Dieter J Kybelksties
+
+
+import copy
+import os
+import sys
+import unittest
+
+this_dir = os.path.dirname(os.path.abspath(__file__))
+dk_lib_dir = os.path.abspath(f"{this_dir}/../../Python-utilities")
+if not os.path.isdir(dk_lib_dir):
+    raise FileNotFoundError(f"Library directory '{dk_lib_dir}' cannot be found")
+sys.path.insert(0, dk_lib_dir)
+
+# pylint: disable=wrong-import-position
+from lib.exceptions import JsonGeneralError
+from lib.json_object import JsonObject
+from lib.json_patch import json_diff, apply_json_patch
+from lib.logger import set_logger, LogLevels
+
+
+class JsonPatchTestCase(unittest.TestCase):
+    SOURCE = {
+        "pipelines": [{"id": 1, "status": "running"}, {"id": 2, "status": "failed"}, {"id": 3, "status": "success"}],
+        "config": {"name": "project", "a/b": 1, "tags": ["x", "y"]},
+    }
+
+    def test_minimal_diff(self):
+        target = copy.deepcopy(self.SOURCE)
+        target["pipelines"][0]["status"] = "success"
+        target["pipelines"].insert(1, {"id": 4, "status": "created"})
+        del target["config"]["a/b"]
+        target["config"]["enabled"] = True
+        self.assertEqual(json_diff(self.SOURCE, target), [
+            {"op": "replace", "path": "/pipelines/0/status", "value": "success"},
+            {"op": "add", "path": "/pipelines/1", "value": {"id": 4, "status": "created"}},
+            {"op": "remove", "path": "/config/a~1b"},
+            {"op": "add", "path": "/config/enabled", "value": True},
+        ])
+        self.assertEqual(json_diff(self.SOURCE, copy.deepcopy(self.SOURCE)), [])
+        # True and 1 are different json values
+        self.assertEqual(json_diff([1], [True]), [{"op": "replace", "path": "/0", "value": True}])
+
+    def test_diff_and_apply_patch(self):
+        source = JsonObject(json_obj=self.SOURCE)
+        target = JsonObject(json_obj=self.SOURCE)
+        target.set("pipelines/[2]/status", "failed")
+        target.set("config/tags", ["z"])
+        target.set("pipelines/[$]", {"id": 5, "status": "created"})
+
+        patch = source.diff(target)
+        source.apply_patch(patch)
+        self.assertEqual(source.get(), target.get())
+
+        # the patch values are copied, not shared
+        target.set("config/tags/[0]", "changed")
+        self.assertEqual(source.get("config/tags"), ["z"])
+
+    def test_patch_operations(self):
+        document = {"a": [1, 2], "b": {"c": 3}}
+        document = apply_json_patch(document, [
+            {"op": "test", "path": "/b/c", "value": 3},
+            {"op": "add", "path": "/a/-", "value": 4},
+            {"op": "move", "from": "/b/c", "path": "/d"},
+            {"op": "copy", "from": "/a", "path": "/e"},
+            {"op": "remove", "path": "/a/0"},
+        ])
+        self.assertEqual(document, {"a": [2, 4], "b": {}, "d": 3, "e": [1, 2, 4]})
+        self.assertEqual(apply_json_patch(document, [{"op": "replace", "path": "", "value": []}]), [])
+
+        document["f"] = [True, 0, {"g": None, "h": 1.0}]
+        apply_json_patch(document, [{"op": "test", "path": "/f", "value": [True, 0.0, {"g": None, "h": 1}]}])
+        for patch in [[{"op": "test", "path": "/d", "value": 4}],
+                      [{"op": "test", "path": "/f/0", "value": 1}],
+                      [{"op": "test", "path": "/f/1", "value": False}],
+                      [{"op": "test", "path": "/f", "value": [1, False, {"g": None, "h": 1}]}],
+                      [{"op": "test", "path": "/f/2", "value": {"g": 0, "h": 1}}],
+                      [{"op": "test", "path": "/f/2/h", "value": True}],
+                      [{"op": "remove", "path": "/missing"}],
+                      [{"op": "add", "path": "/a/7", "value": 0}],
+                      [{"op": "replace", "path": "/a/01", "value": 0}],
+                      [{"op": "move", "from": "/b", "path": "/b/c"}],
+                      [{"op": "add", "path": "/x"}],
+                      [{"op": "frobnicate", "path": "/a"}]]:
+            with self.subTest(patch=patch):
+                with self.assertRaises(JsonGeneralError):
+                    apply_json_patch(document, patch)
+
+
+if __name__ == '__main__':
+    set_logger(verbosity=LogLevels.WARNING)
+    unittest.main()
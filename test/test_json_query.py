@@ -0,0 +1,102 @@
+#!/bin/env python3
+# Repository:   https://github.com/Python-utilities
+# File Name:    test/test_json_query.py
+# Description:  test compiled json queries
+#
+# Copyright (C) 2024 Dieter J Kybelksties <github@kybelksties.com>
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 59 Temple Place - Suite 330, Boston, MA  02111-1307, USA.
+#
+# @date: 2024-07-13
+# @author: Dieter J Kybelksties
+
+
+import os
+import sys
+import unittest
+
+this_dir = os.path.dirname(os.path.abspath(__file__))
+dk_lib_dir = os.path.abspath(f"{this_dir}/../../Python-utilities")
+if not os.path.isdir(dk_lib_dir):
+    raise FileNotFoundError(f"Library directory '{dk_lib_dir}' cannot be found")
+sys.path.insert(0, dk_lib_dir)
+
+# pylint: disable=wrong-import-position
+from lib.exceptions import JsonPathFormatError
+from lib.json_object import JsonObject
+from lib.json_query import JsonQuery
+from lib.logger import set_logger, LogLevels
+
+
+class JsonQueryTestCase(unittest.TestCase):
+    DOCUMENT = {
+        "merge_requests": [
+            {"id": 1, "title": "first", "state": "opened", "author": {"name": "Alice"}, "votes": 3},
+            {"id": 2, "title": "second", "state": "merged", "author": {"name": "Bob"}, "votes": 0},
+            {"id": 3, "title": "third", "state": "opened", "votes": 7},
+        ],
+        "meta": {"name": "project", "owner": {"name": "Carol"}},
+    }
+
+    def setUp(self):
+        self.json_obj = JsonObject(json_obj=self.DOCUMENT)
+
+    def test_wildcards(self):
+        self.assertEqual(self.json_obj.query("merge_requests/[*]/id"), [1, 2, 3])
+        self.assertEqual(self.json_obj.query("meta/*"), ["project", {"name": "Carol"}])
+        self.assertEqual(self.json_obj.query("merge_requests/[$]/title"), ["third"])
+        self.assertEqual(self.json_obj.query("merge_requests/[7]/title"), [])
+        self.assertEqual(self.json_obj.query("meta/[*]"), [])
+
+    def test_recursive_descent(self):
+        self.assertEqual(self.json_obj.query("**/name"), ["Alice", "Bob", "project", "Carol"])
+        self.assertEqual(self.json_obj.query("meta/**/name", with_paths=True),
+                         [("meta/name", "project"), ("meta/owner/name", "Carol")])
+        # matches reachable through several states are reported once
+        self.assertEqual(len(self.json_obj.query("**/**/owner")), 1)
+
+    def test_slices(self):
+        self.assertEqual(self.json_obj.query("merge_requests/[1:]/id"), [2, 3])
+        self.assertEqual(self.json_obj.query("merge_requests/[::2]/id"), [1, 3])
+        self.assertEqual(self.json_obj.query("merge_requests/[-1:]/id"), [3])
+        self.assertEqual(self.json_obj.query("merge_requests/[::-1]/id"), [3, 2, 1])
+
+    def test_filters(self):
+        self.assertEqual(self.json_obj.query("merge_requests/[?state==opened]/id"), [1, 3])
+        self.assertEqual(self.json_obj.query('merge_requests/[?state!="opened"]/id'), [2])
+        self.assertEqual(self.json_obj.query("merge_requests/[?votes>=3]/id"), [1, 3])
+        self.assertEqual(self.json_obj.query("merge_requests/[?author/name==Bob]/title"), ["second"])
+        self.assertEqual(self.json_obj.query("merge_requests/[?author]/id"), [1, 2])
+        self.assertEqual(self.json_obj.query("merge_requests/[?title>3]/id"), [])
+
+    def test_projection(self):
+        query = JsonQuery("merge_requests/[*]", project={"title": "title", "author": "author/name"})
+        self.assertEqual(query.find(self.json_obj), [{"title": "first", "author": "Alice"},
+                                                     {"title": "second", "author": "Bob"},
+                                                     {"title": "third", "author": None}])
+        self.assertEqual(query.first(JsonObject("{}"), default="nothing"), "nothing")
+        self.assertEqual(self.json_obj.query("merge_requests/[^]", project=["id", "state"]),
+                         [{"id": 1, "state": "opened"}])
+
+    def test_malformed_queries(self):
+        for query in ["merge_requests/[x]", "merge_requests/[::0]", "merge_requests/[?==1]", "a//b"]:
+            with self.subTest(query=query):
+                with self.assertRaises(JsonPathFormatError):
+                    JsonQuery(query)
+
+
+if __name__ == '__main__':
+    set_logger(verbosity=LogLevels.WARNING)
+    unittest.main()
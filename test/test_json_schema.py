@@ -0,0 +1,166 @@
+#!/bin/env python3
+# Repository:   https://github.com/Python-utilities
+# File Name:    test/test_json_schema.py
+# Description:  test compiled json-schema validation
+#
+# Copyright (C) 2024 Dieter J Kybelksties <github@kybelksties.com>
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 59 Temple Place - Suite 330, Boston, MA  02111-1307, USA.
+#
+# @date: 2024-07-13
+# @author: Dieter J Kybelksties
+
+
+import os
+import pickle
+import sys
+import unittest
+
+this_dir = os.path.dirname(os.path.abspath(__file__))
+dk_lib_dir = os.path.abspath(f"{this_dir}/../../Python-utilities")
+if not os.path.isdir(dk_lib_dir):
+    raise FileNotFoundError(f"Library directory '{dk_lib_dir}' cannot be found")
+sys.path.insert(0, dk_lib_dir)
+
+# pylint: disable=wrong-import-position
+import lib.json_schema
+from lib.exceptions import JsonSchemaError
+from lib.file_system_object import remove
+from lib.file_utils import write_file
+from lib.json_file_validator import validate_json_files
+from lib.json_object import JsonObject
+from lib.json_schema import JsonSchema
+from lib.logger import set_logger, LogLevels
+
+
+class JsonSchemaTestCase(unittest.TestCase):
+    TEST_DIR = "/tmp/test_json_schema"
+    CACHE_FILE = "/tmp/test_json_schema_cache/cache.json"
+    SCHEMA = {
+        "type": "object",
+        "required": ["name", "version"],
+        "additionalProperties": False,
+        "properties": {
+            "name": {"type": "string", "minLength": 1, "pattern": "^[a-z_]+$"},
+            "version": {"type": "integer", "minimum": 1},
+            "ratio": {"type": "number", "exclusiveMinimum": 0, "maximum": 1},
+            "mode": {"enum": ["fast", "safe", None]},
+            "tags": {"type": "array", "items": {"type": "string"}, "uniqueItems": True, "maxItems": 3},
+            "owner": {"type": ["object", "null"], "properties": {"id": {"type": "integer"}}, "required": ["id"]},
+        },
+    }
+
+    def setUp(self):
+        remove([self.TEST_DIR, os.path.dirname(self.CACHE_FILE)], force=True)
+
+    def tearDown(self):
+        remove([self.TEST_DIR, os.path.dirname(self.CACHE_FILE)], force=True)
+
+    def test_valid(self):
+        schema = JsonSchema(self.SCHEMA)
+        for document in [{"name": "abc", "version": 1},
+                         {"name": "a_b", "version": 2.0, "ratio": 1, "mode": None, "tags": ["x", "y"], "owner": None},
+                         {"name": "a", "version": 3, "owner": {"id": 7, "other": "allowed"}}]:
+            with self.subTest(document=document):
+                self.assertEqual(schema.validate(document), [])
+                self.assertTrue(schema.is_valid(document))
+                schema.assert_valid(document)
+
+    def test_violations(self):
+        schema = JsonSchema(self.SCHEMA)
+        for document, expected in [
+            ([], ["(root): expected object, got array"]),
+            ({"version": 1}, ["(root): required property 'name' is missing"]),
+            ({"name": "ABC", "version": 0},
+             ["name: 'ABC' does not match '^[a-z_]+$'", "version: 0 is not >= 1"]),
+            ({"name": "a", "version": True}, ["version: expected integer, got boolean"]),
+            ({"name": "a", "version": 1.5}, ["version: expected integer, got number"]),
+            ({"name": "a", "version": 1, "ratio": 0}, ["ratio: 0 is not > 0"]),
+            ({"name": "a", "version": 1, "mode": "slow"}, ["mode: 'slow' is not one of ['fast', 'safe', None]"]),
+            ({"name": "a", "version": 1, "tags": ["x", 1, "x"]},
+             ["tags: items are not unique", "tags/[1]: expected string, got number"]),
+            ({"name": "a", "version": 1, "owner": {}}, ["owner: required property 'id' is missing"]),
+            ({"name": "a", "version": 1, "extra": 1}, ["extra: no value allowed"]),
+        ]:
+            with self.subTest(document=document):
+                self.assertEqual(schema.validate(document), expected)
+                self.assertFalse(schema.is_valid(document))
+                with self.assertRaises(JsonSchemaError) as context:
+                    schema.assert_valid(document)
+                self.assertEqual(context.exception.errors, expected)
+
+    def test_enum_uses_json_equality(self):
+        schema = JsonSchema({"enum": [1, "1", [1, {"a": None}]]})
+        self.assertTrue(schema.is_valid(1.0))
+        self.assertTrue(schema.is_valid([1, {"a": None}]))
+        self.assertFalse(schema.is_valid(True))
+        self.assertFalse(schema.is_valid([1, {"a": False}]))
+        self.assertTrue(JsonSchema({"const": False}).is_valid(False))
+        self.assertFalse(JsonSchema({"const": False}).is_valid(0))
+
+    def test_invalid_schema(self):
+        for schema in [{"type": "text"}, {"$ref": "#/definitions/x"}, {"items": [{"type": "string"}]},
+                       {"pattern": "("}, {"minLength": -1}, {"required": "name"}, "object"]:
+            with self.subTest(schema=schema):
+                with self.assertRaises(JsonSchemaError):
+                    JsonSchema(schema)
+        self.assertTrue(JsonSchema({"title": "annotations only", "format": "date"}).is_valid(None))
+        self.assertFalse(JsonSchema(False).is_valid(None))
+
+    def test_json_object(self):
+        json_obj = JsonObject(json_obj={"name": "a", "version": 0})
+        self.assertEqual(json_obj.validate(self.SCHEMA), ["version: 0 is not >= 1"])
+        schema = JsonSchema(JsonObject(json_obj=self.SCHEMA))
+        self.assertEqual(schema.validate(json_obj), ["version: 0 is not >= 1"])
+        self.assertEqual(schema.digest, JsonSchema(dict(reversed(list(self.SCHEMA.items())))).digest)
+
+    def test_validate_many(self):
+        schema = JsonSchema(self.SCHEMA)
+        documents = [{"name": "a", "version": i} for i in range(10)]
+        expected = [["version: 0 is not >= 1"]] + [[]] * 9
+        self.assertEqual(schema.validate_many(documents, workers=1), expected)
+        self.assertEqual(pickle.loads(pickle.dumps(schema)).validate(documents[0]), expected[0])
+
+        min_documents = lib.json_schema.MIN_DOCUMENTS_FOR_PROCESS_POOL
+        lib.json_schema.MIN_DOCUMENTS_FOR_PROCESS_POOL = 0
+        try:
+            self.assertEqual(schema.validate_many(documents, workers=2, chunk_size=3), expected)
+        finally:
+            lib.json_schema.MIN_DOCUMENTS_FOR_PROCESS_POOL = min_documents
+
+    def test_json_files(self):
+        write_file(f"{self.TEST_DIR}/good.json", '{"name": "a", "version": 1}')
+        write_file(f"{self.TEST_DIR}/bad.json", '{"name": "a"}')
+        self.assertEqual(JsonObject.assert_json_files_valid(self.TEST_DIR, workers=1), (0, []))
+        self.assertEqual(JsonObject.assert_json_files_valid(self.TEST_DIR, workers=1, schema=self.SCHEMA),
+                         (-1, [f"{self.TEST_DIR}/bad.json"]))
+
+        verdicts = validate_json_files(self.TEST_DIR, workers=1, cache_file=self.CACHE_FILE)
+        self.assertTrue(all(v.valid for v in verdicts))
+        # verdicts of another schema are not reused
+        verdicts = validate_json_files(self.TEST_DIR, workers=1, cache_file=self.CACHE_FILE, schema=self.SCHEMA)
+        self.assertFalse(any(v.from_cache for v in verdicts))
+        bad = [v for v in verdicts if not v.valid]
+        self.assertEqual(len(bad), 1)
+        self.assertEqual(bad[0].schema_errors, ["(root): required property 'version' is missing"])
+        verdicts = validate_json_files(self.TEST_DIR, workers=1, cache_file=self.CACHE_FILE, schema=self.SCHEMA)
+        self.assertTrue(all(v.from_cache for v in verdicts))
+        self.assertEqual([v.schema_errors for v in verdicts if not v.valid],
+                         [["(root): required property 'version' is missing"]])
+
+
+if __name__ == '__main__':
+    set_logger(verbosity=LogLevels.WARNING)
+    unittest.main()
@@ -0,0 +1,133 @@
+#!/bin/env python3
+# Repository:   https://github.com/Python-utilities
+# File Name:    test/test_json_stream.py
+# Description:  test streaming of json files and JSON Lines
+#
+# Copyright (C) 2024 Dieter J Kybelksties <github@kybelksties.com>
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 59 Temple Place - Suite 330, Boston, MA  02111-1307, USA.
+#
+# @date: 2024-07-13
+# @author: Dieter J Kybelksties
+
+import io
+import json
+import os
+import sys
+import unittest
+
+this_dir = os.path.dirname(os.path.abspath(__file__))
+dk_lib_dir = os.path.abspath(f"{this_dir}/../../Python-utilities")
+if not os.path.isdir(dk_lib_dir):
+    raise FileNotFoundError(f"Library directory '{dk_lib_dir}' cannot be found")
+sys.path.insert(0, dk_lib_dir)
+
+# pylint: disable=wrong-import-position
+from lib.exceptions import JsonGeneralError, JsonPathFormatError
+from lib.file_system_object import remove
+from lib.file_utils import write_file
+from lib.json_object import JsonObject
+from lib.json_stream import iter_json_items, read_json_lines, write_json_lines
+from lib.logger import set_logger, LogLevels
+
+
+class JsonStreamTestCase(unittest.TestCase):
+    DOCUMENT = {
+        "meta": {"count": 3, "note": "contains \"quotes\", [brackets] and {braces}"},
+        "items": [
+            {"id": 1, "tags": ["a", "b"]},
+            {"id": 2, "tags": []},
+            {"id": 3, "tags": ["c"], "nested": {"deep": [1, 2, {"x": None}]}},
+        ],
+    }
+
+    def stream(self, prefix, **kwargs):
+        return list(iter_json_items(io.StringIO(json.dumps(self.DOCUMENT, indent=2)), prefix=prefix, **kwargs))
+
+    def test_stream_prefixes(self):
+        self.assertEqual(self.stream(None), [self.DOCUMENT])
+        self.assertEqual(self.stream("items/[*]"), self.DOCUMENT["items"])
+        self.assertEqual(self.stream("items/[1]/id"), [2])
+        self.assertEqual(self.stream("items/[^]/id"), [1])
+        self.assertEqual(self.stream("items/[*]/tags/[*]"), ["a", "b", "c"])
+        self.assertEqual(self.stream("*/count"), [3])
+        self.assertEqual(self.stream("meta/note"), [self.DOCUMENT["meta"]["note"]])
+        self.assertEqual(self.stream("does_not_exist/[*]"), [])
+        self.assertEqual(self.stream("meta/[*]"), [])
+
+    def test_stream_small_chunks(self):
+        for chunk_size in (1, 2, 5, 17):
+            with self.subTest(chunk_size=chunk_size):
+                self.assertEqual(self.stream("items/[*]", chunk_size=chunk_size), self.DOCUMENT["items"])
+                self.assertEqual(self.stream(None, chunk_size=chunk_size), [self.DOCUMENT])
+
+    def test_stream_with_paths(self):
+        self.assertEqual(self.stream("items/[*]/id", with_paths=True),
+                         [("items/[0]/id", 1), ("items/[1]/id", 2), ("items/[2]/id", 3)])
+
+    def test_stream_errors(self):
+        with self.assertRaises(JsonPathFormatError):
+            self.stream("items/[$]")
+        with self.assertRaises(JsonGeneralError):
+            list(iter_json_items(io.StringIO('{"items": [1, 2}'), prefix="items/[*]"))
+        with self.assertRaises(JsonGeneralError):
+            list(iter_json_items(io.StringIO('{"items": []} []'), prefix="items/[*]"))
+
+    def test_stream_validates_skipped_values(self):
+        for document in ('{"skipped": [1 2], "items": []}',
+                         '{"skipped": {"a" 1}, "items": []}',
+                         '{"skipped": [tru], "items": []}',
+                         '{"skipped": [1,], "items": []}',
+                         '{"skipped": {"a": 1,}, "items": []}',
+                         '{"skipped": "bad \\x escape", "items": []}',
+                         '{"skipped": [01], "items": []}',
+                         '[{"a": 1} {"b": 2}]'):
+            for chunk_size in (1, 65536):
+                with self.subTest(document=document, chunk_size=chunk_size):
+                    with self.assertRaises(JsonGeneralError):
+                        list(iter_json_items(io.StringIO(document), prefix="items/[*]", chunk_size=chunk_size))
+        valid = '{"skipped": [1, -2.5e3, "s\\"]", true, null, NaN, {"a": [{}], "b": []}], "items": [7]}'
+        for chunk_size in (1, 65536):
+            self.assertEqual(list(iter_json_items(io.StringIO(valid), prefix="items/[*]", chunk_size=chunk_size)), [7])
+
+    def test_json_lines(self):
+        json_file = "/tmp/test_json_stream.jsonl"
+        self.assertEqual(write_json_lines(json_file, self.DOCUMENT["items"]), 3)
+        self.assertEqual(list(read_json_lines(json_file)), self.DOCUMENT["items"])
+        self.assertEqual(list(read_json_lines(json_file, predicate=lambda item: item["id"] > 1)),
+                         self.DOCUMENT["items"][1:])
+
+        write_file(json_file, ['{"id": 1}', '', 'not json', '{"id": 2}'])
+        with self.assertRaises(JsonGeneralError):
+            list(read_json_lines(json_file))
+        self.assertEqual(list(read_json_lines(json_file, skip_invalid=True)), [{"id": 1}, {"id": 2}])
+        remove(json_file)
+
+    def test_json_object_streaming(self):
+        json_file = "/tmp/test_json_stream.json"
+        JsonObject(json_str=json.dumps(self.DOCUMENT)).to_file(json_file)
+        ids = [item.get("id") for item in JsonObject.iter_from_file(json_file, prefix="items/[*]")]
+        self.assertEqual(ids, [1, 2, 3])
+
+        lines_file = "/tmp/test_json_stream.jsonl"
+        JsonObject.to_json_lines(lines_file, JsonObject.iter_from_file(json_file, prefix="items/[*]"))
+        filtered = JsonObject.iter_from_json_lines(lines_file, predicate=lambda item: len(item["tags"]) > 0)
+        self.assertEqual([item.get("id") for item in filtered], [1, 3])
+        remove([json_file, lines_file])
+
+
+if __name__ == '__main__':
+    set_logger(verbosity=LogLevels.WARNING)
+    unittest.main()
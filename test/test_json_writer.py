@@ -0,0 +1,105 @@
+#!/bin/env python3
+# Repository:   https://github.com/Python-utilities
+# File Name:    test/test_json_writer.py
+# Description:  test atomic json-file output
+#
+# Copyright (C) 2024 Dieter J Kybelksties <github@kybelksties.com>
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 59 Temple Place - Suite 330, Boston, MA  02111-1307, USA.
+#
+# @date: 2024-07-13
+# @author: Dieter J Kybelksties
+
+
+import gzip
+import os
+import sys
+import unittest
+
+this_dir = os.path.dirname(os.path.abspath(__file__))
+dk_lib_dir = os.path.abspath(f"{this_dir}/../../Python-utilities")
+if not os.path.isdir(dk_lib_dir):
+    raise FileNotFoundError(f"Library directory '{dk_lib_dir}' cannot be found")
+sys.path.insert(0, dk_lib_dir)
+
+# pylint: disable=wrong-import-position
+import lib.json_writer
+from lib.exceptions import JsonGeneralError
+from lib.file_system_object import remove
+from lib.file_utils import read_file, write_file
+from lib.json_object import JsonObject
+from lib.json_writer import canonical_dumps, write_json_file
+from lib.logger import set_logger, LogLevels
+
+
+class JsonWriterTestCase(unittest.TestCase):
+    TEST_DIR = "/tmp/test_json_writer"
+    DOCUMENT = {"b": [1, 2.5, None], "a": {"ü": True}}
+
+    def setUp(self):
+        remove(self.TEST_DIR, force=True)
+
+    def tearDown(self):
+        remove(self.TEST_DIR, force=True)
+
+    def test_formats(self):
+        json_obj = JsonObject(json_obj=self.DOCUMENT)
+        for backend in ("json", "orjson", "ujson"):
+            with self.subTest(backend=backend):
+                json_obj.to_file(f"{self.TEST_DIR}/compact.json", compact=True, backend=backend)
+                self.assertEqual(JsonObject(filename=f"{self.TEST_DIR}/compact.json").get(), self.DOCUMENT)
+                self.assertNotIn(" ", read_file(f"{self.TEST_DIR}/compact.json"))
+
+        json_obj.to_file(f"{self.TEST_DIR}/canonical.json", canonical=True)
+        self.assertEqual(read_file(f"{self.TEST_DIR}/canonical.json"), '{"a":{"ü":true},"b":[1,2.5,null]}')
+        self.assertEqual(canonical_dumps({"b": [1, 2.5, None], "a": {"ü": True}}),
+                         canonical_dumps({"a": {"ü": True}, "b": [1, 2.5, None]}))
+
+        json_obj.to_file(f"{self.TEST_DIR}/indented.json", indent=4, backend="json")
+        self.assertEqual(read_file(f"{self.TEST_DIR}/indented.json").splitlines()[1], '    "b": [')
+
+    def test_atomic_replace(self):
+        filename = f"{self.TEST_DIR}/file.json"
+        write_file(filename, '{"old": 1}')
+        os.chmod(filename, 0o640)
+        with self.assertRaises(TypeError):
+            write_json_file({"new": {1, 2}}, filename, indent=4, backend="json")
+        self.assertEqual(read_file(filename), '{"old": 1}')
+        self.assertEqual(os.listdir(self.TEST_DIR), ["file.json"])
+
+        write_json_file({"new": 1}, filename, compact=True)
+        self.assertEqual(read_file(filename), '{"new":1}')
+        self.assertEqual(os.stat(filename).st_mode & 0o777, 0o640)
+
+    def test_compression(self):
+        json_obj = JsonObject(json_obj=self.DOCUMENT)
+        json_obj.to_file(f"{self.TEST_DIR}/file.json.gz", canonical=True)
+        with gzip.open(f"{self.TEST_DIR}/file.json.gz", "rt", encoding="utf-8") as file:
+            self.assertEqual(file.read(), canonical_dumps(self.DOCUMENT))
+        self.assertEqual(JsonObject(filename=f"{self.TEST_DIR}/file.json.gz").get(), self.DOCUMENT)
+
+        with self.assertRaises(JsonGeneralError):
+            json_obj.to_file(f"{self.TEST_DIR}/file.json", compression="rar")
+
+    @unittest.skipIf(lib.json_writer.zstandard is None, "zstandard is not installed")
+    def test_zstd_compression(self):
+        json_obj = JsonObject(json_obj=self.DOCUMENT)
+        json_obj.to_file(f"{self.TEST_DIR}/file.json.zst")
+        self.assertEqual(JsonObject(filename=f"{self.TEST_DIR}/file.json.zst").get(), self.DOCUMENT)
+
+
+if __name__ == '__main__':
+    set_logger(verbosity=LogLevels.WARNING)
+    unittest.main()
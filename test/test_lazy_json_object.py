@@ -0,0 +1,102 @@
+#!/bin/env python3
+# Repository:   https://github.com/Python-utilities
+# File Name:    test/test_lazy_json_object.py
+# Description:  test lazily parsed json objects
+#
+# Copyright (C) 2024 Dieter J Kybelksties <github@kybelksties.com>
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 59 Temple Place - Suite 330, Boston, MA  02111-1307, USA.
+#
+# @date: 2024-07-13
+# @author: Dieter J Kybelksties
+
+import json
+import os
+import sys
+import unittest
+
+this_dir = os.path.dirname(os.path.abspath(__file__))
+dk_lib_dir = os.path.abspath(f"{this_dir}/../../Python-utilities")
+if not os.path.isdir(dk_lib_dir):
+    raise FileNotFoundError(f"Library directory '{dk_lib_dir}' cannot be found")
+sys.path.insert(0, dk_lib_dir)
+
+# pylint: disable=wrong-import-position
+from lib.exceptions import JsonError, JsonGeneralError, JsonIndexRequired, JsonKeyStringRequired
+from lib.file_system_object import remove
+from lib.file_utils import write_file
+from lib.json_object import JsonObject
+from lib.lazy_json_object import LazyJsonObject
+from lib.logger import set_logger, LogLevels
+
+
+class LazyJsonObjectTestCase(unittest.TestCase):
+    JSON_FILE = "/tmp/test_lazy_json_object.json"
+    DOCUMENT = {
+        "config": {"name": "with \"quotes\" and [brackets] {braces}", "enabled": True, "nothing": None},
+        "items": [{"id": 1, "tags": ["a"]}, {"id": 2, "tags": []}, {"id": 3, "tags": ["b", "c"]}],
+    }
+
+    def setUp(self):
+        write_file(self.JSON_FILE, json.dumps(self.DOCUMENT, indent=2))
+
+    def tearDown(self):
+        remove(self.JSON_FILE)
+
+    def test_get(self):
+        with LazyJsonObject(self.JSON_FILE) as lazy:
+            self.assertEqual(lazy.get(), self.DOCUMENT)
+            self.assertEqual(lazy.get("config/name"), self.DOCUMENT["config"]["name"])
+            self.assertEqual(lazy.get("items/[1]"), {"id": 2, "tags": []})
+            self.assertEqual(lazy.get("items/[^]/id"), 1)
+            self.assertEqual(lazy.get("items/[$]/tags/[$]"), "c")
+            self.assertEqual(lazy.size("items"), 3)
+            self.assertEqual(lazy.size("config"), 0)
+            self.assertEqual(lazy.to_json_object("items/[2]").get("id"), 3)
+
+    def test_same_semantics_as_json_object(self):
+        json_obj = JsonObject(filename=self.JSON_FILE)
+        with LazyJsonObject(self.JSON_FILE) as lazy:
+            for path in ["config/enabled", "items/[0]/tags", "items/[7]/id", "config/missing",
+                         "config/nothing", "items/[2]/tags/[1]"]:
+                for default in (None, "default"):
+                    with self.subTest(path=path, default=default):
+                        try:
+                            expected = json_obj.get(path, default=default)
+                        except JsonError as e:
+                            with self.assertRaises(type(e)):
+                                lazy.get(path, default=default)
+                            continue
+                        self.assertEqual(lazy.get(path, default=default), expected)
+                self.assertEqual(lazy.key_exists(path), json_obj.key_exists(path))
+
+    def test_incompatible_paths(self):
+        with LazyJsonObject(self.JSON_FILE) as lazy:
+            with self.assertRaises(JsonKeyStringRequired):
+                lazy.get("[0]")
+            with self.assertRaises(JsonIndexRequired):
+                lazy.get("items/id")
+            with self.assertRaises(JsonKeyStringRequired):
+                lazy.get("config/name/key")
+
+    def test_invalid_json(self):
+        write_file(self.JSON_FILE, '{"key": [1, 2}')
+        with self.assertRaises(JsonGeneralError):
+            LazyJsonObject(self.JSON_FILE)
+
+
+if __name__ == '__main__':
+    set_logger(verbosity=LogLevels.WARNING)
+    unittest.main()
@@ -0,0 +1,196 @@
+#!/bin/env python3
+# Repository:   https://github.com/Python-utilities
+# File Name:    test/test_logger.py
+# Description:  test the asynchronous logging backend
+#
+# Copyright (C) 2024 Dieter J Kybelksties <github@kybelksties.com>
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 59 Temple Place - Suite 330, Boston, MA  02111-1307, USA.
+#
+# @date: 2024-07-13
+# @author: Dieter J Kybelksties
+
+
+import io
+import logging
+import os
+import signal
+import sys
+import threading
+import time
+import unittest
+from contextlib import redirect_stdout
+
+this_dir = os.path.dirname(os.path.abspath(__file__))
+dk_lib_dir = os.path.abspath(f"{this_dir}/../../Python-utilities")
+if not os.path.isdir(dk_lib_dir):
+    raise FileNotFoundError(f"Library directory '{dk_lib_dir}' cannot be found")
+sys.path.insert(0, dk_lib_dir)
+
+# pylint: disable=wrong-import-position
+from lib.logger import AsyncLogWriter, LogLevels, LogOverflowPolicy, ScriptLogger, set_logger
+
+
+class BlockedStream(io.StringIO):
+    """
+    A console stream that does not accept output until it is released.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.released = threading.Event()
+
+    def write(self, s):
+        self.released.wait()
+        return super().write(s)
+
+
+class RecordCollector(logging.Handler):
+    def __init__(self):
+        super().__init__(level=logging.DEBUG)
+        self.records = []
+
+    def emit(self, record):
+        self.records.append(record)
+
+
+class AsyncLoggerTests(unittest.TestCase):
+
+    def test_order_and_flush(self):
+        output = io.StringIO()
+        logger = ScriptLogger(verbosity=LogLevels.DEBUG, asynchronous=True)
+        try:
+            with redirect_stdout(output):
+                for i in range(100):
+                    logger.log_info(f"message {i}")
+                logger.log_command_stdout("last")
+                logger.flush()
+            lines = output.getvalue().splitlines()
+            self.assertEqual(len(lines), 101)
+            self.assertTrue(all(f"message {i}" in line for i, line in enumerate(lines[:100])))
+            self.assertIn("last", lines[100])
+        finally:
+            logger.close()
+        with redirect_stdout(output):
+            logger.log_info("after close")
+        self.assertIn("after close", output.getvalue())
+
+    def test_errors_are_written_before_returning(self):
+        output = io.StringIO()
+        logger = ScriptLogger(asynchronous=True, queue_size=1, overflow_policy=LogOverflowPolicy.DROP)
+        try:
+            with redirect_stdout(output):
+                logger.log_error("went wrong")
+                self.assertIn("went wrong", output.getvalue())
+        finally:
+            logger.close()
+
+    def overflow(self, overflow_policy: LogOverflowPolicy) -> tuple[AsyncLogWriter, list[str]]:
+        stream = BlockedStream()
+        writer = AsyncLogWriter(queue_size=2, overflow_policy=overflow_policy, sample_every=5)
+        # the writer thread is stuck on the first line until then, later lines overflow the queue
+        release = threading.Timer(1.0, stream.released.set)
+        release.start()
+        try:
+            for i in range(40):
+                writer.put((stream, f"line {i}"))
+            writer.flush()
+        finally:
+            release.join()
+            writer.close()
+        return writer, stream.getvalue().splitlines()
+
+    def test_overflow_drop(self):
+        writer, lines = self.overflow(LogOverflowPolicy.DROP)
+        self.assertGreater(writer.dropped, 0)
+        self.assertEqual(len(lines) + writer.dropped, 40)
+        self.assertEqual(lines[0], "line 0")
+
+    def test_overflow_sample(self):
+        writer, lines = self.overflow(LogOverflowPolicy.SAMPLE)
+        self.assertGreater(writer.dropped, 0)
+        self.assertEqual(len(lines) + writer.dropped, 40)
+        # every 5th overflowing line waits for room, so more lines than fit the queue get through, in order
+        self.assertGreater(len(lines), 3)
+        self.assertEqual(lines, sorted(lines, key=lambda line: int(line.split()[1])))
+
+    def test_overflow_block(self):
+        writer, lines = self.overflow(LogOverflowPolicy.BLOCK)
+        self.assertEqual(writer.dropped, 0)
+        self.assertEqual(lines, [f"line {i}" for i in range(40)])
+
+    def test_file_records_keep_thread_name(self):
+        collector = RecordCollector()
+        root_logger = logging.getLogger()
+        root_level = root_logger.level
+        root_logger.addHandler(collector)
+        root_logger.setLevel(logging.DEBUG)
+        logger = ScriptLogger(verbosity=LogLevels.CRITICAL, asynchronous=True)
+        logger.do_file_log = True
+        try:
+            logger.log_warning("100% done")
+            logger.log_header("header")
+            logger.flush()
+        finally:
+            logger.close()
+            root_logger.removeHandler(collector)
+            root_logger.setLevel(root_level)
+        self.assertEqual([record.getMessage() for record in collector.records][0], "100% done")
+        self.assertIn(" header ", collector.records[1].getMessage())
+        self.assertEqual({record.threadName for record in collector.records}, {threading.current_thread().name})
+
+    @unittest.skipUnless(hasattr(os, "fork"), "needs os.fork")
+    def test_fork(self):
+        logger = ScriptLogger(verbosity=LogLevels.INFO, asynchronous=True)
+        try:
+            read_fd, write_fd = os.pipe()
+            pid = os.fork()
+            if pid == 0:
+                # like a process pool worker: no writer thread, and no atexit handlers when the child ends
+                try:
+                    os.close(read_fd)
+                    with os.fdopen(write_fd, "w") as pipe, redirect_stdout(pipe):
+                        logger.log_info("info from child")
+                        logger.log_error("error from child")
+                        logger.flush()
+                finally:
+                    os._exit(0)
+            os.close(write_fd)
+            deadline = time.monotonic() + 10
+            while os.waitpid(pid, os.WNOHANG) == (0, 0):
+                if time.monotonic() > deadline:
+                    os.kill(pid, signal.SIGKILL)
+                    os.waitpid(pid, 0)
+                    self.fail("the forked child hangs in the logger")
+                time.sleep(0.01)
+            with os.fdopen(read_fd) as pipe:
+                lines = pipe.read().splitlines()
+            self.assertEqual(len(lines), 2)
+            self.assertIn("info from child", lines[0])
+            self.assertIn("error from child", lines[1])
+
+            # the parent's writer is unaffected
+            output = io.StringIO()
+            with redirect_stdout(output):
+                logger.log_info("info from parent")
+                logger.flush()
+            self.assertIn("info from parent", output.getvalue())
+        finally:
+            logger.close()
+
+
+if __name__ == '__main__':
+    set_logger(verbosity=LogLevels.WARNING)
+    unittest.main()
@@ -22,9 +22,13 @@
 # @date: 2024-07-13
 # @author: Dieter J Kybelksties
 
+import io
 import os
+import random
+import re
 import sys
 import unittest
+from typing import Callable
 
 this_dir = os.path.dirname(os.path.abspath(__file__))
 dk_lib_dir = os.path.abspath(f"{this_dir}/../../Python-utilities")
@@ -33,9 +37,14 @@ if not os.path.isdir(dk_lib_dir):
 sys.path.insert(0, dk_lib_dir)
 
 # pylint: disable=wrong-import-position
-from lib.string_utils import squeeze_chars, matches_any, normalise_sentence, roman_to_integer, is_roman_numeral, \
-    identify_case, IdentifierStringCase, make_cpp_id
+from lib.exceptions import StringUtilError
+import lib.string_utils
+from lib.string_utils import squeeze_chars, get_squeezer, Squeezer, MultiReplacer, replace_all, matches_any, \
+    KeywordMatcher, contains_at_least_n_of, iter_text_chunks, split_text_into_chunks, normalise_sentence, SentenceNormaliser, roman_to_integer, is_roman_numeral, \
+    identify_case, IdentifierStringCase, make_cpp_id, make_cpp_ids, remove_control_chars, iter_without_control_chars, \
+    is_utf8_ascii, is_cpp_id, get_random_string, RandomStringGenerator
 from lib.logger import LogLevels, set_logger
+from lib.text_processor_abc import TextPipeline
 
 
 class BasicFunctionsTests(unittest.TestCase):
@@ -48,6 +57,21 @@ class BasicFunctionsTests(unittest.TestCase):
                                        squeeze_set="\n\t\r ",
                                        replace_with=" "))
 
+    def test_squeezer(self):
+        squeezer = get_squeezer("\n\t\r ")
+        self.assertIs(squeezer, get_squeezer("\n\t\r "))
+        self.assertEqual(squeezer.squeeze("\t a \n\n b  "), "a b")
+        self.assertEqual(squeezer("a"), "a")
+        self.assertEqual(squeezer.squeeze_all(["", " a  b ", "\n", None]), ["", "a b", "", ""])
+        self.assertEqual(Squeezer("").squeeze_all(["", " a "]), ["", " a "])
+
+        # regex specials in the squeeze-set and the replacement are taken literally
+        self.assertEqual(squeeze_chars(source="a-]^b\\\\c", squeeze_set="-]^\\", replace_with="."), "a.b.c")
+        self.assertEqual(squeeze_chars(source="..x..y", squeeze_set=" ", replace_with="."), "x.y")
+        self.assertEqual(squeeze_chars(source="a\tb", squeeze_set="", replace_with="too long"), "a\tb")
+        with self.assertRaises(StringUtilError):
+            squeeze_chars(source="a\tb", squeeze_set="\t", replace_with="too long")
+
     def test_matches_any(self):
         self.assertTrue(matches_any("string to test"))
         self.assertTrue(matches_any("string to test", patterns=""))
@@ -57,6 +81,86 @@ class BasicFunctionsTests(unittest.TestCase):
         self.assertFalse(matches_any("string to test", patterns="STRING to test"))
         self.assertTrue(matches_any("string to test", patterns=["STRING to test", "s.*"]))
 
+    def test_replace_all(self):
+        replacements = {"{{name}}": "Widget", "{{name_upper}}": "WIDGET", "{{header}}": "// {{name}}.h"}
+        self.assertEqual(replace_all("{{header}}: {{name}} {{name_upper}} {{other}}", replacements),
+                         "// {{name}}.h: Widget WIDGET {{other}}")
+        self.assertEqual(replace_all("{{header}}: {{name}}", replacements, fixpoint=True), "// Widget.h: Widget")
+        # one pass: replacements are not replaced again, so swapping works
+        self.assertEqual(replace_all("a b", {"a": "b", "b": "a"}), "b a")
+        # at the same position the longest tag wins
+        self.assertEqual(replace_all("abc", {"a": "1", "ab": "2", "abc": "3"}), "3")
+        self.assertEqual(replace_all("", replacements), "")
+        self.assertEqual(replace_all("text", {}), "text")
+
+        replacer = MultiReplacer({"x": "[x]"}, fixpoint=True)
+        with self.assertRaises(StringUtilError):
+            replacer.replace("x")
+        with self.assertRaises(StringUtilError):
+            MultiReplacer({"": "x"})
+
+    def test_contains_at_least_n_of(self):
+        text = "The invoice total includes VAT and a discount."
+        words = ["invoice", "total", "VAT", "refund", "in", "voice"]
+        self.assertFalse(contains_at_least_n_of(text, None, minimum=0))
+        self.assertTrue(contains_at_least_n_of(text, words, minimum=0))
+        self.assertTrue(contains_at_least_n_of(text, words, minimum=5))
+        self.assertFalse(contains_at_least_n_of(text, words, minimum=6))
+        self.assertTrue(contains_at_least_n_of(text, ["VAT", "VAT"], minimum=2))
+
+        min_keywords = lib.string_utils.MIN_KEYWORDS_FOR_SINGLE_SCAN
+        for scan_from in (min_keywords, 1):
+            lib.string_utils.MIN_KEYWORDS_FOR_SINGLE_SCAN = scan_from
+            try:
+                matcher = KeywordMatcher(words + [""])
+            finally:
+                lib.string_utils.MIN_KEYWORDS_FOR_SINGLE_SCAN = min_keywords
+            with self.subTest(scan_from=scan_from):
+                # "in" and "voice" overlap with "invoice", "in" also occurs in "includes"
+                self.assertEqual(matcher.count(text), 6)
+                self.assertIn(matcher.count(text, stop_at=2), (2, 3))
+                self.assertTrue(matcher.contains_at_least(text, 6))
+                self.assertFalse(matcher.contains_at_least(text, 7))
+                self.assertEqual(matcher.classify_many([text, "no keywords", ""], minimum=2, workers=1),
+                                 [True, False, False])
+
+    def test_classify_many(self):
+        min_texts = lib.string_utils.MIN_TEXTS_FOR_PROCESS_POOL
+        lib.string_utils.MIN_TEXTS_FOR_PROCESS_POOL = 0
+        try:
+            texts = ["alpha beta", "beta", "gamma alpha", ""] * 5
+            self.assertEqual(KeywordMatcher(["alpha", "beta", "gamma"]).classify_many(texts, 2, workers=2),
+                             [True, False, True, False] * 5)
+        finally:
+            lib.string_utils.MIN_TEXTS_FOR_PROCESS_POOL = min_texts
+
+    def test_split_text_into_chunks(self):
+        text = "First sentence is here. Second one? Mr. Smith went e.g. home. " + "A" * 30 + " tail words go here."
+        self.assertEqual(split_text_into_chunks(text, 25),
+                         ["First sentence is here.", "Second one?", "Mr. Smith went e.g. home.",
+                          "A" * 25, "A" * 5 + " tail words go here."])
+        self.assertEqual(split_text_into_chunks("Too long for one chunk.", 10), ["Too long", "for one", "chunk."])
+        self.assertEqual(split_text_into_chunks("", 10), [])
+
+        self.assertEqual(list(iter_text_chunks(io.StringIO("One. Two.\nThree.\nFour five."), 10)),
+                         ["One. Two.", "Three.", "Four five."])
+        self.assertEqual(list(iter_text_chunks(iter(["One. T", "wo. Thr", "ee."]), 11, overlap=5)),
+                         ["One. Two.", "Two. Three."])
+        self.assertEqual(list(iter_text_chunks("Über. Öl.", 6, measure="bytes")), ["Über.", "Öl."])
+        self.assertEqual(list(iter_text_chunks("a b c. d e. f.", 3, measure=lambda s: len(s.split()))),
+                         ["a b c.", "d e. f."])
+        # text without sentence boundaries and whitespace is split hard, so that it is not kept in memory
+        max_pending = lib.string_utils.MAX_PENDING_SENTENCE_SIZE
+        long_word = "x" * (3 * max_pending + 5)
+        chunks = list(iter_text_chunks(iter(long_word[i:i + 10] for i in range(0, len(long_word), 10)),
+                                       4 * max_pending))
+        self.assertEqual("".join(chunks).replace(" ", ""), long_word)
+        self.assertTrue(all(len(sentence) <= max_pending for chunk in chunks for sentence in chunk.split(" ")))
+        with self.assertRaises(StringUtilError):
+            list(iter_text_chunks(text, 10, overlap=10))
+        with self.assertRaises(StringUtilError):
+            list(iter_text_chunks(text, 10, measure="words"))
+
     def test_clean_sentence_string(self):
         sentence = "This website! includes information ,about Project Gutenberg™ to hear about new eBooks."
         expected_clean_sentence = \
@@ -64,6 +168,22 @@ class BasicFunctionsTests(unittest.TestCase):
         result = normalise_sentence(sentence=sentence)
         self.assertEqual(result, expected_clean_sentence)
 
+    def test_normalise_sentence_options(self):
+        self.assertEqual(normalise_sentence("one"), "")
+        self.assertEqual(normalise_sentence(""), "")
+        self.assertEqual(normalise_sentence("a-b  c", squeeze_set="", expected_non_al_nums="-"), "a - b c")
+        self.assertEqual(normalise_sentence("a.b  c", squeeze_set=".", expected_non_al_nums=["."]), "a b c")
+        self.assertEqual(normalise_sentence("a,b c", expected_non_al_nums=[", ", "x"]), "a,b c")
+
+    def test_sentence_pipeline(self):
+        documents = ["First*** doc,with noise.", "single", "  (third)  one  "]
+        expected = [[normalise_sentence(document)] for document in documents]
+        pipeline = TextPipeline([SentenceNormaliser()])
+        self.assertEqual(pipeline.process(documents), [e[0] for e in expected])
+        self.assertEqual(list(pipeline.stream(iter(documents))), [e[0] for e in expected])
+        self.assertEqual(list(pipeline.process_many(iter(documents), workers=1)), expected)
+        self.assertEqual(list(pipeline.process_many(iter(documents * 5), workers=2, chunk_size=2)), expected * 5)
+
     def test_is_roman_numeral(self):
         self.assertTrue(is_roman_numeral("XIV"))
         self.assertTrue(is_roman_numeral("lX"))  # True (case-insensitive)
@@ -77,6 +197,80 @@ class BasicFunctionsTests(unittest.TestCase):
 
         self.assertEqual(roman_to_integer("abc"), -1)
 
+    def test_remove_control_chars(self):
+        self.assertEqual(remove_control_chars(""), "")
+        self.assertEqual(remove_control_chars("a\tb\r\nc\x7f"), "a b  c ")
+        self.assertEqual(remove_control_chars("gr\u00fc\u00dfe \x9bnew"), "gre new")
+        self.assertEqual(remove_control_chars("gr\u00fc\u00dfe\x1b[0m\n".encode("utf-8")), b"gre [0m ")
+
+    def test_iter_without_control_chars(self):
+        text = "line\t1\nl\u00efne 2\n" * 10
+        self.assertEqual("".join(iter_without_control_chars(io.StringIO(text), chunk_size=7)),
+                         remove_control_chars(text))
+        self.assertEqual(b"".join(iter_without_control_chars(io.BytesIO(text.encode("utf-8")), chunk_size=7)),
+                         remove_control_chars(text).encode("ascii"))
+        self.assertEqual(list(iter_without_control_chars(["a\n", "b\n"])), ["a ", "b "])
+
+    def test_ascii_checks(self):
+        self.assertTrue(is_utf8_ascii("plain text\n"))
+        self.assertTrue(is_utf8_ascii(b"plain bytes"))
+        self.assertFalse(is_utf8_ascii("gr\u00fcn"))
+        self.assertTrue(is_cpp_id("_valid_1"))
+        self.assertTrue(is_cpp_id("gr\u00fcn"))
+        self.assertFalse(is_cpp_id("1invalid"))
+        self.assertFalse(is_cpp_id("in-valid"))
+        self.assertFalse(is_cpp_id("class"))
+        self.assertFalse(is_cpp_id(""))
+
+    def test_get_random_string(self):
+        self.assertEqual(get_random_string(0), "")
+        self.assertRegex(get_random_string(47, "0123456789ABCDEF"), r"^[0-9A-F]{47}$")
+        self.assertRegex(get_random_string(5), r"^[a-z]{5}$")
+        # no letters are read ahead, so reseeding repeats the strings
+        random.seed(1)
+        first = get_random_string(8)
+        random.seed(1)
+        self.assertEqual(get_random_string(8), first)
+
+    def forked_strings(self, create: Callable[[], str], children: int = 3) -> list[str]:
+        reval = []
+        for _ in range(children):
+            read_fd, write_fd = os.pipe()
+            pid = os.fork()
+            if pid == 0:
+                os.close(read_fd)
+                os.write(write_fd, create().encode())
+                os._exit(0)
+            os.close(write_fd)
+            with os.fdopen(read_fd, "rb") as pipe:
+                reval.append(pipe.read().decode())
+            os.waitpid(pid, 0)
+        return reval
+
+    @unittest.skipUnless(hasattr(os, "fork"), "needs os.fork")
+    def test_random_strings_after_fork(self):
+        self.assertEqual(len(set(self.forked_strings(lambda: get_random_string(32)))), 3)
+        for generator in (RandomStringGenerator("0123456789abcdef", secure=True), RandomStringGenerator("abc")):
+            # fill the buffer of the parent, the children must not hand out its letters
+            generator.string(1)
+            children = self.forked_strings(lambda generator=generator: generator.string(32))
+            self.assertEqual(len(set(children)), 3)
+
+    def test_random_string_generator(self):
+        self.assertEqual(RandomStringGenerator("abc", seed=42).strings(count=3, length=10),
+                         RandomStringGenerator("abc", seed=42).strings(count=3, length=10))
+        ids = RandomStringGenerator("0123456789abcdef", secure=True).strings(count=1000, length=32)
+        self.assertEqual(len(set(ids)), 1000)
+        self.assertTrue(all(re.fullmatch(r"[0-9a-f]{32}", random_id) for random_id in ids))
+        letters = RandomStringGenerator("\u00e4\u00f6\u00fc\u20ac", seed=1).string(4000)
+        self.assertEqual(set(letters), set("\u00e4\u00f6\u00fc\u20ac"))
+        many_letters = "".join(chr(0x4e00 + i) for i in range(300))
+        self.assertTrue(set(RandomStringGenerator(many_letters, seed=1).string(100)) <= set(many_letters))
+        with self.assertRaises(StringUtilError):
+            RandomStringGenerator("")
+        with self.assertRaises(StringUtilError):
+            RandomStringGenerator("abc", secure=True, seed=1)
+
     def test_identify_case(self):
         self.assertEqual(identify_case("snake_case"), IdentifierStringCase.SNAKE)
         self.assertEqual(identify_case("camelCase"), IdentifierStringCase.CAMEL)
@@ -115,6 +309,18 @@ class BasicFunctionsTests(unittest.TestCase):
         self.assertEqual(make_cpp_id("111this is numbered 1234.341", IdentifierStringCase.SNAKE), "_111_this_is_numbered_1234_341")
         self.assertEqual(make_cpp_id("111this is numbered 1234.341", IdentifierStringCase.CLASS), "_111ThisIsNumbered1234_341")
 
+    def test_digits_followed_by_letters(self):
+        self.assertEqual(make_cpp_id("v1alpha2beta3gamma", IdentifierStringCase.SNAKE), "v1_alpha2_beta3_gamma")
+        self.assertEqual(make_cpp_id("z1A1z", IdentifierStringCase.CAMEL), "z1A1Z")
+
+    def test_make_cpp_ids(self):
+        raw_ids = ["user-service", "auth.service", "user-service", "2fa gateway"]
+        self.assertEqual(make_cpp_ids(raw_ids, IdentifierStringCase.SNAKE),
+                         ["user_service", "auth_service", "user_service", "_2_fa_gateway"])
+        self.assertEqual(make_cpp_ids(raw_ids, IdentifierStringCase.CLASS),
+                         [make_cpp_id(raw_id, IdentifierStringCase.CLASS) for raw_id in raw_ids])
+        self.assertEqual(make_cpp_ids([], IdentifierStringCase.CAMEL), [])
+
 
 if __name__ == '__main__':
     set_logger(verbosity=LogLevels.WARNING)
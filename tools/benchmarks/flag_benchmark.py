@@ -0,0 +1,121 @@
+#!/bin/env python3
+# Repository:   https://github.com/Python-utilities
+# File Name:    tools/benchmarks/flag_benchmark.py
+# Description:  measure the per-entry cost of testing file-system-object types against a filter
+#
+# Copyright (C) 2024 Dieter J Kybelksties <github@kybelksties.com>
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 59 Temple Place - Suite 330, Boston, MA  02111-1307, USA.
+#
+# @date: 2024-07-13
+# @author: Dieter J Kybelksties
+
+import argparse
+import os
+import random
+import sys
+import timeit
+from typing import Callable
+
+this_dir = os.path.dirname(os.path.abspath(__file__))
+dk_lib_dir = os.path.abspath(f"{this_dir}/../../../Python-utilities")
+if not os.path.isdir(dk_lib_dir):
+    raise FileNotFoundError(f"Library directory '{dk_lib_dir}' cannot be found")
+sys.path.insert(0, dk_lib_dir)
+
+# pylint: disable=wrong-import-position
+from lib.extended_enum import EnumListType
+from lib.file_system_object import FileSystemObjectType
+
+
+def legacy_is_in_filter(file_type: FileSystemObjectType, file_type_filter: FileSystemObjectType) -> bool:
+    """
+    The test find() made before the bitmask tables: & and == construct the combined flag through the class.
+    """
+    return FileSystemObjectType(file_type.value & file_type_filter.value) == file_type
+
+
+def legacy_list(list_type: EnumListType) -> list:
+    """
+    list() as it was before the member lists were cached: built by iterating the class on every call.
+    """
+    reval_list = []
+    for item in FileSystemObjectType:
+        match list_type:
+            case EnumListType.ITEM:
+                reval_list.append(item)
+            case EnumListType.NAME:
+                reval_list.append(item.name)
+    return reval_list
+
+
+def make_sample_types(count: int, seed: int = 4711) -> list[FileSystemObjectType]:
+    """
+    Create the types of directory entries, mostly files.
+    :param count: number of entries
+    :param seed: random seed so that runs are comparable
+    :return: the types
+    """
+    rnd = random.Random(seed)
+    population = [FileSystemObjectType.FILE] * 8 + [FileSystemObjectType.NOT_EMPTY_DIR,
+                                                     FileSystemObjectType.EMPTY_DIR,
+                                                     FileSystemObjectType.NOT_STALE_LINK,
+                                                     FileSystemObjectType.STALE_LINK]
+    return [rnd.choice(population) for _ in range(count)]
+
+
+def per_entry_nanoseconds(func: Callable[[], object], entries: int, repeat: int) -> float:
+    """
+    Measure the time per entry of a function that processes all sample entries, using the best of several runs.
+    :param func: function to time
+    :param entries: number of entries the function processes per run
+    :param repeat: number of runs
+    :return: nanoseconds per entry
+    """
+    best = min(timeit.repeat(func, number=1, repeat=repeat))
+    return best / entries * 1e9
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Measure the per-entry cost of file-type filter tests.')
+    parser.add_argument('--entries', '-n', type=int, default=200000, help='number of sample directory entries')
+    parser.add_argument('--repeat', '-r', type=int, default=5, help='number of runs per measurement')
+    args = parser.parse_args()
+
+    file_types = make_sample_types(args.entries)
+    values = [file_type.value for file_type in file_types]
+    file_type_filter = FileSystemObjectType.FILE | FileSystemObjectType.LINK
+    mask = FileSystemObjectType.mask(file_type_filter)
+    expected = [legacy_is_in_filter(file_type, file_type_filter) for file_type in file_types]
+    if [file_type & file_type_filter == file_type for file_type in file_types] != expected \
+            or [value & mask == value for value in values] != expected:
+        raise AssertionError("flag and bitmask tests disagree with the legacy test")
+
+    print(f"{'variant':<40} {'ns/entry':>10}")
+    for name, func in [
+        ("legacy flag construction", lambda: [legacy_is_in_filter(t, file_type_filter) for t in file_types]),
+        ("flag & filter == flag", lambda: [t & file_type_filter == t for t in file_types]),
+        ("int value & mask == value", lambda: [v & mask == v for v in values]),
+        ("legacy flag | flag", lambda: [FileSystemObjectType(t.value | file_type_filter.value) for t in file_types]),
+        ("flag | flag", lambda: [t | file_type_filter for t in file_types]),
+        ("legacy list(NAME)", lambda: [legacy_list(EnumListType.NAME) for _ in range(args.entries // 100)]),
+        ("list(NAME)", lambda: [FileSystemObjectType.list(EnumListType.NAME) for _ in range(args.entries // 100)]),
+    ]:
+        entries = args.entries // 100 if "list" in name else args.entries
+        print(f"{name:<40} {per_entry_nanoseconds(func, entries, args.repeat):>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
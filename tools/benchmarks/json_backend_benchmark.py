@@ -0,0 +1,107 @@
+#!/bin/env python3
+# Repository:   https://github.com/Python-utilities
+# File Name:    tools/benchmarks/json_backend_benchmark.py
+# Description:  compare parse, dump and round-trip throughput of the available json backends
+#
+# Copyright (C) 2024 Dieter J Kybelksties <github@kybelksties.com>
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 59 Temple Place - Suite 330, Boston, MA  02111-1307, USA.
+#
+# @date: 2024-07-13
+# @author: Dieter J Kybelksties
+
+import argparse
+import json
+import os
+import random
+import sys
+import timeit
+from typing import Callable
+
+this_dir = os.path.dirname(os.path.abspath(__file__))
+dk_lib_dir = os.path.abspath(f"{this_dir}/../../../Python-utilities")
+if not os.path.isdir(dk_lib_dir):
+    raise FileNotFoundError(f"Library directory '{dk_lib_dir}' cannot be found")
+sys.path.insert(0, dk_lib_dir)
+
+# pylint: disable=wrong-import-position
+from lib.file_utils import read_file
+from lib.json_backend import available_json_backends, get_json_backend
+
+
+def make_sample_document(records: int, seed: int = 4711) -> list:
+    """
+    Create a document that resembles a gitlab/jira export: a list of records with nested objects.
+    :param records: number of records in the list
+    :param seed: random seed so that runs are comparable
+    :return: the sample document
+    """
+    rnd = random.Random(seed)
+    document = []
+    for i in range(records):
+        document.append({
+            "id": i,
+            "iid": rnd.randint(1, 100000),
+            "title": f"Merge request number {i} with some title text",
+            "state": rnd.choice(["opened", "merged", "closed"]),
+            "author": {"id": rnd.randint(1, 500), "name": f"Author {rnd.randint(1, 500)}", "active": True},
+            "labels": [f"label-{rnd.randint(0, 20)}" for _ in range(rnd.randint(0, 5))],
+            "web_url": f"https://gitlab.example.com/group/project/-/merge_requests/{i}",
+            "score": rnd.random() * 100,
+            "description": None if i % 3 else "ü" * rnd.randint(0, 40),
+        })
+    return document
+
+
+def throughput(func: Callable[[], object], size: int, repeat: int) -> float:
+    """
+    Measure the throughput of a function in MB/s, using the best of several runs.
+    :param func: function to time
+    :param size: number of bytes the function processes per call
+    :param repeat: number of runs
+    :return: throughput in MB/s
+    """
+    best = min(timeit.repeat(func, number=1, repeat=repeat))
+    return size / best / 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare parse, dump and round-trip throughput of json backends.')
+    parser.add_argument('files', nargs='*', help='json files to use, a generated document is used if none are given')
+    parser.add_argument('--records', '-n', type=int, default=50000, help='number of records in generated document')
+    parser.add_argument('--repeat', '-r', type=int, default=5, help='number of runs per measurement')
+    parser.add_argument('--indent', '-i', type=int, default=None, help='indentation used for dumping')
+    args = parser.parse_args()
+
+    if args.files:
+        samples = [(os.path.basename(f), read_file(f)) for f in args.files]
+    else:
+        samples = [(f"generated({args.records})", json.dumps(make_sample_document(args.records)))]
+
+    print(f"{'document':<30} {'backend':<10} {'parse MB/s':>12} {'dump MB/s':>12} {'round-trip MB/s':>16}")
+    for name, text in samples:
+        size = len(text.encode("utf-8"))
+        document = json.loads(text)
+        for backend_type in available_json_backends():
+            backend = get_json_backend(backend_type)
+            parse = throughput(lambda b=backend, t=text: b.loads(t), size, args.repeat)
+            dump = throughput(lambda b=backend, d=document: b.dumps(d, indent=args.indent), size, args.repeat)
+            round_trip = throughput(lambda b=backend, d=document: b.loads(b.dumps(d, indent=args.indent)),
+                                    size, args.repeat)
+            print(f"{name:<30} {str(backend_type):<10} {parse:>12.1f} {dump:>12.1f} {round_trip:>16.1f}")
+
+
+if __name__ == "__main__":
+    main()
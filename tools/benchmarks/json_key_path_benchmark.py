@@ -0,0 +1,97 @@
+#!/bin/env python3
+# Repository:   https://github.com/Python-utilities
+# File Name:    tools/benchmarks/json_key_path_benchmark.py
+# Description:  measure memory and build time of many json key-paths
+#
+# Copyright (C) 2024 Dieter J Kybelksties <github@kybelksties.com>
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 59 Temple Place - Suite 330, Boston, MA  02111-1307, USA.
+#
+# @date: 2024-07-13
+# @author: Dieter J Kybelksties
+
+import argparse
+import gc
+import os
+import random
+import sys
+import time
+import tracemalloc
+from typing import Callable
+
+this_dir = os.path.dirname(os.path.abspath(__file__))
+dk_lib_dir = os.path.abspath(f"{this_dir}/../../../Python-utilities")
+if not os.path.isdir(dk_lib_dir):
+    raise FileNotFoundError(f"Library directory '{dk_lib_dir}' cannot be found")
+sys.path.insert(0, dk_lib_dir)
+
+# pylint: disable=wrong-import-position
+from lib.json_key_path import JsonKeyPath
+
+
+def make_sample_paths(count: int, seed: int = 4711) -> list[list[str]]:
+    """
+    Create key-paths as they occur when querying/indexing a gitlab/jira export: few distinct keys, many indices.
+    :param count: number of paths
+    :param seed: random seed so that runs are comparable
+    :return: the paths as lists of path elements
+    """
+    rnd = random.Random(seed)
+    fields = [["author", "name"], ["author", "id"], ["labels", "[0]"], ["state"], ["references", "full"], ["title"]]
+    return [["merge_requests", f"[{rnd.randint(0, 100000)}]"] + rnd.choice(fields) for _ in range(count)]
+
+
+def measure(func: Callable[[], object]) -> tuple[object, float, int]:
+    """
+    Run a function and measure its duration, then run it again to measure the memory still held by its result.
+    :param func: function to run
+    :return: tuple of the result, seconds and bytes
+    """
+    gc.collect()
+    start = time.perf_counter()
+    result = func()
+    seconds = time.perf_counter() - start
+    del result
+    gc.collect()
+    tracemalloc.start()
+    result = func()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, seconds, size
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Measure memory and build time of many json key-paths.')
+    parser.add_argument('--paths', '-n', type=int, default=200000, help='number of key-paths to build')
+    args = parser.parse_args()
+
+    samples = make_sample_paths(args.paths)
+    strings = ["/".join(sample) for sample in samples]
+    print(f"{'benchmark':<40} {'seconds':>10} {'bytes/path':>12}")
+    for name, func in [("JsonKeyPath(list)", lambda: [JsonKeyPath(sample) for sample in samples]),
+                       ("JsonKeyPath(str)", lambda: [JsonKeyPath(string) for string in strings])]:
+        paths, seconds, size = measure(func)
+        print(f"{name:<40} {seconds:>10.3f} {size / len(paths):>12.1f}")
+        del paths
+    paths = [JsonKeyPath(sample) for sample in samples]
+    try:
+        _, seconds, size = measure(lambda: {path: index for index, path in enumerate(paths)})
+        print(f"{'dict keyed by JsonKeyPath':<40} {seconds:>10.3f} {size / len(paths):>12.1f}")
+    except TypeError:
+        print(f"{'dict keyed by JsonKeyPath':<40} {'JsonKeyPath is not hashable':>23}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+#!/bin/env python3
+# Repository:   https://github.com/Python-utilities
+# File Name:    tools/benchmarks/squeeze_benchmark.py
+# Description:  measure the per-call overhead of squeezing characters out of strings
+#
+# Copyright (C) 2024 Dieter J Kybelksties <github@kybelksties.com>
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 59 Temple Place - Suite 330, Boston, MA  02111-1307, USA.
+#
+# @date: 2024-07-13
+# @author: Dieter J Kybelksties
+
+import argparse
+import os
+import random
+import re
+import sys
+import timeit
+from typing import Callable
+
+this_dir = os.path.dirname(os.path.abspath(__file__))
+dk_lib_dir = os.path.abspath(f"{this_dir}/../../../Python-utilities")
+if not os.path.isdir(dk_lib_dir):
+    raise FileNotFoundError(f"Library directory '{dk_lib_dir}' cannot be found")
+sys.path.insert(0, dk_lib_dir)
+
+# pylint: disable=wrong-import-position
+from lib.string_utils import get_squeezer, squeeze_chars
+
+SQUEEZE_SET = "\n\t\r "
+
+
+def legacy_squeeze_chars(source: str, squeeze_set: str, replace_with: str = ' ') -> str:
+    """
+    squeeze_chars() as it was before Squeezer: table and regex are built on every call.
+    """
+    if not source:
+        return ""
+    if not squeeze_set:
+        return source
+    translater = source.maketrans(squeeze_set, replace_with * len(squeeze_set))
+    source = source.translate(translater)
+    compress_re = re.compile(f"{replace_with}+")
+    source = re.sub(compress_re, replace_with, source)
+    return source.strip(replace_with)
+
+
+def make_sample_lines(count: int, seed: int = 4711) -> list[str]:
+    """
+    Create short lines like commands or env-file lines, with irregular whitespace.
+    :param count: number of lines
+    :param seed: random seed so that runs are comparable
+    :return: the lines
+    """
+    rnd = random.Random(seed)
+    words = ["git", "commit", "-m", "KEY=value", "--verbose", "/usr/local/bin", "# comment", "x"]
+    return [rnd.choice(["", " ", "\t"]).join(f"{word}{rnd.choice([' ', '  ', '\t ', ' \n'])}"
+                                             for word in rnd.sample(words, rnd.randint(1, 6)))
+            for _ in range(count)]
+
+
+def per_call_microseconds(func: Callable[[], object], calls: int, repeat: int) -> float:
+    """
+    Measure the time per call of a function that processes all sample lines, using the best of several runs.
+    :param func: function to time
+    :param calls: number of lines the function processes per run
+    :param repeat: number of runs
+    :return: microseconds per line
+    """
+    best = min(timeit.repeat(func, number=1, repeat=repeat))
+    return best / calls * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Measure the per-call overhead of squeezing characters.')
+    parser.add_argument('--lines', '-n', type=int, default=100000, help='number of sample lines')
+    parser.add_argument('--repeat', '-r', type=int, default=5, help='number of runs per measurement')
+    args = parser.parse_args()
+
+    lines = make_sample_lines(args.lines)
+    squeezer = get_squeezer(SQUEEZE_SET)
+    expected = [legacy_squeeze_chars(line, SQUEEZE_SET) for line in lines]
+    if squeezer.squeeze_all(lines) != expected:
+        raise AssertionError("Squeezer and legacy squeeze_chars() disagree")
+
+    print(f"{'variant':<30} {'us/line':>10}")
+    for name, func in [("legacy squeeze_chars()", lambda: [legacy_squeeze_chars(line, SQUEEZE_SET) for line in lines]),
+                       ("squeeze_chars()", lambda: [squeeze_chars(line, SQUEEZE_SET) for line in lines]),
+                       ("Squeezer.squeeze()", lambda: [squeezer.squeeze(line) for line in lines]),
+                       ("Squeezer.squeeze_all()", lambda: squeezer.squeeze_all(lines))]:
+        print(f"{name:<30} {per_call_microseconds(func, len(lines), args.repeat):>10.3f}")
+
+
+if __name__ == "__main__":
+    main()
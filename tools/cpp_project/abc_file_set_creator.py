@@ -119,9 +119,10 @@ class ABCFileSetCreator(ABC):
                 self.commented_licence_string(licence_text=self.__licence,
                                               comment_style=file_map.comment_style(),
                                               filename=file_map.target_file())
-            content = replace_all(content, self.get_tag_replacements())
-            content = replace_all(content, self.__common_replacements)
-            content = replace_all(content, self.get_tag_replacements())
+            # tags of the file-set take precedence, and can appear in the common replacements, e.g. the licence
+            replacements = dict(self.__common_replacements)
+            replacements.update(self.get_tag_replacements())
+            content = replace_all(content, replacements, fixpoint=True)
             write_file(filename=file_map.target_file(), content=content)
             log_info(f"proj_file={file_map.target_file()}")
 
@@ -117,16 +117,17 @@ class GitLabTools:
                       force=True)
             return reval
 
-        for i in range(0, merge_request_json.size()):
-            reval.set("success", True, force=True)
-            reval.set(f"merge_requests/[{i}]/branch", branch_name, force=True)
-            reval.set(f"merge_requests/[{i}]/title", merge_request_json.get(f"[{i}]/title"), force=True)
-            reval.set(f"merge_requests/[{i}]/author", merge_request_json.get(f"[{i}]/author/name"), force=True)
-            reval.set(f"merge_requests/[{i}]/merge_request_id", merge_request_json.get(f"[{i}]/id"), force=True)
-            reval.set(f"merge_requests/[{i}]/state", merge_request_json.get(f"[{i}]/state"), force=True)
-            reval.set(f"merge_requests/[{i}]/url", merge_request_json.get(f"[{i}]/web_url"), force=True)
-            reval.set(f"merge_requests/[{i}]/source_branch", merge_request_json.get(f"[{i}]/source_branch"), force=True)
-            reval.set(f"merge_requests/[{i}]/target_branch", merge_request_json.get(f"[{i}]/target_branch"), force=True)
+        merge_requests = merge_request_json.query("[*]", project={"title": "title",
+                                                                  "author": "author/name",
+                                                                  "merge_request_id": "id",
+                                                                  "state": "state",
+                                                                  "url": "web_url",
+                                                                  "source_branch": "source_branch",
+                                                                  "target_branch": "target_branch"})
+        reval.set("success", True, force=True)
+        reval.set("merge_requests",
+                  [{"branch": branch_name, **merge_request} for merge_request in merge_requests],
+                  force=True)
 
         return reval
 
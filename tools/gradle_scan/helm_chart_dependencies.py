@@ -31,7 +31,7 @@ import sys
 from os import PathLike
 
 from lib.file_utils import write_file
-from lib.string_utils import make_cpp_id, IdentifierStringCase
+from lib.string_utils import make_cpp_id, make_cpp_ids, IdentifierStringCase
 
 this_dir = os.path.dirname(os.path.abspath(__file__))
 dk_lib_dir = os.path.abspath(f"{this_dir}/../../../Python-utilities")
@@ -44,17 +44,18 @@ from lib.file_system_object import find, FileSystemObjectType
 
 
 def convert_dependency_dict_to_graphviz(dependency_dict: dict[str, list[str]]) -> str:
-    graph = "\ndigraph G {\n"
+    node_ids = dict(zip(dependency_dict.keys(), make_cpp_ids(dependency_dict.keys(), IdentifierStringCase.SNAKE)))
+    lines = ["\ndigraph G {"]
 
-    for service_node in dependency_dict.keys():
-        graph += f'\t{make_cpp_id(service_node, IdentifierStringCase.SNAKE)} [label="{service_node}"];\n'
+    for service_node, node_id in node_ids.items():
+        lines.append(f'\t{node_id} [label="{service_node}"];')
 
-    for service_node in dependency_dict.keys():
+    for service_node, node_id in node_ids.items():
         for dep in dependency_dict[service_node]:
-            graph += f"\t{make_cpp_id(service_node, IdentifierStringCase.SNAKE)} -> {make_cpp_id(dep, IdentifierStringCase.SNAKE)};\n"
-    graph += "}\n"
+            lines.append(f"\t{node_id} -> {make_cpp_id(dep, IdentifierStringCase.SNAKE)};")
+    lines.append("}\n")
 
-    return graph
+    return "\n".join(lines)
 
 
 def extract_helm_chart_dependencies(file_path: str | PathLike):
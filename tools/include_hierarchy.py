@@ -99,5 +99,5 @@ if __name__ == "__main__":
 
     sorted_hierarchy = dict(sorted(hierarchy.items(), key=lambda item: item[1]))
     print(sorted_hierarchy)
-    jsonHierarchy = JsonObject(json_obj=sorted_hierarchy)
+    jsonHierarchy = JsonObject(json_obj=sorted_hierarchy, adopt=True)
     print(jsonHierarchy.to_str(4))
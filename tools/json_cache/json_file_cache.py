@@ -0,0 +1,76 @@
+#!/bin/env python3
+# Repository:   https://github.com/Python-utilities
+# File Name:    tools/json_cache/json_file_cache.py
+# Description:  inspect, evict and clear the cache of parsed json-files
+#
+# Copyright (C) 2024 Dieter J Kybelksties <github@kybelksties.com>
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 59 Temple Place - Suite 330, Boston, MA  02111-1307, USA.
+#
+# @date: 2024-07-13
+# @author: Dieter J Kybelksties
+
+
+import argparse
+import os
+import sys
+from datetime import datetime
+
+this_dir = os.path.dirname(os.path.abspath(__file__))
+dk_lib_dir = os.path.abspath(f"{this_dir}/../../../Python-utilities")
+if not os.path.isdir(dk_lib_dir):
+    raise FileNotFoundError(f"Library directory '{dk_lib_dir}' cannot be found")
+sys.path.insert(0, dk_lib_dir)
+
+# pylint: disable=wrong-import-position
+from lib.json_file_cache import DEFAULT_CACHE_DIR, DEFAULT_MAX_CACHE_SIZE, JsonFileCache
+
+
+def human_size(size: int) -> str:
+    for unit in ("B", "KB", "MB", "GB"):
+        if size < 1024 or unit == "GB":
+            return f"{size:.0f}{unit}" if unit == "B" else f"{size:.1f}{unit}"
+        size /= 1024
+    return str(size)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Inspect, evict and clear the cache of parsed json-files.')
+    parser.add_argument('--cache-dir', '-d', default=DEFAULT_CACHE_DIR, help='cache directory')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    subparsers.add_parser('list', help='list the entries, least recently used first')
+    evict_parser = subparsers.add_parser('evict', help='remove stale and least recently used entries')
+    evict_parser.add_argument('--max-size', '-m', type=int, default=DEFAULT_MAX_CACHE_SIZE,
+                              help='maximum total size in bytes')
+    subparsers.add_parser('clear', help='remove all entries')
+    args = parser.parse_args()
+
+    cache = JsonFileCache(cache_dir=args.cache_dir)
+    if args.command == 'list':
+        entries = cache.entries()
+        for entry in entries:
+            last_used = datetime.fromtimestamp(entry.last_used).strftime("%Y-%m-%d %H:%M:%S")
+            state = "stale" if entry.is_stale() else "valid"
+            print(f"{last_used}  {human_size(entry.size):>9}  {state:<5}  {entry.source}")
+        print(f"{len(entries)} entries, {human_size(sum(entry.size for entry in entries))} in {cache.cache_dir}")
+    elif args.command == 'evict':
+        removed = cache.evict(max_size=args.max_size)
+        print(f"removed {len(removed)} entries, {human_size(sum(entry.size for entry in removed))}")
+    else:
+        print(f"removed {cache.clear()} entries")
+
+
+if __name__ == "__main__":
+    main()